@@ -1,6 +1,7 @@
 from __future__ import absolute_import, unicode_literals
 import os
 from celery import Celery
+from celery.signals import task_prerun, task_postrun, worker_process_init
 
 default = os.environ.get("DJANGO_SETTINGS_MODULE")
 
@@ -15,6 +16,55 @@ app.conf.beat_schedule = CELERYBEAT_SCHEDULE
 app.autodiscover_tasks()
 
 
+@task_prerun.connect
+@task_postrun.connect
+def close_stale_db_connections(**kwargs):
+    """drop broken or expired connections of the current pool thread around every task"""
+    from django.db import close_old_connections
+
+    close_old_connections()
+
+
+@worker_process_init.connect
+def mark_pool_child(**kwargs):
+    """prefork children are recycled by celery, not by WorkerMemory"""
+    from services.utils.worker_memory import WorkerMemory
+
+    WorkerMemory.pool_child_started()
+
+
+@task_prerun.connect
+def record_task_started(task_id=None, task=None, **kwargs):
+    import time
+    from services.utils.task_progress import TaskProgress
+    from services.utils.backpressure import QueueLoad
+
+    from services.utils.task_metrics import TaskMetrics
+    from services.utils.worker_memory import WorkerMemory
+
+    record = TaskProgress(task_id).start(task.name)
+    # first attempts only, retries wait for their countdown on purpose
+    queued_at = record.get("queued_at")
+    queue_wait = None
+    if queued_at and record.get("attempts") == 1:
+        queue_wait = time.time() - queued_at
+        queue = (task.request.delivery_info or {}).get("routing_key")
+        QueueLoad.record_wait(queue, queue_wait)
+    TaskMetrics.start(task, queue_wait=queue_wait)
+    WorkerMemory.task_started()
+
+
+@task_postrun.connect
+def record_task_finished(task_id=None, task=None, retval=None, state=None, **kwargs):
+    from services.utils.task_progress import TaskProgress, CELERY_STATES, RUNNING
+    from services.utils.task_metrics import TaskMetrics
+    from services.utils.worker_memory import WorkerMemory
+
+    TaskProgress(task_id).finish(CELERY_STATES.get(state, RUNNING), retval)
+    TaskMetrics.stop(state)
+    WorkerMemory.task_finished(task.name, task.request.hostname)
+
+
 @app.task(bind=True)
 def debug_task(self):
     print(f"request: {self.request!r}")
@@ -0,0 +1,136 @@
+"""
+celery task routing
+
+user triggered refreshes go to the `interactive` lane, fleet-wide sweeps and cleanups to
+the `background` lane. inside a lane, tasks bound to a dao/dip/presale are sent to a
+per-network sub-queue (`<lane>.<chain id>`), so a slow or broken chain only backs up its
+own queue. workers are pinned with `-Q`, see `python -m app.celery_routing --help`.
+"""
+
+import argparse
+import os
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+LANES = (INTERACTIVE, BACKGROUND)
+
+# chain ids that get their own sub-queues, anything else stays on the lane queue
+NETWORKS = [
+    int(network)
+    for network in os.environ.get(
+        "CELERY_ROUTED_NETWORKS", "1,10,56,100,130,137,480,8453,42161,11155111,31337"
+    ).split(",")
+    if network.strip()
+]
+
+# lane used when the caller does not choose one (plain .delay from the api views)
+TASK_LANES = {
+    "blockchain.sync_proposals": INTERACTIVE,
+    "blockchain.sync_votes": INTERACTIVE,
+    "blockchain.sync_dip_status": INTERACTIVE,
+    # time critical: the dip shows as "awaiting finalization" until it runs
+    "blockchain.finalize_dip_status": INTERACTIVE,
+}
+
+# task name -> (model the first argument points to, argument name)
+TASK_TARGETS = {
+    "blockchain.sync_proposals": ("dao", "dao_id"),
+    "blockchain.sync_treasury": ("dao", "dao_id"),
+    "blockchain.sync_votes": ("dip", "dip_id"),
+    "blockchain.sync_dip_status": ("dip", "dip_id"),
+    "blockchain.finalize_dip_status": ("dip", "dip_id"),
+    "blockchain.update_presale_state": ("presale", "presale_id"),
+    "blockchain.fleet_sync_batch": ("network", "network"),
+}
+
+NETWORK_CACHE_KEY = "routing:network:{}:{}"
+
+
+def _lookup_network(target, pk):
+    from django.core.cache import cache
+
+    if target == "network":
+        return int(pk)
+
+    key = NETWORK_CACHE_KEY.format(target, pk)
+    network = cache.get(key)
+    if network is None:
+        if target == "dao":
+            from dao.models import Dao
+
+            network = Dao.objects.filter(id=pk).values_list("network", flat=True).first()
+        elif target == "dip":
+            from forum.models import Dip
+
+            network = Dip.objects.filter(id=pk).values_list("dao__network", flat=True).first()
+        else:
+            from dao.models import Presale
+
+            network = (
+                Presale.objects.filter(id=pk).values_list("dao__network", flat=True).first()
+            )
+        if network is not None:
+            # a dao never changes its chain
+            cache.set(key, network, timeout=24 * 3600)
+    return network
+
+
+def network_for(name, args=(), kwargs=None):
+    target = TASK_TARGETS.get(name)
+    if not target:
+        return None
+    model, argument = target
+    kwargs = kwargs or {}
+    pk = kwargs.get(argument, args[0] if args else None)
+    if pk is None:
+        return None
+    try:
+        return _lookup_network(model, pk)
+    except Exception:
+        # routing must never fail a publish, the lane queue is always consumed
+        return None
+
+
+def lane_for(name, lane=None) -> str:
+    return lane or TASK_LANES.get(name, BACKGROUND)
+
+
+def queue_for(name, args=(), kwargs=None, lane=None) -> str:
+    lane = lane_for(name, lane)
+    network = network_for(name, args, kwargs)
+    if network in NETWORKS:
+        return f"{lane}.{network}"
+    return lane
+
+
+def route_task(name, args, kwargs, options, task=None, **kw):
+    """celery router, an explicit queue passed to apply_async takes precedence"""
+    return {"queue": queue_for(name, args, kwargs)}
+
+
+def worker_queues(lanes, networks=None) -> list:
+    """queues a worker pinned to the given lanes (and optionally networks) consumes"""
+    networks = NETWORKS if networks is None else networks
+    queues = []
+    for lane in lanes:
+        queues.append(lane)
+        queues += [f"{lane}.{network}" for network in networks]
+    return queues
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="print the -Q argument for a celery worker pinned to lanes/networks"
+    )
+    parser.add_argument("lanes", nargs="*", help=f"lanes to consume, any of {', '.join(LANES)}")
+    parser.add_argument(
+        "--network",
+        type=int,
+        action="append",
+        help="only consume the sub-queues of this chain id, can be repeated",
+    )
+    options = parser.parse_args()
+    for lane in options.lanes:
+        if lane not in LANES:
+            parser.error(f"unknown lane: {lane}")
+    print(",".join(worker_queues(options.lanes or LANES, options.network)))
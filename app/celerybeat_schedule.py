@@ -1,3 +1,4 @@
+import os
 from celery.schedules import crontab
 
 CELERYBEAT_SCHEDULE = {
@@ -6,4 +7,29 @@ CELERYBEAT_SCHEDULE = {
         "schedule": crontab(minute=0, hour=0),
         "args": (),
     },
+    "flush-view-counts": {
+        "task": "forum.tasks.flush_view_counts",
+        "schedule": float(os.environ.get("VIEWS_FLUSH_INTERVAL", "60")),
+        "args": (),
+    },
+    "schedule-fleet-sync": {
+        "task": "blockchain.schedule_fleet_sync",
+        "schedule": float(os.environ.get("FLEET_SYNC_TICK", "60")),
+        "args": (),
+    },
+    "sync-active-presales": {
+        "task": "blockchain.fleet_sweep",
+        "schedule": float(os.environ.get("FLEET_SYNC_HOT_INTERVAL", "300")),
+        "args": ("presales",),
+    },
+    "sync-treasury-balances": {
+        "task": "blockchain.fleet_sweep",
+        "schedule": crontab(minute=30, hour="*/6"),
+        "args": ("treasury",),
+    },
+    "schedule-dip-finalizations": {
+        "task": "blockchain.schedule_dip_finalizations",
+        "schedule": crontab(minute="*/15"),
+        "args": (),
+    },
 }
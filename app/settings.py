@@ -252,10 +252,119 @@ CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_BACKEND = "redis://redis:6379/0"
 CELERY_TIMEZONE = "UTC"
+# interactive/background lanes with per-network sub-queues, see app/celery_routing.py
+CELERY_TASK_ROUTES = ("app.celery_routing.route_task",)
+CELERY_TASK_DEFAULT_QUEUE = "background"
+# task results only hold compact summaries, kept for a bounded time
+CELERY_RESULT_EXPIRES = timedelta(
+    seconds=int(os.environ.get("TASK_RESULT_EXPIRES", str(24 * 3600)))
+)
+TASK_RESULT_MAX_BYTES = int(os.environ.get("TASK_RESULT_MAX_BYTES", "4096"))
+# how long per task metric totals (runs, runtime, db/rpc/sleep time) are kept without runs
+TASK_METRICS_TIMEOUT = int(os.environ.get("TASK_METRICS_TIMEOUT", str(7 * 24 * 3600)))
+# worker recycling: a worker restarts after this many tasks or once its rss passes the
+# limit (0 disables). prefork children are recycled by celery, the threads and solo
+# pools warm shut down and are restarted by the container (services/utils/worker_memory.py)
+WORKER_MAX_TASKS = int(os.environ.get("WORKER_MAX_TASKS", "0"))
+WORKER_MAX_RSS_MB = int(os.environ.get("WORKER_MAX_RSS_MB", "0"))
+CELERY_WORKER_MAX_TASKS_PER_CHILD = WORKER_MAX_TASKS or None
+CELERY_WORKER_MAX_MEMORY_PER_CHILD = WORKER_MAX_RSS_MB * 1024 or None
+# tracemalloc allocation sites per task type, reported every WORKER_MEMORY_PROFILE_EVERY
+# runs of a type. costs cpu and memory on every allocation, enable while hunting a leak
+WORKER_MEMORY_PROFILING = (
+    os.environ.get("WORKER_MEMORY_PROFILING", "False").lower() == "true"
+)
+WORKER_MEMORY_PROFILE_EVERY = int(os.environ.get("WORKER_MEMORY_PROFILE_EVERY", "50"))
+WORKER_MEMORY_PROFILE_TOP = int(os.environ.get("WORKER_MEMORY_PROFILE_TOP", "10"))
+WORKER_MEMORY_PROFILE_FRAMES = 1
+# min seconds between two progress counter writes of a running task
+TASK_PROGRESS_INTERVAL = float(os.environ.get("TASK_PROGRESS_INTERVAL", "1"))
+
+# keyset paginated lists report the planner's row estimate as count when they span
+# several pages, instead of running COUNT(*)
+PAGINATION_ESTIMATED_COUNT = (
+    os.environ.get("PAGINATION_ESTIMATED_COUNT", "true").lower() == "true"
+)
+
+# redis of the forum view and like counters, the cache redis unless set
+FORUM_REDIS_URL = os.environ.get("FORUM_REDIS_URL")
+# unique viewers of threads and dips are counted in redis and flushed into views_count
+# every VIEWS_FLUSH_INTERVAL seconds. anonymous views are sampled at
+# VIEWS_ANONYMOUS_SAMPLE_RATE, 0 ignores them
+VIEWS_FLUSH_INTERVAL = float(os.environ.get("VIEWS_FLUSH_INTERVAL", "60"))
+VIEWS_FLUSH_BATCH = int(os.environ.get("VIEWS_FLUSH_BATCH", "500"))
+VIEWS_ANONYMOUS_SAMPLE_RATE = float(os.environ.get("VIEWS_ANONYMOUS_SAMPLE_RATE", "0"))
+# redis sets of the likers of hot content (LIKES_CACHE_MIN_LIKES likes or more), so
+# is_liked of popular threads, dips and replies skips postgres
+LIKES_CACHE_ENABLED = os.environ.get("LIKES_CACHE_ENABLED", "False").lower() == "true"
+LIKES_CACHE_MIN_LIKES = int(os.environ.get("LIKES_CACHE_MIN_LIKES", "50"))
+LIKES_CACHE_TIMEOUT = int(os.environ.get("LIKES_CACHE_TIMEOUT", "3600"))
+
+# Sync task coalescing (seconds): how long a queued task blocks duplicate enqueues,
+# how long a running task holds its per dao/dip lease without progress (every checkpoint
+# write extends it by this much), and how often a blocked one retries
+TASK_PENDING_TIMEOUT = int(os.environ.get("TASK_PENDING_TIMEOUT", "900"))
+TASK_LEASE_TIMEOUT = int(os.environ.get("TASK_LEASE_TIMEOUT", "600"))
+TASK_LEASE_RETRY_DELAY = int(os.environ.get("TASK_LEASE_RETRY_DELAY", "10"))
+
+# Resumable sync tasks: how long a failed attempt's checkpoint is kept for its retries
+# and how many proposals are read between two checkpoint writes
+TASK_CHECKPOINT_TIMEOUT = int(os.environ.get("TASK_CHECKPOINT_TIMEOUT", "3600"))
+SYNC_CHECKPOINT_EVERY = int(os.environ.get("SYNC_CHECKPOINT_EVERY", "25"))
+
+# Backpressure for the chain refresh endpoints: new refreshes get a 503 with Retry-After
+# while their interactive queue holds more jobs or makes them wait longer (seconds) than
+# this. depths are re-read every BACKPRESSURE_REFRESH seconds, waits are smoothed
+BACKPRESSURE_MAX_DEPTH = int(os.environ.get("BACKPRESSURE_MAX_DEPTH", "200"))
+BACKPRESSURE_MAX_WAIT = float(os.environ.get("BACKPRESSURE_MAX_WAIT", "120"))
+BACKPRESSURE_RETRY_AFTER = int(os.environ.get("BACKPRESSURE_RETRY_AFTER", "30"))
+BACKPRESSURE_MAX_RETRY_AFTER = int(os.environ.get("BACKPRESSURE_MAX_RETRY_AFTER", "600"))
+BACKPRESSURE_REFRESH = int(os.environ.get("BACKPRESSURE_REFRESH", "5"))
+BACKPRESSURE_WAIT_SMOOTHING = 0.2
+BACKPRESSURE_WAIT_WINDOW = int(os.environ.get("BACKPRESSURE_WAIT_WINDOW", "300"))
 
 # Blockchain settings
 BLOCKCHAIN_SCAN_BLOCK_RANGE = 100000  # Default number of blocks to scan for events
 
+# Presales without new trade events only get their state re-read at this cadence
+PRESALE_STATE_HEARTBEAT = timedelta(
+    minutes=int(os.environ.get("PRESALE_STATE_HEARTBEAT_MINUTES", "360"))
+)
+# parallel getPresaleState reads per network when the rpc provider rejects batch requests
+PRESALE_STATE_CONCURRENCY = int(os.environ.get("PRESALE_STATE_CONCURRENCY", "8"))
+
+# Batched purges (dip_cleanup and other retention jobs): rows per delete transaction and
+# seconds to pause between batches
+PURGE_BATCH_SIZE = int(os.environ.get("PURGE_BATCH_SIZE", "500"))
+PURGE_PAUSE = float(os.environ.get("PURGE_PAUSE", "0.2"))
+
+# Fleet sync scheduler (seconds): every tick the active DAOs whose tier interval has
+# passed get proposals and votes syncs enqueued, spread over the tick
+FLEET_SYNC_TICK = int(os.environ.get("FLEET_SYNC_TICK", "60"))
+FLEET_SYNC_INTERVALS = {
+    "hot": int(os.environ.get("FLEET_SYNC_HOT_INTERVAL", "300")),
+    "warm": int(os.environ.get("FLEET_SYNC_WARM_INTERVAL", "1800")),
+    "dormant": int(os.environ.get("FLEET_SYNC_DORMANT_INTERVAL", "43200")),
+}
+# a DAO is hot when an active DIP ends within this window, warm when it had activity
+# within the warm window
+FLEET_SYNC_HOT_WINDOW = int(os.environ.get("FLEET_SYNC_HOT_WINDOW", "7200"))
+FLEET_SYNC_WARM_WINDOW = int(os.environ.get("FLEET_SYNC_WARM_WINDOW", str(7 * 24 * 3600)))
+# max sync jobs enqueued per network and tick, overridable per chain id
+FLEET_SYNC_NETWORK_BUDGET = int(os.environ.get("FLEET_SYNC_NETWORK_BUDGET", "30"))
+FLEET_SYNC_NETWORK_BUDGETS = {}
+
+# Fleet sweeps (treasury balances, presales) run as per-network batches: at most this
+# many batches of one network run at the same time, overridable per chain id
+FLEET_FANOUT_NETWORK_CONCURRENCY = int(os.environ.get("FLEET_FANOUT_NETWORK_CONCURRENCY", "4"))
+FLEET_FANOUT_NETWORK_CONCURRENCIES = {}
+
+# DIP finalization (seconds): the status is read this long after a proposal's end_time;
+# only DIPs ending within the look-ahead get an eta task, the others are picked up by the
+# periodic sweep, keeping etas well below the redis visibility timeout (1 hour)
+DIP_FINALIZE_MARGIN = int(os.environ.get("DIP_FINALIZE_MARGIN", "60"))
+DIP_FINALIZE_SCHEDULE_AHEAD = int(os.environ.get("DIP_FINALIZE_SCHEDULE_AHEAD", "2700"))
+
 # HTTPS settings
 # Tell Django to trust the X-Forwarded-Proto header from the proxy
 SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
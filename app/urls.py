@@ -7,7 +7,12 @@ from drf_spectacular.views import (
 )
 from django.conf import settings
 from django.conf.urls.static import static
-from forum.views import DipSyncronizationView, DipSingleSyncronizationView
+from forum.views import (
+    DipSyncronizationView,
+    DipSingleSyncronizationView,
+    TaskStatusView,
+    QueueMetricsView,
+)
 
 from dao.views import StakeView
 from forum.urls import vote_router
@@ -37,6 +42,16 @@ api_urlpatterns = [
         DipSingleSyncronizationView.as_view({"patch": "update"}),
         name="refresh-status",
     ),
+    path(
+        "refresh/tasks/<str:pk>/",
+        TaskStatusView.as_view({"get": "retrieve"}),
+        name="refresh-task",
+    ),
+    path(
+        "refresh/metrics/",
+        QueueMetricsView.as_view({"get": "list"}),
+        name="refresh-metrics",
+    ),
 ]
 
 urlpatterns = [
@@ -0,0 +1,33 @@
+"""
+synthetic workload of the benchmark_worker command
+
+kept out of the tasks modules so app.autodiscover_tasks() never registers it on the
+production workers. a benchmark worker loads it with `-I core.benchmark` and consumes
+BENCHMARK_QUEUE, which no production worker listens to.
+"""
+
+import time
+from celery import shared_task
+
+
+BENCHMARK_QUEUE = "benchmark"
+
+
+@shared_task(bind=True, name="benchmark.rpc")
+def benchmark_rpc_task(self, network, calls=5, wait=0.0):
+    """
+    a few rpc reads, an optional propagation wait like the real sync tasks and one
+    database query
+    """
+    from dao.models import Dao
+    from services.blockchain.blockchain_client import BlockchainClient
+    from services.utils.task_metrics import timed_sleep
+
+    started = time.monotonic()
+    client = BlockchainClient(network=network)
+    for _ in range(calls):
+        client.web3.eth.block_number
+    if wait:
+        timed_sleep(wait)
+    Dao.objects.exists()
+    return {"runtime": time.monotonic() - started, "block": client.current_block}
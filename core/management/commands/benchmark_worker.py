@@ -0,0 +1,66 @@
+import time
+from django.core.management.base import BaseCommand
+from core.benchmark import BENCHMARK_QUEUE, benchmark_rpc_task
+
+
+class Command(BaseCommand):
+    help = "measures worker throughput (tasks/minute) with a synthetic rpc-bound sync workload"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tasks", type=int, default=200, help="number of tasks to enqueue")
+        parser.add_argument(
+            "--network",
+            type=int,
+            default=31337,
+            help="chain id to read from, defaults to the local hardhat node",
+        )
+        parser.add_argument("--calls", type=int, default=5, help="rpc reads per task")
+        parser.add_argument(
+            "--wait",
+            type=float,
+            default=0.0,
+            help="seconds each task sleeps, to mimic the propagation waits of the sync tasks",
+        )
+        parser.add_argument(
+            "--queue",
+            default=BENCHMARK_QUEUE,
+            help="queue of the worker under test, started with -I core.benchmark",
+        )
+        parser.add_argument("--timeout", type=int, default=600)
+
+    def handle(self, *args, **options):
+        count = options["tasks"]
+        self.stdout.write(
+            f"enqueueing {count} tasks on {options['queue']} against network "
+            f"{options['network']} ({options['calls']} rpc calls, {options['wait']}s wait each)..."
+        )
+
+        started = time.monotonic()
+        results = [
+            benchmark_rpc_task.apply_async(
+                args=(options["network"], options["calls"], options["wait"]),
+                queue=options["queue"],
+            )
+            for _ in range(count)
+        ]
+
+        runtimes = []
+        failed = 0
+        for result in results:
+            try:
+                remaining = max(1, options["timeout"] - (time.monotonic() - started))
+                runtimes.append(result.get(timeout=remaining)["runtime"])
+            except Exception as ex:
+                failed += 1
+                self.stdout.write(self.style.WARNING(f"task {result.id} failed: {str(ex)}"))
+        elapsed = time.monotonic() - started
+
+        runtimes.sort()
+        completed = len(runtimes)
+        self.stdout.write(f"completed: {completed}, failed: {failed}, wall time: {elapsed:.1f}s")
+        if completed:
+            self.stdout.write(
+                f"task runtime p50: {runtimes[completed // 2]:.3f}s, "
+                f"p95: {runtimes[min(completed - 1, int(completed * 0.95))]:.3f}s"
+            )
+        self.stdout.write(self.style.SUCCESS(f"throughput: {completed / elapsed * 60:.1f} tasks/minute"))
@@ -0,0 +1,77 @@
+"""
+test the queue depth and latency based load shedding of the refresh endpoints
+"""
+
+from unittest.mock import MagicMock, patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from services.utils.backpressure import QueueLoad, QueueOverloaded, enqueue_or_shed
+from services.utils.exception_handler import ErrorHandlingMixin
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+    BACKPRESSURE_MAX_DEPTH=100,
+    BACKPRESSURE_MAX_WAIT=60,
+    BACKPRESSURE_RETRY_AFTER=30,
+)
+class BackpressureTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.task = MagicMock()
+        self.task.name = "blockchain.sync_votes"
+        self.task.delay.return_value.id = "new-task"
+
+    @patch.object(QueueLoad, "_depths", return_value={"interactive.137": 150})
+    @patch("services.utils.backpressure.queue_for", return_value="interactive.137")
+    def test_deep_queue_sheds_new_work_with_retry_after(self, *_):
+        with self.assertRaises(QueueOverloaded) as raised:
+            enqueue_or_shed(self.task, 1, 1)
+
+        self.task.delay.assert_not_called()
+        response = ErrorHandlingMixin().handle_exception(raised.exception)
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "30")
+        self.assertEqual(QueueLoad.metrics()["queues"]["interactive.137"]["shed"], 1)
+
+    @patch.object(QueueLoad, "_depths", return_value={"interactive.137": 150})
+    @patch("services.utils.backpressure.queue_for", return_value="interactive.137")
+    def test_pending_task_is_handed_back_under_load(self, *_):
+        cache.set(f"task:pending:{self.task.name}:interactive:1", "queued-task")
+
+        result, created = enqueue_or_shed(self.task, 1, 1)
+
+        self.assertEqual(result.id, "queued-task")
+        self.assertFalse(created)
+
+    @patch.object(QueueLoad, "_depths", return_value={"interactive.137": 150})
+    @patch("services.utils.backpressure.queue_for", return_value="interactive.137")
+    def test_background_run_is_not_handed_to_a_user_refresh(self, *_):
+        cache.set(f"task:pending:{self.task.name}:background:1", "fleet-task")
+
+        # the parked run does not answer the refresh, the load check does
+        with self.assertRaises(QueueOverloaded):
+            enqueue_or_shed(self.task, 1, 1)
+        self.task.delay.assert_not_called()
+
+    @patch.object(QueueLoad, "_depths", return_value={"interactive.137": 3})
+    @patch("services.utils.backpressure.queue_for", return_value="interactive.137")
+    def test_slow_queue_sheds_and_healthy_queue_accepts(self, *_):
+        QueueLoad.record_wait("interactive.137", 90)
+        with self.assertRaises(QueueOverloaded) as raised:
+            enqueue_or_shed(self.task, 1, 1)
+        self.assertEqual(raised.exception.wait, 90)
+
+        cache.clear()
+        result, created = enqueue_or_shed(self.task, 1, 1)
+        self.assertEqual(result.id, "new-task")
+        self.assertTrue(created)
+
+    @patch.object(QueueLoad, "_depths", return_value={})
+    def test_snapshot_is_cached_between_requests(self, depths):
+        QueueLoad.snapshot()
+        QueueLoad.snapshot()
+
+        depths.assert_called_once()
@@ -0,0 +1,38 @@
+"""
+test the celery lane and per-network queue routing
+"""
+
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from app.celery_routing import queue_for, route_task, worker_queues
+
+
+class CeleryRoutingTests(SimpleTestCase):
+    @patch("app.celery_routing._lookup_network", return_value=11155111)
+    def test_user_refreshes_go_to_the_interactive_network_queue(self, _):
+        self.assertEqual(
+            route_task("blockchain.sync_votes", ("1",), {}, {}),
+            {"queue": "interactive.11155111"},
+        )
+
+    @patch("app.celery_routing._lookup_network", return_value=11155111)
+    def test_lane_can_be_overridden_by_the_caller(self, _):
+        self.assertEqual(
+            queue_for("blockchain.sync_votes", (1,), lane="background"),
+            "background.11155111",
+        )
+
+    def test_unbound_tasks_stay_on_the_lane_queue(self):
+        self.assertEqual(queue_for("forum.tasks.dip_cleanup"), "background")
+        self.assertEqual(queue_for("blockchain.update_presale_state"), "background")
+
+    @patch("app.celery_routing._lookup_network", side_effect=Exception("db down"))
+    def test_routing_falls_back_when_the_network_is_unknown(self, _):
+        self.assertEqual(queue_for("blockchain.sync_proposals", (1,)), "interactive")
+
+    def test_worker_queues(self):
+        self.assertEqual(
+            worker_queues(["interactive"], [137]), ["interactive", "interactive.137"]
+        )
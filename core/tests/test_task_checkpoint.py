@@ -0,0 +1,69 @@
+"""
+test that retried sync tasks resume from their checkpoint
+"""
+
+from unittest.mock import MagicMock, patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from services.blockchain.dip_sync_service import DipSyncronizationService
+from services.utils.task_checkpoint import TaskCheckpoint
+
+
+def proposals_then_failure(ids, fail=True):
+    def read(excluded_proposals=None):
+        for proposal_id in ids:
+            if proposal_id not in excluded_proposals:
+                yield {"proposal_id": proposal_id, "proposal_type": 6}
+        if fail:
+            raise ConnectionError("rpc timeout")
+
+    return read
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+    SYNC_CHECKPOINT_EVERY=2,
+)
+class TaskCheckpointTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.service = DipSyncronizationService.__new__(DipSyncronizationService)
+        self.service.dip_service = MagicMock()
+
+    def test_retry_continues_after_the_proposals_already_read(self):
+        self.service.dip_service.iter_proposal_data.side_effect = proposals_then_failure([5, 4, 3])
+        with self.assertRaises(ConnectionError):
+            self.service._read_new_proposals({0}, TaskCheckpoint("t1"))
+
+        self.service.dip_service.iter_proposal_data.side_effect = proposals_then_failure(
+            [5, 4, 3, 2, 1], fail=False
+        )
+        proposals = self.service._read_new_proposals({0}, TaskCheckpoint("t1"))
+
+        self.assertEqual([p["proposal_id"] for p in proposals], [5, 4, 3, 2, 1])
+        self.assertEqual(
+            self.service.dip_service.iter_proposal_data.call_args.kwargs,
+            {"excluded_proposals": {0, 3, 4, 5}},
+        )
+
+    def test_saved_proposals_are_not_reused(self):
+        TaskCheckpoint("t2").save(proposals=[{"proposal_id": 7}, {"proposal_id": 6}])
+        self.service.dip_service.iter_proposal_data.side_effect = proposals_then_failure(
+            [7, 6, 5], fail=False
+        )
+
+        proposals = self.service._read_new_proposals({7}, TaskCheckpoint("t2"))
+
+        self.assertEqual([p["proposal_id"] for p in proposals], [6, 5])
+
+    @patch("services.utils.task_metrics.time.sleep")
+    def test_propagation_wait_happens_once_per_run(self, sleep):
+        TaskCheckpoint("t3").wait_once("votes", 15, "waiting")
+        TaskCheckpoint("t3").wait_once("votes", 15, "waiting")
+        TaskCheckpoint(None).wait_once("votes", 15, "waiting")
+
+        self.assertEqual(sleep.call_count, 2)
+        TaskCheckpoint("t3").clear()
+        self.assertFalse(TaskCheckpoint("t3").resumed)
@@ -0,0 +1,134 @@
+"""
+test the enqueue coalescing and the per key lease of the sync tasks
+"""
+
+import pickle
+from unittest.mock import MagicMock, patch
+
+from celery.exceptions import Retry
+from django.core.cache import cache
+from django.core.cache.backends.redis import RedisCache
+from django.test import SimpleTestCase, override_settings
+
+from services.utils.task_checkpoint import TaskCheckpoint
+from services.utils.task_lock import TaskLease, enqueue_once
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+)
+@patch("services.utils.task_lock.queue_for", side_effect=lambda name, *a, lane=None: lane)
+class EnqueueOnceTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.task = MagicMock()
+        self.task.name = "blockchain.sync_dip_status"
+        self.task.delay.return_value.id = "interactive-task"
+        self.task.apply_async.return_value.id = "background-task"
+
+    def test_duplicates_collapse_within_a_lane(self, _):
+        first, created = enqueue_once(self.task, 1, 1, lane="background")
+        second, duplicate = enqueue_once(self.task, 1, 1, lane="background")
+
+        self.assertTrue(created)
+        self.assertFalse(duplicate)
+        self.assertEqual(second.id, first.id)
+        self.task.apply_async.assert_called_once()
+
+    def test_user_refresh_is_not_collapsed_into_a_background_run(self, _):
+        enqueue_once(self.task, 1, 1, countdown=300, lane="background")
+
+        result, created = enqueue_once(self.task, 1, 1)
+
+        self.assertTrue(created)
+        self.assertEqual(result.id, "interactive-task")
+
+    def test_lease_clears_the_pending_marker_of_its_lane(self, _):
+        enqueue_once(self.task, 1, 1, lane="background")
+        enqueue_once(self.task, 1, 1)
+        self.task.request.id = "background-task"
+
+        self.assertTrue(TaskLease(self.task, 1).acquire())
+
+        # the background run started, the user refresh is still waiting
+        _, created = enqueue_once(self.task, 1, 1)
+        self.assertFalse(created)
+        _, created = enqueue_once(self.task, 1, 1, lane="background")
+        self.assertTrue(created)
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+    TASK_LEASE_RETRY_DELAY=10,
+)
+class TaskLeaseTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.task = MagicMock()
+        self.task.name = "blockchain.sync_dip_status"
+        self.task.MaxRetriesExceededError = RuntimeError
+        self.task.request.called_directly = False
+        self.task.request.is_eager = False
+        self.task.request.retries = 1
+        self.task.request.id = "waiting-task"
+        cache.set("task:lease:blockchain.sync_dip_status:1", "holder")
+
+    def test_waiting_for_the_lease_keeps_the_retry_count(self):
+        for _ in range(3):
+            with self.assertRaises(Retry):
+                TaskLease(self.task, 1, timeout=30).acquire_or_retry()
+
+        self.assertEqual(self.task.signature_from_request.call_count, 3)
+        for call in self.task.signature_from_request.call_args_list:
+            self.assertEqual(call.kwargs, {"countdown": 10, "retries": 1})
+        self.task.retry.assert_not_called()
+
+    def test_waiting_is_bounded_by_the_lease_timeout(self):
+        for _ in range(4):
+            with self.assertRaises(Retry):
+                TaskLease(self.task, 1, timeout=30).acquire_or_retry()
+
+        with self.assertRaises(RuntimeError):
+            TaskLease(self.task, 1, timeout=30).acquire_or_retry()
+
+    @patch("services.utils.task_checkpoint.current_task")
+    def test_checkpoint_writes_renew_the_lease(self, current_task):
+        current_task.request.id = self.task.request.id
+        lease = TaskLease(self.task, 2, timeout=30)
+        self.assertTrue(lease.acquire())
+
+        with patch.object(cache, "touch", wraps=cache.touch) as touch:
+            TaskCheckpoint.current().save(votes=[])
+        touch.assert_called_once_with(lease.lease_key, 30)
+
+        lease.release()
+        with patch.object(cache, "touch") as touch:
+            TaskCheckpoint.current().save(votes=[])
+        touch.assert_not_called()
+
+    def test_release_keeps_a_lease_taken_over_by_another_worker(self):
+        lease = TaskLease(self.task, 2, timeout=30)
+        self.assertTrue(lease.acquire())
+        # expired and acquired by the next run in the meantime
+        cache.set(lease.lease_key, "next-run")
+
+        self.assertFalse(lease.renew())
+        lease.release()
+        self.assertEqual(cache.get(lease.lease_key), "next-run")
+
+    def test_release_on_redis_is_a_compare_and_delete(self):
+        lease = TaskLease(self.task, 2, timeout=30)
+        self.assertTrue(lease.acquire())
+        redis_cache = RedisCache("redis://localhost:6379/1", {})
+        client = MagicMock()
+        with patch("services.utils.task_lock.caches") as caches, patch.object(
+            redis_cache._cache, "get_client", return_value=client
+        ):
+            caches.__getitem__.return_value = redis_cache
+            lease.release()
+
+        script, keys, key, owner = client.eval.call_args.args
+        self.assertIn("redis.call('del', KEYS[1])", script)
+        self.assertEqual(keys, 1)
+        self.assertEqual(key, redis_cache.make_and_validate_key(lease.lease_key))
+        self.assertEqual(pickle.loads(owner), "waiting-task")
@@ -0,0 +1,71 @@
+"""
+test the per task measurements collected by the celery signals
+"""
+
+from unittest.mock import MagicMock, patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from services.utils import task_metrics
+from services.utils.task_metrics import TaskMetrics, timed_sleep
+from services.utils.task_result import TaskSummary
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class TaskMetricsTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.task = MagicMock()
+        self.task.name = "blockchain.sync_dip_status"
+        self.task.request.retries = 1
+        self.addCleanup(TaskMetrics.stop, "SUCCESS")
+
+    @patch("services.utils.task_metrics.time.sleep")
+    def test_run_measures_sleep_rpc_and_db(self, _):
+        TaskMetrics.start(self.task, queue_wait=2.5)
+        timed_sleep(15)
+        task_metrics.add("rpc_calls", 3)
+        task_metrics._count_queries(lambda *args: "row", "SELECT 1", None, False, {})
+
+        summary = TaskSummary().result(dip_id=1)
+        measured = TaskMetrics.stop("SUCCESS")
+
+        self.assertEqual(measured["rpc_calls"], 3)
+        self.assertEqual(measured["db_queries"], 1)
+        self.assertEqual(measured["queue_wait"], 2.5)
+        self.assertEqual(measured["retries"], 1)
+        self.assertEqual(summary["retries"], 1)
+        self.assertEqual(summary["queue_wait"], 2.5)
+        self.assertEqual(summary["rpc_calls"], 0)
+
+    def test_totals_are_exported_per_task(self):
+        for state in ("SUCCESS", "FAILURE"):
+            TaskMetrics.start(self.task, queue_wait=None)
+            task_metrics.add("rpc_calls", 2)
+            TaskMetrics.stop(state)
+
+        export = TaskMetrics.export()[self.task.name]
+        self.assertEqual(export["runs"], 2)
+        self.assertEqual(export["failures"], 1)
+        self.assertEqual(export["rpc_calls"], 4)
+        self.assertEqual(export["averages"]["rpc_calls"], 2)
+        self.assertNotIn("queue_wait", export["averages"])
+
+    def test_retries_are_counted_once_per_task(self):
+        for retries, state in ((0, "RETRY"), (1, "RETRY"), (2, "SUCCESS"), (0, "SUCCESS")):
+            self.task.request.retries = retries
+            TaskMetrics.start(self.task)
+            TaskMetrics.stop(state)
+
+        export = TaskMetrics.export()[self.task.name]
+        self.assertEqual(export["runs"], 4)
+        self.assertEqual(export["tasks"], 2)
+        self.assertEqual(export["retries"], 2)
+        self.assertEqual(export["averages"]["retries"], 1)
+
+    def test_outside_a_task_nothing_is_measured(self):
+        self.assertEqual(TaskMetrics.current(), {})
+        self.assertEqual(TaskMetrics.stop("SUCCESS"), {})
@@ -0,0 +1,66 @@
+"""
+test the progress records polled through the task status endpoint
+"""
+
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from services.utils.task_progress import TaskProgress, task_status
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+    TASK_PROGRESS_INTERVAL=60,
+)
+class TaskProgressTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_progress_moves_from_queued_to_finished(self):
+        TaskProgress("t1").queued("blockchain.sync_votes", key="7")
+        self.assertEqual(TaskProgress.read("t1")["state"], "queued")
+
+        progress = TaskProgress("t1")
+        progress.start("blockchain.sync_votes")
+        progress.update(stage="saving votes", done=0, total=4)
+        record = TaskProgress.read("t1")
+        self.assertEqual(record["state"], "running")
+        self.assertEqual(record["stage"], "saving votes")
+        self.assertEqual(record["attempts"], 1)
+
+        progress.finish("succeeded", {"status": "completed", "count": 4})
+        status = task_status("t1")
+        self.assertEqual(status["state"], "succeeded")
+        self.assertEqual(status["result"]["count"], 4)
+        self.assertEqual(status["key"], "7")
+
+    def test_counter_updates_are_throttled(self):
+        progress = TaskProgress("t2")
+        progress.start("blockchain.sync_proposals")
+        progress.update(stage="reading proposals", done=0, total=100)
+        for done in range(1, 50):
+            progress.update(done=done)
+
+        self.assertEqual(TaskProgress.read("t2")["done"], 0)
+
+        progress.update(stage="saving proposals", total=49)
+        self.assertEqual(TaskProgress.read("t2")["stage"], "saving proposals")
+
+    def test_updates_outside_a_worker_are_ignored(self):
+        progress = TaskProgress.current()
+        self.assertIsNone(progress.task_id)
+        progress.update(stage="reading proposals", done=1, total=2)
+        self.assertIsNone(TaskProgress.read(None))
+
+    @patch("services.utils.task_progress.AsyncResult")
+    def test_unknown_task_falls_back_to_result_backend(self, async_result):
+        async_result.return_value.state = "PENDING"
+        self.assertIsNone(task_status("missing"))
+
+        async_result.return_value.state = "SUCCESS"
+        async_result.return_value.result = {"status": "completed"}
+        status = task_status("expired")
+        self.assertEqual(status["state"], "succeeded")
+        self.assertEqual(status["result"], {"status": "completed"})
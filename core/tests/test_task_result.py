@@ -0,0 +1,40 @@
+"""
+test the compact task results stored in the celery result backend
+"""
+
+import json
+
+from django.test import SimpleTestCase, override_settings
+
+from services.utils.task_result import TaskSummary, cap_result
+
+
+class TaskResultTests(SimpleTestCase):
+    def test_summary_adds_duration_and_rpc_calls(self):
+        result = TaskSummary().result(dip_id=1, count=3)
+
+        self.assertEqual(result["status"], "completed")
+        self.assertEqual(result["count"], 3)
+        self.assertIn("duration", result)
+        self.assertEqual(result["rpc_calls"], 0)
+
+    @override_settings(TASK_RESULT_MAX_BYTES=200)
+    def test_cap_drops_largest_containers_first(self):
+        payload = {
+            "status": "completed",
+            "count": 500,
+            "ids": list(range(500)),
+            "tiers": {"hot": 1},
+        }
+
+        result = cap_result(payload)
+
+        self.assertLessEqual(len(json.dumps(result)), 200)
+        self.assertEqual(result["count"], 500)
+        self.assertEqual(result["tiers"], {"hot": 1})
+        self.assertEqual(result["truncated"], ["ids"])
+
+    def test_small_results_are_untouched(self):
+        payload = {"status": "completed", "count": 1}
+
+        self.assertIs(cap_result(payload), payload)
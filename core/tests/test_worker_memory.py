@@ -0,0 +1,77 @@
+"""
+test the memory profiling and recycling of long running workers
+"""
+
+import tracemalloc
+from unittest.mock import patch
+
+from celery.signals import worker_process_init
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from services.utils.worker_memory import WorkerMemory, rss_bytes
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+    WORKER_MAX_TASKS=0,
+    WORKER_MAX_RSS_MB=0,
+    WORKER_MEMORY_PROFILING=False,
+)
+class WorkerMemoryTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        patcher = patch.multiple(
+            WorkerMemory, tasks=0, recycling=False, pool_child=False, profiles={}
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @override_settings(WORKER_MAX_TASKS=3)
+    @patch("services.utils.worker_memory.os.kill")
+    def test_recycles_once_after_max_tasks(self, kill):
+        for _ in range(5):
+            WorkerMemory.task_finished("blockchain.sync_votes")
+
+        kill.assert_called_once()
+
+    @override_settings(WORKER_MAX_TASKS=1)
+    @patch("services.utils.worker_memory.os.kill")
+    def test_prefork_child_is_left_to_celery(self, kill):
+        # sent by celery in every prefork child, never in a solo or threads worker
+        worker_process_init.send(sender=None)
+        WorkerMemory.task_finished("blockchain.sync_votes")
+
+        kill.assert_not_called()
+
+    @override_settings(WORKER_MAX_RSS_MB=100)
+    @patch("services.utils.worker_memory.os.kill")
+    @patch("services.utils.worker_memory.rss_bytes")
+    def test_recycles_over_max_rss(self, rss, kill):
+        rss.return_value = 50 * 2**20
+        WorkerMemory.task_finished("blockchain.sync_votes")
+        kill.assert_not_called()
+
+        rss.return_value = 120 * 2**20
+        WorkerMemory.task_finished("blockchain.sync_votes")
+        kill.assert_called_once()
+
+    @override_settings(WORKER_MEMORY_PROFILING=True, WORKER_MEMORY_PROFILE_EVERY=2)
+    def test_profile_reports_growing_allocation_sites(self):
+        if not tracemalloc.is_tracing():
+            self.addCleanup(tracemalloc.stop)
+        leaked = []
+        for _ in range(4):
+            WorkerMemory.task_started()
+            leaked.append(bytearray(256 * 1024))
+            WorkerMemory.task_finished("blockchain.sync_votes", "background@test")
+
+        report = WorkerMemory.export()["background@test"]
+        profile = report["profiles"]["blockchain.sync_votes"]
+        self.assertEqual(profile["runs"], 4)
+        self.assertGreaterEqual(profile["retained"], 4 * 256 * 1024)
+        self.assertIn("test_worker_memory.py", profile["top"][0]["site"])
+        self.assertGreater(report["rss"], 0)
+
+    def test_rss_is_read(self):
+        self.assertGreater(rss_bytes(), 0)
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+from dao.packages.services.fleet_fanout_service import FleetFanout
+
+
+class Command(BaseCommand):
+    help = "Fan a fleet wide sync (treasury balances or presales) out to the workers"
+
+    def add_arguments(self, parser):
+        parser.add_argument("operation", choices=FleetFanout.OPERATIONS)
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            help="max batches per network running at once, defaults to the settings",
+        )
+        parser.add_argument(
+            "--wait",
+            action="store_true",
+            help="wait for the sweep to finish and print its summary",
+        )
+        parser.add_argument("--timeout", type=int, default=1800)
+
+    def handle(self, *args, **options):
+        fanout = FleetFanout(options["operation"], concurrency=options["concurrency"])
+        result = fanout.start()
+        if result is None:
+            self.stdout.write("Nothing to sync")
+            return
+
+        self.stdout.write(f"Sweep started, aggregate task: {result.id}")
+        if not options["wait"]:
+            return
+
+        summary = result.get(timeout=options["timeout"])
+        if "networks" not in summary:
+            # cap_result dropped the per network counts of a large sweep
+            dropped = ", ".join(summary.get("truncated", []))
+            self.stdout.write(self.style.WARNING(f"Summary truncated, dropped: {dropped}"))
+        for network, counts in summary.get("networks", {}).items():
+            self.stdout.write(
+                f"network {network}: {counts['succeeded']} succeeded, {counts['failed']} failed"
+            )
+        for failure in summary.get("failures", []):
+            self.stdout.write(
+                self.style.WARNING(
+                    f"{failure['key']} on network {failure['network']}: {failure['error']}"
+                )
+            )
+        style = self.style.SUCCESS if not summary["failed"] else self.style.WARNING
+        self.stdout.write(style(f"Sweep {summary['status']} in {summary['wall_time']}s"))
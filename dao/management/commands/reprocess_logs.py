@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from dao.packages.services.reprocess_service import LogReprocessService
+
+
+class Command(BaseCommand):
+    help = "Rebuild Dip, Vote and PresaleTransaction rows from the stored raw logs (no rpc calls)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--kind",
+            action="append",
+            choices=LogReprocessService.KINDS,
+            help="limit reprocessing to the given kind, can be repeated",
+        )
+        parser.add_argument("--network", type=int, help="only logs from this chain id")
+        parser.add_argument("--address", help="only logs emitted by this contract")
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="number of logs loaded and written per transaction",
+        )
+
+    def handle(self, *args, **options):
+        service = LogReprocessService(
+            network=options["network"],
+            address=options["address"],
+            chunk_size=options["chunk_size"],
+        )
+        kinds = options["kind"] or LogReprocessService.KINDS
+
+        self.stdout.write(f"Reprocessing raw logs: {', '.join(kinds)}...")
+        summary = service.reprocess(kinds)
+
+        for kind, count in summary.items():
+            self.stdout.write(f"{kind}: {count} logs reprocessed")
+        self.stdout.write(self.style.SUCCESS("Log reprocessing completed"))
@@ -0,0 +1,35 @@
+# Generated by Django 5.0.14 on 2026-10-19 02:32
+
+import core.validators.eth_network_validator
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dao', '0009_remove_treasury_native_balance_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChainLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('network', models.IntegerField(validators=[core.validators.eth_network_validator.validate_network])),
+                ('address', models.CharField(max_length=42)),
+                ('block_number', models.PositiveBigIntegerField()),
+                ('transaction_hash', models.CharField(max_length=66)),
+                ('log_index', models.PositiveIntegerField()),
+                ('topics', models.JSONField(default=list, help_text='hex encoded log topics')),
+                ('data', models.TextField(blank=True, default='0x')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['network', 'address', 'block_number', 'log_index'], name='dao_chainlo_network_44608e_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='chainlog',
+            constraint=models.UniqueConstraint(fields=('network', 'transaction_hash', 'log_index'), name='unique_chain_log'),
+        ),
+    ]
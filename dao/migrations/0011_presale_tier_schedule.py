@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-19 02:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dao', '0010_chainlog'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='presale',
+            name='tier_schedule',
+            field=models.JSONField(blank=True, help_text='immutable tier schedule read once from the contract: [[price, token_amount], ...]', null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.14 on 2026-10-19 02:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dao', '0011_presale_tier_schedule'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='presale',
+            name='last_synced_block',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='presale',
+            name='state_refreshed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
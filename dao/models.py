@@ -109,6 +109,13 @@ class Presale(models.Model):
     total_remaining = models.DecimalField(max_digits=32, default=0, decimal_places=0)
     total_raised = models.DecimalField(max_digits=32, default=0, decimal_places=0)
     deployment_block = models.PositiveIntegerField(default=0)  # Block number when the contract was deployed
+    last_synced_block = models.PositiveBigIntegerField(default=0)  # Last block scanned for trade events
+    state_refreshed_at = models.DateTimeField(null=True, blank=True)  # Last getPresaleState read
+    tier_schedule = models.JSONField(
+        null=True,
+        blank=True,
+        help_text="immutable tier schedule read once from the contract: [[price, token_amount], ...]",
+    )
     last_updated = models.DateTimeField(auto_now=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
@@ -152,3 +159,27 @@ class Treasury(models.Model):
     
     class Meta:
         indexes = [models.Index(fields=["dao"])]
+
+
+class ChainLog(models.Model):
+    """raw on-chain log as returned by eth_getLogs, kept so mappings can be re-derived offline"""
+
+    network = models.IntegerField(validators=[validate_network])
+    address = models.CharField(max_length=42)
+    block_number = models.PositiveBigIntegerField()
+    transaction_hash = models.CharField(max_length=66)
+    log_index = models.PositiveIntegerField()
+    topics = models.JSONField(default=list, help_text="hex encoded log topics")
+    data = models.TextField(blank=True, default="0x")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["network", "transaction_hash", "log_index"],
+                name="unique_chain_log",
+            )
+        ]
+        indexes = [
+            models.Index(fields=["network", "address", "block_number", "log_index"]),
+        ]
@@ -0,0 +1,129 @@
+from collections import defaultdict
+from celery import chord
+from django.conf import settings
+from django.utils import timezone
+from dao.models import Dao, Presale, PresaleStatus
+from logging_config import logger
+
+
+class FleetFanout:
+    """
+    runs a fleet wide operation as a chord of per-network batches
+
+    the units of work (a dao for treasury balances, a whole network for presales, which
+    are scanned with one get_logs per network) are grouped by network and dealt round
+    robin into at most FLEET_FANOUT_NETWORK_CONCURRENCY batches per network. every batch
+    is one task on the network's background queue, so a chain never sees more concurrent
+    batches than its cap however many workers run, while different chains proceed in
+    parallel. a batch reports the outcome of every unit instead of failing as a whole and
+    the chord callback aggregates them into one summary with the failed units.
+    """
+
+    TREASURY = "treasury"
+    PRESALES = "presales"
+    OPERATIONS = (TREASURY, PRESALES)
+
+    def __init__(self, operation, concurrency=None):
+        if operation not in self.OPERATIONS:
+            raise ValueError(f"unknown fleet operation: {operation}")
+        self.operation = operation
+        self.concurrency = concurrency
+
+    def _cap(self, network) -> int:
+        if self.concurrency:
+            return self.concurrency
+        return settings.FLEET_FANOUT_NETWORK_CONCURRENCIES.get(
+            network, settings.FLEET_FANOUT_NETWORK_CONCURRENCY
+        )
+
+    def units(self) -> dict:
+        """network -> unit keys the operation covers"""
+        units = defaultdict(list)
+        if self.operation == self.TREASURY:
+            for dao_id, network in (
+                Dao.objects.filter(is_active=True).order_by("id").values_list("id", "network")
+            ):
+                units[network].append(dao_id)
+        else:
+            networks = (
+                Presale.objects.filter(status=PresaleStatus.ACTIVE)
+                .values_list("dao__network", flat=True)
+                .distinct()
+            )
+            for network in networks:
+                units[network].append(network)
+        return dict(units)
+
+    def batches(self) -> list:
+        """(network, keys) pairs, at most the network's cap per network"""
+        batches = []
+        for network, keys in self.units().items():
+            count = min(self._cap(network), len(keys))
+            batches += [(network, keys[index::count]) for index in range(count)]
+        return batches
+
+    def start(self):
+        """
+        Returns:
+            AsyncResult | None: result of the aggregation step, None if there is nothing to do
+        """
+        from forum.tasks import fleet_sync_batch, fleet_sync_finish
+
+        batches = self.batches()
+        if not batches:
+            logger.info(f"fleet {self.operation}: nothing to sync")
+            return None
+
+        header = [
+            fleet_sync_batch.si(operation=self.operation, network=network, keys=keys)
+            for network, keys in batches
+        ]
+        callback = fleet_sync_finish.s(
+            operation=self.operation, started_at=timezone.now().timestamp()
+        )
+        logger.info(
+            f"fleet {self.operation}: {sum(len(keys) for _, keys in batches)} units "
+            f"in {len(batches)} batches"
+        )
+        return chord(header)(callback)
+
+    def run_batch(self, network, keys) -> dict:
+        """runs the units of one batch one after the other, recording every failure"""
+        outcome = {"network": network, "succeeded": 0, "failed": []}
+        for key in keys:
+            try:
+                self._run_unit(network, key)
+                outcome["succeeded"] += 1
+            except Exception as ex:
+                logger.error(f"fleet {self.operation}: {key} on network {network} failed: {str(ex)}")
+                outcome["failed"].append({"key": key, "error": str(ex)[:200]})
+        return outcome
+
+    def _run_unit(self, network, key):
+        if self.operation == self.TREASURY:
+            from forum.packages.services.status_service import UpdateStatus
+
+            UpdateStatus().update_treasury_balance(Dao.objects.get(id=key), raise_errors=True)
+        else:
+            from .presale_sync_service import PresaleStateSyncService
+
+            presales = Presale.objects.filter(
+                status=PresaleStatus.ACTIVE, dao__network=key
+            ).select_related("dao")
+            PresaleStateSyncService(key, presales).sync()
+
+    @staticmethod
+    def aggregate(outcomes) -> dict:
+        """merges the batch outcomes of the chord into one summary"""
+        summary = {"batches": len(outcomes), "succeeded": 0, "failed": 0, "failures": []}
+        networks = defaultdict(lambda: {"succeeded": 0, "failed": 0})
+        for outcome in outcomes:
+            summary["succeeded"] += outcome["succeeded"]
+            summary["failed"] += len(outcome["failed"])
+            summary["failures"] += [
+                {"network": outcome["network"], **failure} for failure in outcome["failed"]
+            ]
+            networks[outcome["network"]]["succeeded"] += outcome["succeeded"]
+            networks[outcome["network"]]["failed"] += len(outcome["failed"])
+        summary["networks"] = {str(network): counts for network, counts in networks.items()}
+        return summary
@@ -0,0 +1,161 @@
+import random
+from collections import defaultdict
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max
+from django.utils import timezone
+from dao.models import Dao, PresaleStatus
+from forum.models import Dip, DipStatus
+from services.utils.task_lock import enqueue_once
+from app.celery_routing import BACKGROUND
+from logging_config import logger
+
+
+class FleetSyncScheduler:
+    """
+    periodically enqueues incremental syncs for every active dao.
+
+    each dao is classified on every tick:
+        hot     - an active dip ends within FLEET_SYNC_HOT_WINDOW or a presale is live.
+                  dips whose voting already ended are left to the finalization task
+        warm    - active dips or forum activity within FLEET_SYNC_WARM_WINDOW
+        dormant - everything else
+
+    a dao is due once the interval of its tier has passed since it was last scheduled.
+    due daos are served most overdue first until the per-network job budget of the tick
+    is spent, the rest stays due for the next tick. jobs are spread over the tick with a
+    countdown so the workers and rpc providers never see them all at once.
+    """
+
+    HOT = "hot"
+    WARM = "warm"
+    DORMANT = "dormant"
+
+    LAST_SCHEDULED_KEY = "fleet:last_scheduled:{}"
+
+    def __init__(self, now=None):
+        self.now = now or timezone.now()
+        self.tick = settings.FLEET_SYNC_TICK
+        self.intervals = settings.FLEET_SYNC_INTERVALS
+        self.hot_window = settings.FLEET_SYNC_HOT_WINDOW
+        self.warm_window = settings.FLEET_SYNC_WARM_WINDOW
+
+    def _budget(self, network: int) -> int:
+        return settings.FLEET_SYNC_NETWORK_BUDGETS.get(
+            network, settings.FLEET_SYNC_NETWORK_BUDGET
+        )
+
+    def _load(self):
+        daos = list(
+            Dao.objects.filter(is_active=True)
+            .annotate(last_activity=Max("dip__updated_at"))
+            .only("id", "network", "updated_at")
+        )
+        active_dips = defaultdict(list)
+        for dip in Dip.objects.filter(
+            dao__in=daos, status=DipStatus.ACTIVE
+        ).values("id", "dao_id", "end_time"):
+            active_dips[dip["dao_id"]].append(dip)
+        live_presales = set(
+            Dao.objects.filter(
+                id__in=[dao.id for dao in daos], presales__status=PresaleStatus.ACTIVE
+            ).values_list("id", flat=True)
+        )
+        return daos, active_dips, live_presales
+
+    def classify(self, dao, active_dips, has_live_presale) -> str:
+        now_ts = self.now.timestamp()
+        if has_live_presale or any(
+            dip["end_time"] is not None
+            and now_ts <= dip["end_time"] <= now_ts + self.hot_window
+            for dip in active_dips
+        ):
+            return self.HOT
+
+        last_activity = max(filter(None, [dao.updated_at, dao.last_activity]))
+        if active_dips or (self.now - last_activity).total_seconds() <= self.warm_window:
+            return self.WARM
+        return self.DORMANT
+
+    def jobs(self, dao, tier, active_dips) -> list:
+        """(task, key, args) triples to enqueue for one dao"""
+        from forum.tasks import sync_proposals_task, sync_votes_task
+
+        # treasury balances are left to the six hourly treasury fleet sweep. the sweep
+        # reads settled blocks, the 15s propagation wait only serves user refreshes
+        jobs = [(sync_proposals_task, dao.id, (dao.id, False))]
+        if tier == self.DORMANT:
+            return jobs
+
+        now_ts = self.now.timestamp()
+        for dip in active_dips:
+            if dip["end_time"] is not None and dip["end_time"] < now_ts:
+                # voting is over, finalize_dip_status takes it from here
+                continue
+            jobs.append((sync_votes_task, dip["id"], (dip["id"], False)))
+        return jobs
+
+    def plan(self) -> dict:
+        """
+        Returns:
+            dict: network -> list of (dao, tier, jobs) due on this tick, within budget
+        """
+        daos, active_dips, live_presales = self._load()
+        last_scheduled = cache.get_many(
+            [self.LAST_SCHEDULED_KEY.format(dao.id) for dao in daos]
+        )
+
+        due = defaultdict(list)
+        for dao in daos:
+            tier = self.classify(dao, active_dips[dao.id], dao.id in live_presales)
+            last = last_scheduled.get(self.LAST_SCHEDULED_KEY.format(dao.id))
+            elapsed = self.now.timestamp() - last if last else None
+            if elapsed is not None and elapsed < self.intervals[tier]:
+                continue
+            # never scheduled daos go first, then by how far past their interval they are
+            overdue = float("inf") if elapsed is None else elapsed / self.intervals[tier]
+            due[dao.network].append((overdue, dao, tier))
+
+        plan = {}
+        for network, candidates in due.items():
+            budget = self._budget(network)
+            selected = []
+            for _, dao, tier in sorted(candidates, key=lambda item: -item[0]):
+                jobs = self.jobs(dao, tier, active_dips[dao.id])
+                if selected and budget < len(jobs):
+                    break
+                budget -= len(jobs)
+                selected.append((dao, tier, jobs))
+            if len(selected) < len(candidates):
+                logger.info(
+                    f"network {network}: rpc budget reached, deferred "
+                    f"{len(candidates) - len(selected)} daos to the next tick"
+                )
+            plan[network] = selected
+        return plan
+
+    def run(self) -> dict:
+        summary = {"daos": 0, "jobs": 0, "tiers": defaultdict(int)}
+        scheduled = {}
+
+        for network, selected in self.plan().items():
+            jobs = [job for _, _, dao_jobs in selected for job in dao_jobs]
+            slot = self.tick / max(len(jobs), 1)
+            for index, (task, key, args) in enumerate(jobs):
+                countdown = index * slot + random.uniform(0, slot)
+                try:
+                    enqueue_once(task, key, *args, countdown=countdown, lane=BACKGROUND)
+                    summary["jobs"] += 1
+                except Exception as ex:
+                    logger.error(f"failed to enqueue {task.name}[{key}]: {str(ex)}")
+
+            for dao, tier, _ in selected:
+                scheduled[self.LAST_SCHEDULED_KEY.format(dao.id)] = self.now.timestamp()
+                summary["tiers"][tier] += 1
+            summary["daos"] += len(selected)
+
+        # keys outlive the longest interval so dormant daos are not rescheduled early
+        cache.set_many(scheduled, timeout=2 * self.intervals[self.DORMANT])
+        summary["tiers"] = dict(summary["tiers"])
+        logger.info(f"fleet sync scheduled {summary['jobs']} jobs for {summary['daos']} daos")
+        return summary
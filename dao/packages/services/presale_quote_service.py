@@ -0,0 +1,90 @@
+from bisect import bisect_right
+from itertools import accumulate
+
+
+class PresaleQuoteService:
+    """
+    prices buys and sells against a cached tier schedule without any rpc call.
+
+    the schedule is turned into cumulative token boundaries once, so every quote is a
+    pair of lookups on the same arrays and a batch of amounts (e.g. a curve chart) is
+    priced in a single pass. prices are wei per whole token (10**18 units).
+    """
+
+    PRICE_PRECISION = 10**18
+
+    BUY = "buy"
+    SELL = "sell"
+
+    def __init__(self, tier_schedule, current_tier, remaining_in_tier):
+        if not tier_schedule:
+            raise ValueError("presale tier schedule is not available")
+
+        self.prices = [int(price) for price, _ in tier_schedule]
+        amounts = [int(amount) for _, amount in tier_schedule]
+        # boundaries[i] is the number of tokens sold before tier i starts
+        self.boundaries = [0, *accumulate(amounts)]
+        # cumulative[i] is the value (scaled by PRICE_PRECISION) of every token before tier i
+        self.cumulative = [
+            0,
+            *accumulate(amount * price for amount, price in zip(amounts, self.prices)),
+        ]
+        self.total_supply = self.boundaries[-1]
+
+        current_tier = min(int(current_tier), len(amounts) - 1)
+        self.sold = min(
+            self.total_supply,
+            self.boundaries[current_tier + 1] - int(remaining_in_tier),
+        )
+
+    @classmethod
+    def for_presale(cls, presale):
+        return cls(
+            presale.tier_schedule,
+            presale.current_tier,
+            presale.remaining_in_tier,
+        )
+
+    def _tier_at(self, position: int) -> int:
+        """index of the tier that sells the token at the given position"""
+        return min(bisect_right(self.boundaries, position) - 1, len(self.prices) - 1)
+
+    def _curve(self, position: int) -> int:
+        """scaled value of the first `position` tokens of the curve"""
+        tier = self._tier_at(position)
+        return self.cumulative[tier] + (position - self.boundaries[tier]) * self.prices[tier]
+
+    def _value(self, start: int, end: int) -> int:
+        """exact value in wei (floored) of the tokens between two curve positions"""
+        return (self._curve(end) - self._curve(start)) // self.PRICE_PRECISION
+
+    def quote(self, side: str, amount: int) -> dict:
+        amount = int(amount)
+        if side == self.BUY:
+            start, end = self.sold, self.sold + amount
+            available = end <= self.total_supply
+        elif side == self.SELL:
+            start, end = self.sold - amount, self.sold
+            available = start >= 0
+        else:
+            raise ValueError(f"invalid side: {side}")
+
+        if not available:
+            return {"amount": str(amount), "available": False}
+
+        value = self._value(start, end)
+        position = end if side == self.BUY else start
+        # the tier/price that applies to the next token after the trade
+        end_tier = self._tier_at(position)
+
+        return {
+            "amount": str(amount),
+            "available": True,
+            "eth_amount": str(value),
+            "average_price": str(value * self.PRICE_PRECISION // amount) if amount else "0",
+            "end_tier": end_tier,
+            "end_price": str(self.prices[end_tier]),
+        }
+
+    def quote_many(self, side: str, amounts) -> list:
+        return [self.quote(side, amount) for amount in amounts]
@@ -1,9 +1,19 @@
 from web3 import Web3
+from web3.exceptions import ContractLogicError
 from logging_config import logger
 from dao.models import Presale, PresaleStatus, PresaleTransaction
 from core.models import User
 from services.blockchain.blockchain_client import BlockchainClient
-import time
+from services.blockchain.log_store import (
+    LogStore,
+    LogDecoder,
+    TOKENS_PURCHASED_TOPIC,
+    TOKENS_SOLD_TOPIC,
+)
+from django.conf import settings
+from django.utils import timezone
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from services.utils.task_metrics import timed_sleep
 
 
 class PresaleService(BlockchainClient):
@@ -17,6 +27,18 @@ class PresaleService(BlockchainClient):
         super().__init__(dao_address=None, network=network, retries=retries)
         self.presale_contract = presale_contract
     
+    # fields written by apply_presale_state, used for bulk updates
+    STATE_FIELDS = [
+        "current_tier",
+        "current_price",
+        "remaining_in_tier",
+        "total_remaining",
+        "total_raised",
+        "status",
+        "state_refreshed_at",
+        "last_updated",
+    ]
+
     def update_presale_state(self, presale_instance):
         """
         Update the presale state by calling getPresaleState on the presale contract
@@ -32,26 +54,10 @@ class PresaleService(BlockchainClient):
                 logger.error(f"No presale contract address for presale {presale_instance.id}")
                 return None
             
-            # Get contract ABI
-            presale_abi = self.get_abi("presale_abi")
-            
-            # Create contract instance
-            contract_address = Web3.to_checksum_address(presale_instance.presale_contract)
-            contract = self.web3.eth.contract(address=contract_address, abi=presale_abi)
-                        
             # Call getPresaleState function
-            state = contract.functions.getPresaleState().call()
-            
-            # Update presale instance with state data
-            presale_instance.current_tier = state[0]
-            presale_instance.current_price = state[1]
-            presale_instance.remaining_in_tier = state[2]
-            presale_instance.total_remaining = state[3]
-            presale_instance.total_raised = state[4]
+            state = self._presale_contract(presale_instance).functions.getPresaleState().call()
             
-            # Update status based on total_remaining
-            if int(presale_instance.total_remaining) == 0:
-                presale_instance.status = PresaleStatus.COMPLETED
+            self.apply_presale_state(presale_instance, state)
             
             # Save the updated instance
             presale_instance.save()
@@ -62,6 +68,122 @@ class PresaleService(BlockchainClient):
         except Exception as ex:
             logger.error(f"Failed to update presale state: {str(ex)}")
             return None
+
+    def _presale_contract(self, presale_instance, web3=None):
+        web3 = web3 or self.web3
+        return web3.eth.contract(
+            address=Web3.to_checksum_address(presale_instance.presale_contract),
+            abi=self.get_abi("presale_abi"),
+        )
+
+    @staticmethod
+    def apply_presale_state(presale_instance, state):
+        """
+        Copy a getPresaleState() result onto the instance without saving it
+        
+        Args:
+            presale_instance: The Presale model instance
+            state: (current_tier, current_price, remaining_in_tier, total_remaining, total_raised)
+        """
+        presale_instance.current_tier = state[0]
+        presale_instance.current_price = state[1]
+        presale_instance.remaining_in_tier = state[2]
+        presale_instance.total_remaining = state[3]
+        presale_instance.total_raised = state[4]
+        
+        # Update status based on total_remaining
+        if int(presale_instance.total_remaining) == 0:
+            presale_instance.status = PresaleStatus.COMPLETED
+        presale_instance.state_refreshed_at = timezone.now()
+        presale_instance.last_updated = presale_instance.state_refreshed_at
+        return presale_instance
+
+    def read_presale_states(self, presales) -> dict:
+        """
+        Read getPresaleState() of many presales on this network at once
+        
+        The calls go out as a single JSON-RPC batch; providers that reject batches get a
+        concurrent fan-out instead, each pool thread on its own connection.
+        
+        Args:
+            presales: Presale instances deployed on self.network
+            
+        Returns:
+            dict mapping presale id to its state tuple, failed reads are left out
+        """
+        presales = [presale for presale in presales if presale.presale_contract]
+        if not presales:
+            return {}
+        
+        try:
+            with self.web3.batch_requests() as batch:
+                for presale in presales:
+                    batch.add(self._presale_contract(presale).functions.getPresaleState())
+                states = batch.execute()
+            return {presale.id: state for presale, state in zip(presales, states)}
+        except Exception as ex:
+            logger.warning(f"Batch getPresaleState failed, falling back to fan-out: {str(ex)}")
+        
+        def read(presale):
+            # connect() hands every pool thread its own web3 session
+            contract = self._presale_contract(presale, web3=self.connect())
+            return contract.functions.getPresaleState().call()
+        
+        states = {}
+        workers = min(len(presales), settings.PRESALE_STATE_CONCURRENCY)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(read, presale): presale for presale in presales}
+            for future in as_completed(futures):
+                presale = futures[future]
+                try:
+                    states[presale.id] = future.result()
+                except Exception as ex:
+                    logger.error(f"Failed to read presale state of {presale.id}: {str(ex)}")
+        return states
+            
+    MAX_TIERS = 100
+
+    def get_tier_schedule(self, presale_instance):
+        """
+        Read the immutable tier schedule of the presale contract once and store it on the instance
+        
+        Args:
+            presale_instance: The Presale model instance
+            
+        Returns:
+            List of [price, token_amount] pairs or None if the schedule could not be read
+        """
+        if presale_instance.tier_schedule:
+            return presale_instance.tier_schedule
+        
+        try:
+            contract = self.web3.eth.contract(
+                address=Web3.to_checksum_address(presale_instance.presale_contract),
+                abi=self.get_abi("presale_abi"),
+            )
+            
+            schedule = []
+            # tiers is a public array, reading past its end reverts. any other error
+            # leaves the schedule incomplete, it is not stored and read again next time
+            for index in range(self.MAX_TIERS):
+                try:
+                    price, token_amount, _ = contract.functions.tiers(index).call()
+                except ContractLogicError:
+                    break
+                schedule.append([str(price), str(token_amount)])
+            
+            if not schedule:
+                logger.error(f"No tiers found for presale {presale_instance.id}")
+                return None
+            
+            presale_instance.tier_schedule = schedule
+            presale_instance.save(update_fields=["tier_schedule"])
+            logger.info(f"Stored {len(schedule)} tiers for presale {presale_instance.id}")
+            return schedule
+        
+        except Exception as ex:
+            logger.error(f"Failed to read tier schedule: {str(ex)}")
+            return None
             
     def fetch_presale_events(self, presale_instance):
         """
@@ -96,127 +218,36 @@ class PresaleService(BlockchainClient):
                 block_scan_range = getattr(settings, 'BLOCKCHAIN_SCAN_BLOCK_RANGE', 10000)
                 from_block = max(0, self.web3.eth.block_number - block_scan_range)
             
-            # Get contract ABI and create contract instance
-            presale_abi = self.get_abi("presale_abi")
             contract_address = Web3.to_checksum_address(presale_instance.presale_contract)
-            contract = self.web3.eth.contract(address=contract_address, abi=presale_abi)
             
             # Get current block
             to_block = self.web3.eth.block_number
             
             # Wait 15 seconds before fetching blockchain data to allow transaction propagation
             logger.info("Waiting 15 seconds before fetching presale events from blockchain...")
-            time.sleep(15)
+            timed_sleep(15)
             
             logger.info(f"Fetching presale events from block {from_block} to {to_block}")
             
-            # Instead of using filters, use get_logs directly with the exact event signatures from Etherscan
-            # Using the exact topic hashes from Etherscan
-            token_purchased_topic = "0x8fafebcaf9d154343dad25669bfa277f4fbacd7ac6b0c4fed522580e040a0f33"
-            token_sold_topic = "0x2dcf9433d75db0d8b1c172641f85e319ffe4ad22e108a95d1847ceb906e5195d"
-            
-            logger.info(f"Fetching TokensPurchased events with topic: {token_purchased_topic}")
-            logger.info(f"Fetching TokensSold events with topic: {token_sold_topic}")
-            
-            # Get logs for TokensPurchased events
-            buy_logs = self.web3.eth.get_logs({
+            # One request for both TokensPurchased and TokensSold (topic0 OR filter).
+            # Logs are decoded directly, no per-log receipt fetch is needed.
+            logs = self.web3.eth.get_logs({
                 'fromBlock': from_block,
                 'toBlock': to_block,
                 'address': contract_address,
-                'topics': [token_purchased_topic]
+                'topics': [[TOKENS_PURCHASED_TOPIC, TOKENS_SOLD_TOPIC]]
             })
-            
-            # Get logs for TokensSold events
-            sell_logs = self.web3.eth.get_logs({
-                'fromBlock': from_block,
-                'toBlock': to_block,
-                'address': contract_address,
-                'topics': [token_sold_topic]
-            })
-            
-            # Process the logs to extract event data
-            buy_events = []
-            for log in buy_logs:
-                # Process each log to extract event data
-                receipt = self.web3.eth.get_transaction_receipt(log['transactionHash'])
-                processed_logs = contract.events.TokensPurchased().process_receipt(receipt)
-                for processed_log in processed_logs:
-                    if processed_log['address'].lower() == contract_address.lower():
-                        buy_events.append(processed_log)
-            
-            sell_events = []
-            for log in sell_logs:
-                # Process each log to extract event data
-                receipt = self.web3.eth.get_transaction_receipt(log['transactionHash'])
-                processed_logs = contract.events.TokensSold().process_receipt(receipt)
-                for processed_log in processed_logs:
-                    if processed_log['address'].lower() == contract_address.lower():
-                        sell_events.append(processed_log)
+            rows = LogStore.store(self.network, logs)
             
             # Process events
             processed_transactions = []
             
-            # Process buy events
-            for event in buy_events:
-                tx_hash = event['transactionHash'].hex()
-                # Check if transaction already exists
-                if PresaleTransaction.objects.filter(transaction_hash=tx_hash).exists():
-                    continue
-                    
-                # Get user or create if doesn't exist
-                buyer_address = Web3.to_checksum_address(event['args']['buyer'])
-                # Use lowercase address to match authentication flow
-                user = User.objects.filter(eth_address__iexact=buyer_address).first()
-                if not user:
-                    user = User.objects.create(eth_address=buyer_address.lower())
-                
-                # Scale down token and ETH amounts by 10^18 to avoid numeric overflow
-                token_amount = int(event['args']['tokenAmount']) / 10**18
-                eth_amount = int(event['args']['ethAmount']) / 10**18
-                
-                # Create transaction record
-                transaction = PresaleTransaction.objects.create(
-                    presale=presale_instance,
-                    user=user,
-                    action=PresaleTransaction.ActionChoices.BUY,
-                    token_amount=token_amount,
-                    eth_amount=eth_amount,
-                    block_number=event['blockNumber'],
-                    transaction_hash=tx_hash
-                )
-                processed_transactions.append(transaction)
-                logger.info(f"Processed buy event: {tx_hash}")
-            
-            # Process sell events
-            for event in sell_events:
-                tx_hash = event['transactionHash'].hex()
-                # Check if transaction already exists
-                if PresaleTransaction.objects.filter(transaction_hash=tx_hash).exists():
-                    continue
-                    
-                # Get user or create if doesn't exist
-                seller_address = Web3.to_checksum_address(event['args']['seller'])
-                # Use lowercase address to match authentication flow
-                user = User.objects.filter(eth_address__iexact=seller_address).first()
-                if not user:
-                    user = User.objects.create(eth_address=seller_address.lower())
-                
-                # Scale down token and ETH amounts by 10^18 to avoid numeric overflow
-                token_amount = int(event['args']['tokenAmount']) / 10**18
-                eth_amount = int(event['args']['ethAmount']) / 10**18
-                
-                # Create transaction record
-                transaction = PresaleTransaction.objects.create(
-                    presale=presale_instance,
-                    user=user,
-                    action=PresaleTransaction.ActionChoices.SELL,
-                    token_amount=token_amount,
-                    eth_amount=eth_amount,
-                    block_number=event['blockNumber'],
-                    transaction_hash=tx_hash
-                )
-                processed_transactions.append(transaction)
-                logger.info(f"Processed sell event: {tx_hash}")
+            for row in rows:
+                trade = LogDecoder.decode_presale_trade(row)
+                transaction = self.save_trade(presale_instance, trade)
+                if transaction:
+                    processed_transactions.append(transaction)
+                    logger.info(f"Processed {trade['action'].lower()} event: {trade['transaction_hash']}")
             
             logger.info(f"Processed {len(processed_transactions)} new transactions for presale {presale_instance.id}")
             return processed_transactions
@@ -224,3 +255,42 @@ class PresaleService(BlockchainClient):
         except Exception as ex:
             logger.error(f"Failed to fetch presale events: {str(ex)}")
             return []
+
+    @staticmethod
+    def save_trade(presale_instance, trade, overwrite=False):
+        """
+        Persist a decoded TokensPurchased/TokensSold event as a PresaleTransaction
+        
+        Args:
+            presale_instance: The Presale model instance
+            trade: dict produced by LogDecoder.decode_presale_trade
+            overwrite: replace an already stored transaction (used when reprocessing raw logs)
+            
+        Returns:
+            The PresaleTransaction or None if it was already stored and overwrite is False
+        """
+        tx_hash = trade["transaction_hash"]
+        # Check if transaction already exists
+        if not overwrite and PresaleTransaction.objects.filter(transaction_hash=tx_hash).exists():
+            return None
+        
+        # Get user or create if doesn't exist
+        account = Web3.to_checksum_address(trade["account"])
+        # Use lowercase address to match authentication flow
+        user = User.objects.filter(eth_address__iexact=account).first()
+        if not user:
+            user = User.objects.create(eth_address=account.lower())
+        
+        # Scale down token and ETH amounts by 10^18 to avoid numeric overflow
+        transaction, created = PresaleTransaction.objects.update_or_create(
+            transaction_hash=tx_hash,
+            defaults={
+                "presale": presale_instance,
+                "user": user,
+                "action": trade["action"],
+                "token_amount": int(trade["token_amount"]) / 10**18,
+                "eth_amount": int(trade["eth_amount"]) / 10**18,
+                "block_number": trade["block_number"],
+            },
+        )
+        return transaction
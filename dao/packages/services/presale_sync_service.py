@@ -0,0 +1,137 @@
+from collections import defaultdict
+from django.conf import settings
+from django.utils import timezone
+from web3 import Web3
+from dao.models import Presale, PresaleStatus
+from services.blockchain.log_store import (
+    LogStore,
+    LogDecoder,
+    TOKENS_PURCHASED_TOPIC,
+    TOKENS_SOLD_TOPIC,
+)
+from .presale_service import PresaleService
+from logging_config import logger
+
+
+class PresaleStateSyncService:
+    """
+    event driven refresh of active presales on one network.
+
+    a single get_logs call covers every active presale address of the network, trades are
+    stored as they are found and getPresaleState is only read for presales that traded
+    since the last scan or whose state is older than PRESALE_STATE_HEARTBEAT. the state
+    reads go out as one batch and all rows are written back with bulk_update.
+    """
+
+    def __init__(self, network: int, presales):
+        self.network = network
+        self.presales = list(presales)
+        self.block_range = getattr(settings, "BLOCKCHAIN_SCAN_BLOCK_RANGE", 10000)
+        self.heartbeat = settings.PRESALE_STATE_HEARTBEAT
+        self.client = PresaleService(network=network)
+
+    @classmethod
+    def sync_active(cls) -> dict:
+        """runs one event scan and one batched state read per network that has active presales"""
+        by_network = defaultdict(list)
+        # one query for every active presale together with its dao network
+        for presale in Presale.objects.filter(status=PresaleStatus.ACTIVE).select_related("dao"):
+            by_network[presale.dao.network].append(presale)
+
+        summary = {"networks": 0, "scanned": 0, "refreshed": [], "trades": 0}
+        for network, presales in by_network.items():
+            try:
+                result = cls(network, presales).sync()
+            except Exception as ex:
+                logger.error(f"presale sync failed for network {network}: {str(ex)}")
+                continue
+            summary["networks"] += 1
+            summary["scanned"] += result["scanned"]
+            summary["refreshed"] += result["refreshed"]
+            summary["trades"] += result["trades"]
+        return summary
+
+    def _start_block(self, presale, to_block: int) -> int:
+        if presale.last_synced_block:
+            return presale.last_synced_block + 1
+        if presale.deployment_block:
+            return presale.deployment_block
+        return max(0, to_block - self.block_range)
+
+    def _fetch_trade_logs(self, from_block: int, to_block: int) -> list:
+        addresses = [
+            Web3.to_checksum_address(presale.presale_contract) for presale in self.presales
+        ]
+        logs = []
+        # stay inside the provider's get_logs range limit
+        for start in range(from_block, to_block + 1, self.block_range):
+            end = min(to_block, start + self.block_range - 1)
+            logs += self.client.web3.eth.get_logs(
+                {
+                    "fromBlock": start,
+                    "toBlock": end,
+                    "address": addresses,
+                    "topics": [[TOKENS_PURCHASED_TOPIC, TOKENS_SOLD_TOPIC]],
+                }
+            )
+        return LogStore.store(self.network, logs)
+
+    def _is_stale(self, presale, now) -> bool:
+        return (
+            presale.state_refreshed_at is None
+            or now - presale.state_refreshed_at >= self.heartbeat
+        )
+
+    def sync(self) -> dict:
+        to_block = self.client.web3.eth.block_number
+        start_blocks = {presale.id: self._start_block(presale, to_block) for presale in self.presales}
+        from_block = min(start_blocks.values(), default=to_block + 1)
+
+        rows = self._fetch_trade_logs(from_block, to_block) if from_block <= to_block else []
+
+        presales_by_address = {
+            presale.presale_contract.lower(): presale for presale in self.presales
+        }
+        traded = set()
+        trades = 0
+        for row in rows:
+            presale = presales_by_address.get(row.address)
+            if not presale or row.block_number < start_blocks[presale.id]:
+                continue
+            if PresaleService.save_trade(presale, LogDecoder.decode_presale_trade(row)):
+                trades += 1
+            traded.add(presale.id)
+
+        now = timezone.now()
+        due = [
+            presale
+            for presale in self.presales
+            if presale.id in traded or self._is_stale(presale, now)
+        ]
+        states = self.client.read_presale_states(due)
+
+        refreshed, unchanged = [], []
+        for presale in self.presales:
+            if presale.id in states:
+                # also flips the status to COMPLETED once nothing is left to sell
+                PresaleService.apply_presale_state(presale, states[presale.id])
+                refreshed.append(presale)
+            elif presale.id in traded:
+                # the state read failed, keep the cursor so the next scan finds these
+                # trades again and retries the read
+                continue
+            else:
+                unchanged.append(presale)
+            presale.last_synced_block = to_block
+
+        Presale.objects.bulk_update(
+            refreshed, ["last_synced_block", *PresaleService.STATE_FIELDS]
+        )
+        Presale.objects.bulk_update(unchanged, ["last_synced_block"])
+        refreshed = [presale.id for presale in refreshed]
+
+        logger.info(
+            f"network {self.network}: scanned {len(self.presales)} presales up to block "
+            f"{to_block}, {trades} new trades, refreshed {len(refreshed)}"
+        )
+        return {"scanned": len(self.presales), "refreshed": refreshed, "trades": trades}
@@ -0,0 +1,166 @@
+from django.db import transaction
+from django.db.models import F
+from dao.models import ChainLog, Contract, Presale
+from forum.models import Dip, DipStatus
+from forum.packages.services.vote_service import VoteService
+from services.blockchain.default_proposal_content import (
+    DEFAULT_BLOCKCHAIN_PROPOSAL_CONTENT,
+)
+from services.blockchain.log_store import (
+    LogStore,
+    LogDecoder,
+    VOTED_TOPIC,
+    PROPOSAL_CREATED_TOPIC,
+    TOKENS_PURCHASED_TOPIC,
+    TOKENS_SOLD_TOPIC,
+)
+from .presale_service import PresaleService
+from logging_config import logger
+
+
+class LogReprocessService:
+    """rebuilds Vote, PresaleTransaction and Dip rows from the raw log store without any rpc call"""
+
+    KINDS = ("dips", "votes", "presale")
+
+    def __init__(self, network=None, address=None, chunk_size=1000):
+        self.network = network
+        self.address = address.lower() if address else None
+        self.chunk_size = chunk_size
+        self._contracts = {}
+        self._presales = {}
+        self._dips = {}
+
+    def _logs(self, *topics):
+        queryset = ChainLog.objects.filter(topics__0__in=list(topics))
+        if self.network is not None:
+            queryset = queryset.filter(network=self.network)
+        if self.address:
+            queryset = queryset.filter(address=self.address)
+        return queryset
+
+    def _contract(self, row):
+        key = (row.network, row.address)
+        if key not in self._contracts:
+            self._contracts[key] = (
+                Contract.objects.select_related("dao")
+                .filter(dao_address__iexact=row.address, dao__network=row.network)
+                .first()
+            )
+        return self._contracts[key]
+
+    def _presale(self, row):
+        key = (row.network, row.address)
+        if key not in self._presales:
+            self._presales[key] = Presale.objects.filter(
+                presale_contract__iexact=row.address, dao__network=row.network
+            ).first()
+        return self._presales[key]
+
+    def _dip(self, dao, proposal_id):
+        key = (dao.id, proposal_id)
+        if key not in self._dips:
+            self._dips[key] = Dip.objects.filter(
+                dao=dao, proposal_id=proposal_id
+            ).first()
+        return self._dips[key]
+
+    def reprocess(self, kinds=None) -> dict:
+        """
+        replays stored logs in primary key order, one transaction per chunk
+
+        Returns:
+            dict: processed row counts per kind
+        """
+        kinds = kinds or self.KINDS
+        summary = {}
+        # dips first, votes need the dip rows to exist
+        for kind in self.KINDS:
+            if kind in kinds:
+                summary[kind] = getattr(self, f"reprocess_{kind}")()
+        return summary
+
+    def reprocess_dips(self) -> int:
+        processed = 0
+        for chunk in LogStore.stream(self._logs(PROPOSAL_CREATED_TOPIC), self.chunk_size):
+            with transaction.atomic():
+                for row in chunk:
+                    contract = self._contract(row)
+                    if not contract:
+                        continue
+                    self._apply_proposal(contract.dao, LogDecoder.decode_proposal_created(row))
+                    processed += 1
+            logger.info(f"reprocessed {processed} proposal logs")
+        return processed
+
+    def _apply_proposal(self, dao, proposal):
+        proposal_id = proposal["proposal_id"]
+        proposal_type = proposal["proposal_type"]
+
+        payload = {}
+        if proposal_type == 0:  # Transfer
+            payload = {
+                "token": proposal["token"],
+                "recipient": proposal["recipient"],
+                "amount": proposal["amount"],
+            }
+        elif proposal_type == 1:  # Upgrade
+            payload = {"version": proposal["version"]}
+
+        dip = self._dip(dao, proposal_id)
+        if dip:
+            dip.proposal_type = proposal_type
+            dip.proposal_data = {**(dip.proposal_data or {}), **payload}
+            dip.save(update_fields=["proposal_type", "proposal_data"])
+            return dip
+
+        dip = Dip.objects.create(
+            dao=dao,
+            author=dao.owner,
+            status=DipStatus.ACTIVE,
+            proposal_data=payload,
+            proposal_id=proposal_id,
+            proposal_type=proposal_type,
+            title="Direct Proposal from Blockchain",
+            content=DEFAULT_BLOCKCHAIN_PROPOSAL_CONTENT,
+        )
+        dao.dip_count = F("dip_count") + 1
+        dao.save(update_fields=["dip_count"])
+        self._dips[(dao.id, proposal_id)] = dip
+        return dip
+
+    def reprocess_votes(self) -> int:
+        processed = 0
+        for chunk in LogStore.stream(self._logs(VOTED_TOPIC), self.chunk_size):
+            votes_by_dip = {}
+            for row in chunk:
+                contract = self._contract(row)
+                if not contract:
+                    continue
+                vote = LogDecoder.decode_vote(row)
+                dip = self._dip(contract.dao, vote.pop("proposal_id"))
+                if not dip:
+                    logger.warning(f"no dip for vote log {row.transaction_hash}:{row.log_index}")
+                    continue
+                votes_by_dip.setdefault(dip, []).append(vote)
+
+            with transaction.atomic():
+                for dip, votes in votes_by_dip.items():
+                    processed += len(VoteService.save_votes(dip, votes, overwrite=True))
+            logger.info(f"reprocessed {processed} vote logs")
+        return processed
+
+    def reprocess_presale(self) -> int:
+        processed = 0
+        logs = self._logs(TOKENS_PURCHASED_TOPIC, TOKENS_SOLD_TOPIC)
+        for chunk in LogStore.stream(logs, self.chunk_size):
+            with transaction.atomic():
+                for row in chunk:
+                    presale = self._presale(row)
+                    if not presale:
+                        continue
+                    trade = LogDecoder.decode_presale_trade(row)
+                    PresaleService.save_trade(presale, trade, overwrite=True)
+                    processed += 1
+            logger.info(f"reprocessed {processed} presale logs")
+        return processed
@@ -433,3 +433,16 @@ class PresaleTransactionSerializer(serializers.ModelSerializer):
             if field in representation:
                 representation[field] = str(representation[field])
         return representation
+
+
+class PresaleQuoteSerializer(serializers.Serializer):
+    """Validates quote query parameters: a side and one or more token amounts (wei)"""
+
+    MAX_AMOUNTS = 200
+
+    side = serializers.ChoiceField(choices=["buy", "sell"], default="buy")
+    amount = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        min_length=1,
+        max_length=MAX_AMOUNTS,
+    )
@@ -0,0 +1,76 @@
+from io import StringIO
+from unittest.mock import MagicMock, patch
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from dao.packages.services.fleet_fanout_service import FleetFanout
+from dao.tests.dao_utils import DaoFactoryMixin
+
+
+@override_settings(FLEET_FANOUT_NETWORK_CONCURRENCY=2, FLEET_FANOUT_NETWORK_CONCURRENCIES={})
+class FleetFanoutTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.sepolia = [DaoFactoryMixin().create_dao(slug=f"dao-{i}") for i in range(5)]
+        cls.base = DaoFactoryMixin().create_dao(slug="base-dao", network=8453)
+
+    def test_batches_respect_the_network_cap(self):
+        batches = FleetFanout(FleetFanout.TREASURY).batches()
+
+        by_network = {}
+        for network, keys in batches:
+            by_network.setdefault(network, []).append(keys)
+        self.assertEqual(len(by_network[11155111]), 2)
+        self.assertEqual(
+            sorted(key for keys in by_network[11155111] for key in keys),
+            [dao.id for dao in self.sepolia],
+        )
+        self.assertEqual(by_network[8453], [[self.base.id]])
+
+    @patch("forum.packages.services.status_service.UpdateStatus.update_treasury_balance")
+    def test_partial_failures_are_reported(self, update_treasury_balance):
+        failing = self.sepolia[1].id
+
+        def update(dao, **kwargs):
+            if dao.id == failing:
+                raise ConnectionError("rpc down")
+
+        update_treasury_balance.side_effect = update
+
+        fanout = FleetFanout(FleetFanout.TREASURY)
+        outcomes = [fanout.run_batch(network, keys) for network, keys in fanout.batches()]
+        summary = FleetFanout.aggregate(outcomes)
+
+        self.assertEqual(summary["succeeded"], 5)
+        self.assertEqual(summary["failed"], 1)
+        self.assertEqual(summary["failures"][0]["key"], failing)
+        self.assertEqual(summary["networks"]["11155111"], {"succeeded": 4, "failed": 1})
+
+    @patch("dao.packages.services.fleet_fanout_service.chord")
+    def test_start_publishes_one_chord(self, mock_chord):
+        FleetFanout(FleetFanout.TREASURY).start()
+
+        header = mock_chord.call_args.args[0]
+        self.assertEqual(len(header), 3)
+        self.assertEqual(header[0].kwargs["operation"], "treasury")
+        mock_chord.return_value.assert_called_once()
+
+    def test_nothing_to_do_without_active_presales(self):
+        self.assertIsNone(FleetFanout(FleetFanout.PRESALES).start())
+
+    @patch("dao.management.commands.fleet_sweep.FleetFanout.start")
+    def test_command_prints_a_truncated_summary(self, start):
+        start.return_value = MagicMock(id="sweep")
+        start.return_value.get.return_value = {
+            "status": "partial",
+            "failed": 1,
+            "wall_time": 3.2,
+            "truncated": ["failures", "networks"],
+        }
+
+        out = StringIO()
+        call_command("fleet_sweep", FleetFanout.TREASURY, "--wait", stdout=out)
+
+        self.assertIn("Summary truncated, dropped: failures, networks", out.getvalue())
+        self.assertIn("Sweep partial in 3.2s", out.getvalue())
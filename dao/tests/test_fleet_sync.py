@@ -0,0 +1,75 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from dao.packages.services.fleet_sync_service import FleetSyncScheduler
+from dao.tests.dao_utils import DaoFactoryMixin
+from forum.tests.forum_utils import DipBaseMixin
+
+
+class FleetSyncSchedulerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.hot_dao = DaoFactoryMixin().create_dao(slug="hot")
+        # the factory passes the network as a string, read it back as stored
+        cls.hot_dao.refresh_from_db()
+        dip = DipBaseMixin(dao=cls.hot_dao, author=cls.hot_dao.owner).create_dip()
+        dip.end_time = int((timezone.now() + timedelta(minutes=30)).timestamp())
+        dip.save()
+        cls.dip = dip
+
+        cls.dormant_dao = DaoFactoryMixin().create_dao(slug="dormant")
+
+    def setUp(self):
+        cache.clear()
+
+    def test_classifies_daos_by_activity(self):
+        scheduler = FleetSyncScheduler(now=timezone.now() + timedelta(days=30))
+        self.dip.end_time = int((scheduler.now + timedelta(minutes=30)).timestamp())
+        self.dip.save()
+        plan = scheduler.plan()
+
+        tiers = {dao.id: tier for dao, tier, _ in plan[self.hot_dao.network]}
+        self.assertEqual(tiers[self.hot_dao.id], FleetSyncScheduler.HOT)
+        self.assertEqual(tiers[self.dormant_dao.id], FleetSyncScheduler.DORMANT)
+
+    def test_ended_dip_is_left_to_finalization(self):
+        # voting ended a month ago, the dip still waits for finalize_dip_status
+        scheduler = FleetSyncScheduler(now=timezone.now() + timedelta(days=30))
+        plan = scheduler.plan()
+
+        planned = {dao.id: (tier, jobs) for dao, tier, jobs in plan[self.hot_dao.network]}
+        tier, jobs = planned[self.hot_dao.id]
+        self.assertEqual(tier, FleetSyncScheduler.WARM)
+        self.assertNotIn("blockchain.sync_votes", [task.name for task, _, _ in jobs])
+
+    @patch("dao.packages.services.fleet_sync_service.enqueue_once")
+    def test_run_enqueues_due_daos_once_per_interval(self, mock_enqueue):
+        summary = FleetSyncScheduler().run()
+
+        task_names = [call.args[0].name for call in mock_enqueue.call_args_list]
+        self.assertEqual(summary["daos"], 2)
+        self.assertIn("blockchain.sync_votes", task_names)
+        self.assertEqual(task_names.count("blockchain.sync_proposals"), 2)
+        for call in mock_enqueue.call_args_list:
+            self.assertLessEqual(call.kwargs["countdown"], FleetSyncScheduler().tick)
+            # background syncs skip the propagation wait
+            self.assertIs(call.args[-1], False)
+
+        mock_enqueue.reset_mock()
+        summary = FleetSyncScheduler().run()
+
+        self.assertEqual(summary["daos"], 0)
+        mock_enqueue.assert_not_called()
+
+    @patch("dao.packages.services.fleet_sync_service.enqueue_once")
+    def test_run_respects_network_budget(self, mock_enqueue):
+        with self.settings(FLEET_SYNC_NETWORK_BUDGET=2):
+            summary = FleetSyncScheduler().run()
+
+        # the first dao always goes out, the second one waits for the next tick
+        self.assertEqual(summary["daos"], 1)
+        self.assertEqual(mock_enqueue.call_count, summary["jobs"])
@@ -7,6 +7,9 @@ from .dao_utils import DaoBaseMixin, DaoFactoryMixin, PresaleFactoryMixin
 from core.helpers.create_user import create_user
 from dao.models import Presale, PresaleTransaction, PresaleStatus, Dao
 from unittest.mock import patch, MagicMock
+from web3.exceptions import ContractLogicError
+
+from dao.packages.services.presale_service import PresaleService
 
 from logging_config import logger
 
@@ -190,26 +193,21 @@ class PresaleAPITest(APITestCase):
             )
 
         # Test first page
-        response = self.client.get(
-            f"{self.url_prefix}{self.presale.id}/transactions/",
-            {"page": 1, "page_size": 10},
-        )
+        response = self.client.get(f"{self.url_prefix}{self.presale.id}/transactions/")
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data["data"]["results"]), 10)
-        self.assertEqual(response.data["data"]["count"], 15)
         self.assertIsNotNone(response.data["data"]["next"])
         self.assertIsNone(response.data["data"]["previous"])
-        # # Test second page
-        response = self.client.get(
-            f"{self.url_prefix}{self.presale.id}/transactions/",
-            {"page": 2, "page_size": 10},
-        )
+        first_page = response.data["data"]["results"]
+        # # Test second page, reached through the cursor of the first
+        response = self.client.get(response.data["data"]["next"])
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data["data"]["results"]), 5)
-        self.assertEqual(response.data["data"]["count"], 15)
         self.assertIsNone(response.data["data"]["next"])
         self.assertIsNotNone(response.data["data"]["previous"])
+        hashes = {tx["transaction_hash"] for tx in first_page + response.data["data"]["results"]}
+        self.assertEqual(len(hashes), 15)
 
     def test_presale_status_update(self):
         """Test that presale status is updated when total_remaining becomes zero"""
@@ -457,3 +455,73 @@ class PresaleAPITest(APITestCase):
                 block_number=1001,
                 transaction_hash="0x1234567890123456789012345678901234567890123456789012345678901234",
             )
+
+    def _read_tier_schedule(self, presale, *results):
+        web3 = MagicMock()
+        web3.eth.block_number = 100
+        web3.eth.contract.return_value.functions.tiers.return_value.call.side_effect = results
+        with patch(
+            "services.blockchain.blockchain_client.BlockchainClient.connect",
+            return_value=web3,
+        ):
+            return PresaleService(network=11155111).get_tier_schedule(presale)
+
+    def test_tier_schedule_ends_at_the_reverting_index(self):
+        """Test that reading past the tiers array ends and stores the schedule"""
+        presale = self.presale_base.create_presale(self.dao)
+        schedule = self._read_tier_schedule(
+            presale, (10, 100, 0), (20, 100, 0), ContractLogicError("execution reverted")
+        )
+
+        self.assertEqual(schedule, [["10", "100"], ["20", "100"]])
+        presale.refresh_from_db()
+        self.assertEqual(presale.tier_schedule, schedule)
+
+    def test_tier_schedule_is_not_stored_after_a_failed_read(self):
+        """Test that an rpc error partway through leaves no truncated schedule behind"""
+        presale = self.presale_base.create_presale(self.dao)
+        schedule = self._read_tier_schedule(presale, (10, 100, 0), TimeoutError("read timed out"))
+
+        self.assertIsNone(schedule)
+        presale.refresh_from_db()
+        self.assertFalse(presale.tier_schedule)
+
+    @patch("dao.packages.services.presale_service.PresaleService.get_tier_schedule")
+    def test_presale_quote_batch_uses_cached_schedule(self, mock_get_tier_schedule):
+        """Test that quotes are computed locally from the stored tier schedule"""
+        one = 10**18
+        test_dao = self.dao_base.create_dao(slug="quotedao", network=11155111)
+        presale = Presale.objects.create(
+            dao=test_dao,
+            presale_contract="0x1234567890123456789012345678901234567890",
+            total_token_amount=200 * one,
+            initial_price=one // 100,
+            status=PresaleStatus.ACTIVE,
+            current_tier=0,
+            remaining_in_tier=50 * one,
+            tier_schedule=[[str(one // 100), str(100 * one)], [str(one // 50), str(100 * one)]],
+        )
+
+        response = self.client.get(
+            f"{self.url_prefix}{presale.id}/quote/",
+            {"side": "buy", "amount": [50 * one, 100 * one, 151 * one]},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        mock_get_tier_schedule.assert_not_called()
+        quotes = response.data["quotes"]
+        self.assertEqual(quotes[0]["eth_amount"], str(one // 2))
+        self.assertEqual(quotes[1]["eth_amount"], str(3 * one // 2))
+        self.assertEqual(quotes[1]["end_tier"], 1)
+        self.assertFalse(quotes[2]["available"])
+
+        response = self.client.get(
+            f"{self.url_prefix}{presale.id}/quote/", {"side": "sell", "amount": 10 * one}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["quotes"][0]["eth_amount"], str(one // 10))
+
+    def test_presale_quote_requires_amount(self):
+        response = self.client.get(f"{self.url_prefix}{self.presale.id}/quote/")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,111 @@
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+from django.test import TestCase
+from django.utils import timezone
+from eth_abi import encode
+
+from dao.models import Presale, PresaleTransaction
+from dao.packages.services.presale_sync_service import PresaleStateSyncService
+from dao.tests.dao_utils import PresaleFactoryMixin
+from services.blockchain.log_store import TOKENS_PURCHASED_TOPIC
+
+
+class PresaleStateSyncTests(TestCase):
+    """only presales with new trade logs or a stale heartbeat are re-read"""
+
+    # current_tier, current_price, remaining_in_tier, total_remaining, total_raised
+    STATE = (2, 30, 100, 500, 7000)
+
+    @classmethod
+    def setUpTestData(cls):
+        factory = PresaleFactoryMixin()
+        cls.dao = factory.create_dao()
+        cls.traded = factory.create_presale(cls.dao)
+        cls.idle = Presale.objects.create(
+            dao=cls.dao,
+            presale_contract="0x0987654321098765432109876543210987654321",
+            total_token_amount=1000,
+            initial_price=10,
+            status=cls.traded.status,
+            last_synced_block=90,
+            state_refreshed_at=timezone.now(),
+        )
+        cls.traded.last_synced_block = 90
+        cls.traded.state_refreshed_at = timezone.now()
+        cls.traded.save()
+
+    def _web3(self, logs):
+        web3 = MagicMock()
+        web3.eth.block_number = 100
+        web3.eth.get_logs.return_value = logs
+        return web3
+
+    def _trade_log(self, presale):
+        return {
+            "address": presale.presale_contract,
+            "blockNumber": 95,
+            "transactionHash": "0x" + "d" * 64,
+            "logIndex": 0,
+            "topics": [TOKENS_PURCHASED_TOPIC, "0x" + "0" * 24 + "1" * 40],
+            "data": "0x" + encode(["uint256", "uint256"], [10**18, 10**18]).hex(),
+        }
+
+    def test_sync_refreshes_only_traded_presales(self):
+        web3 = self._web3([self._trade_log(self.traded)])
+        with patch(
+            "services.blockchain.blockchain_client.BlockchainClient.connect",
+            return_value=web3,
+        ), patch(
+            "dao.packages.services.presale_service.PresaleService.read_presale_states",
+            side_effect=lambda presales: {presale.id: self.STATE for presale in presales},
+        ) as read_states:
+            result = PresaleStateSyncService(
+                self.dao.network, [self.traded, self.idle]
+            ).sync()
+
+        self.assertEqual(web3.eth.get_logs.call_count, 1)
+        read_states.assert_called_once_with([self.traded])
+        self.assertEqual(result["refreshed"], [self.traded.id])
+        self.traded.refresh_from_db()
+        self.assertEqual(self.traded.current_tier, 2)
+        self.assertEqual(self.traded.last_synced_block, 100)
+        self.assertEqual(result["trades"], 1)
+        self.assertTrue(PresaleTransaction.objects.filter(presale=self.traded).exists())
+
+        self.idle.refresh_from_db()
+        self.assertEqual(self.idle.last_synced_block, 100)
+
+    def test_sync_refreshes_stale_presales_without_trades(self):
+        self.idle.state_refreshed_at = timezone.now() - timedelta(days=30)
+        self.idle.save()
+
+        with patch(
+            "services.blockchain.blockchain_client.BlockchainClient.connect",
+            return_value=self._web3([]),
+        ), patch(
+            "dao.packages.services.presale_service.PresaleService.read_presale_states",
+            side_effect=lambda presales: {presale.id: self.STATE for presale in presales},
+        ):
+            result = PresaleStateSyncService(self.dao.network, [self.idle]).sync()
+
+        self.assertEqual(result["refreshed"], [self.idle.id])
+        self.assertEqual(result["trades"], 0)
+
+    def test_failed_state_read_keeps_the_cursor_of_traded_presales(self):
+        with patch(
+            "services.blockchain.blockchain_client.BlockchainClient.connect",
+            return_value=self._web3([self._trade_log(self.traded)]),
+        ), patch(
+            "dao.packages.services.presale_service.PresaleService.read_presale_states",
+            return_value={},
+        ):
+            result = PresaleStateSyncService(
+                self.dao.network, [self.traded, self.idle]
+            ).sync()
+
+        self.assertEqual(result["refreshed"], [])
+        self.traded.refresh_from_db()
+        self.assertEqual(self.traded.last_synced_block, 90)
+        self.idle.refresh_from_db()
+        self.assertEqual(self.idle.last_synced_block, 100)
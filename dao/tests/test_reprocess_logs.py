@@ -0,0 +1,90 @@
+from django.core.management import call_command
+from django.test import TestCase
+from eth_abi import encode
+
+from dao.models import ChainLog, PresaleTransaction
+from dao.tests.dao_utils import PresaleFactoryMixin
+from forum.models import Vote
+from forum.tests.forum_utils import DipBaseMixin
+from services.blockchain.log_store import (
+    VOTED_TOPIC,
+    TOKENS_PURCHASED_TOPIC,
+    TOKENS_SOLD_TOPIC,
+)
+
+
+def _topic(value: int) -> str:
+    return "0x" + hex(value)[2:].zfill(64)
+
+
+def _address_topic(address: str) -> str:
+    return "0x" + address.lower()[2:].zfill(64)
+
+
+class ReprocessLogsTests(TestCase):
+    """rebuilding rows from the raw log store must not need any rpc connection"""
+
+    @classmethod
+    def setUpTestData(cls):
+        factory = PresaleFactoryMixin()
+        cls.dao = factory.create_dao()
+        cls.presale = factory.create_presale(cls.dao)
+        cls.contract = cls.dao.contracts.first()
+        cls.dip = DipBaseMixin(dao=cls.dao, author=cls.dao.owner).create_dip()
+        cls.voter = "0x74fbbb0be04653f29bd4b2601431e87f9b811319"
+
+        ChainLog.objects.create(
+            network=cls.dao.network,
+            address=cls.contract.dao_address.lower(),
+            block_number=10,
+            transaction_hash="0x" + "a" * 64,
+            log_index=0,
+            topics=[VOTED_TOPIC, _topic(cls.dip.proposal_id), _address_topic(cls.voter)],
+            data="0x" + encode(["bool", "uint256"], [True, 5 * 10**18]).hex(),
+        )
+        ChainLog.objects.create(
+            network=cls.dao.network,
+            address=cls.presale.presale_contract.lower(),
+            block_number=11,
+            transaction_hash="0x" + "b" * 64,
+            log_index=0,
+            topics=[TOKENS_PURCHASED_TOPIC, _address_topic(cls.voter)],
+            data="0x" + encode(["uint256", "uint256"], [10**18, 2 * 10**18]).hex(),
+        )
+        ChainLog.objects.create(
+            network=cls.dao.network,
+            address=cls.presale.presale_contract.lower(),
+            block_number=12,
+            transaction_hash="0x" + "c" * 64,
+            log_index=1,
+            topics=[TOKENS_SOLD_TOPIC, _address_topic(cls.voter)],
+            data="0x" + encode(["uint256", "uint256"], [3 * 10**18, 10**18]).hex(),
+        )
+
+    def test_reprocess_logs_rebuilds_votes(self):
+        call_command("reprocess_logs", "--kind", "votes", "--chunk-size", "1")
+
+        vote = Vote.objects.get(dip=self.dip)
+        self.assertTrue(vote.support)
+        self.assertEqual(vote.voting_power, 5 * 10**18)
+        self.assertEqual(vote.user.eth_address, self.voter)
+        self.dip.refresh_from_db()
+        self.assertEqual((self.dip.for_votes, self.dip.voter_count), (5 * 10**18, 1))
+
+    def test_reprocess_logs_rebuilds_presale_transactions(self):
+        call_command("reprocess_logs", "--kind", "presale")
+
+        buy = PresaleTransaction.objects.get(transaction_hash="b" * 64)
+        sell = PresaleTransaction.objects.get(transaction_hash="c" * 64)
+        self.assertEqual(buy.action, PresaleTransaction.ActionChoices.BUY)
+        self.assertEqual(buy.eth_amount, 1)
+        self.assertEqual(buy.token_amount, 2)
+        self.assertEqual(sell.action, PresaleTransaction.ActionChoices.SELL)
+        self.assertEqual(sell.token_amount, 3)
+
+    def test_reprocess_logs_is_idempotent(self):
+        call_command("reprocess_logs")
+        call_command("reprocess_logs")
+
+        self.assertEqual(Vote.objects.filter(dip=self.dip).count(), 1)
+        self.assertEqual(PresaleTransaction.objects.filter(presale=self.presale).count(), 2)
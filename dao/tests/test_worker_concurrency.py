@@ -0,0 +1,65 @@
+import threading
+from unittest.mock import MagicMock, patch
+
+from django.test import SimpleTestCase
+from web3 import Web3
+
+from services.blockchain import blockchain_client
+from services.blockchain.blockchain_client import BlockchainClient
+from services.blockchain.dao_service import DaoConfirmationService
+
+
+def _web3(block_number=1_000_000):
+    web3 = MagicMock()
+    web3.eth.block_number = block_number
+    web3.eth.get_logs.return_value = []
+    web3.keccak = Web3.keccak
+    return web3
+
+
+@patch("services.blockchain.blockchain_client.BlockchainClient._open_connection")
+class WorkerConcurrencyTests(SimpleTestCase):
+    """blockchain clients must be safe to use from a threaded worker pool"""
+
+    def setUp(self):
+        blockchain_client._connections.__dict__.clear()
+        # the mocked connections must not leak into other tests of this thread
+        self.addCleanup(blockchain_client._connections.__dict__.clear)
+
+    def test_connection_is_reused_within_a_thread(self, mock_open):
+        mock_open.side_effect = lambda: _web3()
+
+        first = BlockchainClient(network=31337)
+        second = BlockchainClient(network=31337)
+
+        self.assertIs(first.web3, second.web3)
+        self.assertEqual(mock_open.call_count, 1)
+
+    def test_each_thread_gets_its_own_connection(self, mock_open):
+        mock_open.side_effect = lambda: _web3()
+        clients = []
+
+        threads = [
+            threading.Thread(target=lambda: clients.append(BlockchainClient(network=31337)))
+            for _ in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len({id(client.web3) for client in clients}), 3)
+
+    def test_initial_data_search_does_not_move_the_client_window(self, mock_open):
+        mock_open.side_effect = lambda: _web3()
+        service = DaoConfirmationService(
+            dao_address="0x74fbbb0be04653f29bd4b2601431e87f9b811319", network=31337
+        )
+        current_block, from_block = service.current_block, service.from_block
+
+        with self.assertRaises(Exception):
+            service._get_initial_data()
+
+        self.assertGreater(service.web3.eth.get_logs.call_count, 1)
+        self.assertEqual(service.current_block, current_block)
+        self.assertEqual(service.from_block, from_block)
@@ -1,6 +1,6 @@
 from django.urls import path
 
-from .views import DaoInitialView, DaoCompleteView, ActiveDaosView, PresaleView, StakeView, PresaleRefreshView, PresaleTransactionsView
+from .views import DaoInitialView, DaoCompleteView, ActiveDaosView, PresaleView, StakeView, PresaleRefreshView, PresaleTransactionsView, PresaleQuoteView
 
 app_name = "dao"
 
@@ -38,6 +38,11 @@ urlpatterns = [
         PresaleRefreshView.as_view({"patch": "update"}),
         name="presale-refresh",
     ),
+    path(
+        "presales/<int:id>/quote/",
+        PresaleQuoteView.as_view({"get": "list"}),
+        name="presale-quote",
+    ),
     path(
         "presales/<int:id>/transactions/",
         PresaleTransactionsView.as_view({"get": "list"}),
@@ -12,15 +12,17 @@ from .serializers import (
     DaoActiveSerializer,
     PresaleSerializer,
     PresaleTransactionSerializer,
+    PresaleQuoteSerializer,
 )
 from .packages.abstract.abstract_views import (
     BaseDaoView,
     PublicBaseDaoView,
 )
 from .packages.services.presale_service import PresaleService
+from .packages.services.presale_quote_service import PresaleQuoteService
 from django.db.models import When, Case, Sum, Count, F
 from logging_config import logger
-from services.utils.custom_pagination import CustomPagination
+from services.utils.custom_pagination import KeysetPagination
 
 ######################## VIEWS ########################
 
@@ -49,6 +51,8 @@ class DaoInitialView(BaseDaoView):
 @extend_schema(tags=["refresh"])
 class StakeView(BaseDaoView):
     serializer_class = StakeSerializer
+    pagination_class = KeysetPagination
+    pagination_ordering = ("-amount", "id")
 
     def paginate_queryset(self, queryset):
         dao_id = self.request.GET.get("id")
@@ -219,6 +223,66 @@ class PresaleRefreshView(BaseDaoView):
         return Response(serializer.data)
 
 
+@extend_schema(tags=["presale"])
+class PresaleQuoteView(PublicBaseDaoView):
+    """
+    View for pricing buys and sells locally from the cached tier schedule
+    Supports: list (batch quote) for all users
+    """
+
+    serializer_class = PresaleQuoteSerializer
+
+    def get_queryset(self):
+        return Presale.objects.select_related("dao")
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(name="side", type=str, description="buy or sell"),
+            OpenApiParameter(
+                name="amount",
+                type=str,
+                many=True,
+                description="token amount in wei, repeat for a batch quote",
+            ),
+        ]
+    )
+    def list(self, request, *args, **kwargs):
+        presale = get_object_or_404(self.get_queryset(), id=self.kwargs.get("id"))
+
+        serializer = self.get_serializer(
+            data={
+                "side": request.query_params.get("side", "buy"),
+                "amount": request.query_params.getlist("amount"),
+            }
+        )
+        serializer.is_valid(raise_exception=True)
+
+        if not presale.tier_schedule:
+            # the schedule is immutable, this rpc read happens once per presale contract
+            presale_service = PresaleService(
+                presale_contract=presale.presale_contract, network=presale.dao.network
+            )
+            if not presale_service.get_tier_schedule(presale):
+                return Response(
+                    {"error": "presale tier schedule is not available"},
+                    status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                )
+
+        quote_service = PresaleQuoteService.for_presale(presale)
+        side = serializer.validated_data["side"]
+
+        return Response(
+            {
+                "presale_id": presale.id,
+                "side": side,
+                "current_tier": presale.current_tier,
+                "quotes": quote_service.quote_many(
+                    side, serializer.validated_data["amount"]
+                ),
+            }
+        )
+
+
 @extend_schema(tags=["presale"])
 class PresaleTransactionsView(PublicBaseDaoView):
     """
@@ -227,30 +291,14 @@ class PresaleTransactionsView(PublicBaseDaoView):
     """
 
     serializer_class = PresaleTransactionSerializer
-    pagination_class = CustomPagination
+    pagination_class = KeysetPagination
+    pagination_ordering = ("-timestamp", "id")
 
     def get_queryset(self):
         presale_id = self.kwargs.get("id")
-        return PresaleTransaction.objects.filter(presale_id=presale_id).order_by(
-            "-timestamp"
-        )
+        return PresaleTransaction.objects.filter(presale_id=presale_id)
         
     def get_serializer_context(self):
         context = super().get_serializer_context()
         context["request"] = self.request
         return context
-
-    @extend_schema(
-        parameters=[
-            OpenApiParameter(
-                name="page", type=int, description="Page number for pagination"
-            ),
-            OpenApiParameter(
-                name="page_size",
-                type=int,
-                description="Number of items per page (max 10)",
-            ),
-        ]
-    )
-    def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from forum.packages.services.counter_service import ContentCounters
+
+
+class Command(BaseCommand):
+    help = "Recompute the denormalized replies_count and likes_count columns from their rows"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "models",
+            nargs="*",
+            choices=[model.__name__.lower() for model in ContentCounters.COUNTERS],
+            help="models to recompute, all by default",
+        )
+
+    def handle(self, *args, **options):
+        models = [
+            model
+            for model in ContentCounters.COUNTERS
+            if not options["models"] or model.__name__.lower() in options["models"]
+        ]
+        for name, rows in ContentCounters.recompute(models).items():
+            self.stdout.write(self.style.SUCCESS(f"{name}: recomputed {rows} rows"))
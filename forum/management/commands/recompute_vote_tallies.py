@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from forum.models import Dip
+from forum.packages.services.counter_service import VoteTally
+
+
+class Command(BaseCommand):
+    help = "Recompute the stored vote tallies of dips from their Vote rows"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "dips", nargs="*", type=int, help="ids of the dips to recompute, all by default"
+        )
+
+    def handle(self, *args, **options):
+        queryset = Dip.objects.all()
+        if options["dips"]:
+            queryset = queryset.filter(id__in=options["dips"])
+        rows = VoteTally.recompute(queryset)
+        self.stdout.write(self.style.SUCCESS(f"Recomputed vote tallies of {rows} dips"))
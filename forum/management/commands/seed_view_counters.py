@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from forum.packages.services.view_service import ViewCounter
+
+
+class Command(BaseCommand):
+    help = "Load the viewers recorded in View rows into the redis view counters, run once"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--flush",
+            action="store_true",
+            help="write the seeded counts into views_count right away",
+        )
+
+    def handle(self, *args, **options):
+        read = ViewCounter.seed()
+        self.stdout.write(self.style.SUCCESS(f"Seeded view counters from {read} view rows"))
+        if options["flush"]:
+            updated = ViewCounter.flush()
+            self.stdout.write(self.style.SUCCESS(f"Flushed views_count of {updated} rows"))
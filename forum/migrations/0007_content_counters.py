@@ -0,0 +1,67 @@
+# Generated by Django 5.0.14 on 2026-10-19 03:10
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+COUNTERS = {
+    "thread": {"replies_count": "reply", "likes_count": "like"},
+    "dip": {"replies_count": "reply", "likes_count": "like"},
+    "reply": {"likes_count": "like"},
+}
+
+
+def backfill_counters(apps, schema_editor):
+    """count the existing replies and likes into the new counter columns"""
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    for model_name, counters in COUNTERS.items():
+        model = apps.get_model("forum", model_name)
+        content_type = ContentType.objects.filter(
+            app_label="forum", model=model_name
+        ).first()
+        if content_type is None:
+            continue
+        model.objects.update(
+            **{
+                field: Coalesce(
+                    Subquery(
+                        apps.get_model("forum", related)
+                        .objects.filter(content_type=content_type, object_id=OuterRef("pk"))
+                        .order_by()
+                        .values("object_id")
+                        .annotate(total=Count("id"))
+                        .values("total")
+                    ),
+                    Value(0),
+                )
+                for field, related in counters.items()
+            }
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('forum', '0006_alter_dip_proposal_type'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dip',
+            name='likes_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='thread',
+            name='likes_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='reply',
+            name='likes_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
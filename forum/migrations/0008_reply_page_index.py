@@ -0,0 +1,26 @@
+# Generated by Django 5.0.14 on 2026-10-19 04:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("forum", "0007_content_counters"),
+        ("contenttypes", "0002_remove_content_type_name"),
+    ]
+
+    operations = [
+        # the replies of one object in created_at order, the new index covers the old one
+        migrations.RemoveIndex(
+            model_name="reply",
+            name="forum_reply_content_2efb0f_idx",
+        ),
+        migrations.AddIndex(
+            model_name="reply",
+            index=models.Index(
+                fields=["content_type", "object_id", "created_at"],
+                name="forum_reply_content_b88af0_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.0.14 on 2026-10-19 04:40
+
+from django.db import migrations, models
+from django.db.models import Count, DecimalField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_tallies(apps, schema_editor):
+    """sum the existing votes into the new tally columns"""
+    Dip = apps.get_model("forum", "Dip")
+    Vote = apps.get_model("forum", "Vote")
+
+    def tally(aggregate, condition=None, **output):
+        votes = Vote.objects.filter(dip=OuterRef("pk"))
+        if condition is not None:
+            votes = votes.filter(condition)
+        return Coalesce(
+            Subquery(
+                votes.order_by().values("dip").annotate(total=aggregate).values("total")
+            ),
+            Value(0),
+            **output,
+        )
+
+    decimal = {"output_field": DecimalField(max_digits=40, decimal_places=0)}
+    Dip.objects.update(
+        for_votes=tally(Sum("voting_power"), Q(support=True), **decimal),
+        against_votes=tally(Sum("voting_power"), Q(support=False), **decimal),
+        total_votes=tally(Sum("voting_power"), **decimal),
+        voter_count=tally(Count("id")),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forum', '0008_reply_page_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dip',
+            name='for_votes',
+            field=models.DecimalField(decimal_places=0, default=0, max_digits=40),
+        ),
+        migrations.AddField(
+            model_name='dip',
+            name='against_votes',
+            field=models.DecimalField(decimal_places=0, default=0, max_digits=40),
+        ),
+        migrations.AddField(
+            model_name='dip',
+            name='total_votes',
+            field=models.DecimalField(decimal_places=0, default=0, max_digits=40),
+        ),
+        migrations.AddField(
+            model_name='dip',
+            name='voter_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_tallies, migrations.RunPython.noop),
+    ]
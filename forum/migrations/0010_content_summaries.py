@@ -0,0 +1,59 @@
+# Generated by Django 5.0.14 on 2026-10-19 05:15
+
+from django.db import migrations, models
+from forum.packages.services.content_summary import ContentSummary
+
+
+def backfill_summaries(apps, schema_editor):
+    """derive the excerpt, word count and first image of the existing content"""
+    for model_name in ("thread", "dip"):
+        model = apps.get_model("forum", model_name)
+        batch = []
+        for obj in model.objects.only("id", "content").iterator(chunk_size=500):
+            obj.excerpt, obj.word_count, obj.first_image = ContentSummary.of(obj.content)
+            batch.append(obj)
+            if len(batch) == 500:
+                model.objects.bulk_update(batch, ["excerpt", "word_count", "first_image"])
+                batch = []
+        model.objects.bulk_update(batch, ["excerpt", "word_count", "first_image"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forum', '0009_dip_vote_tallies'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='thread',
+            name='excerpt',
+            field=models.CharField(blank=True, default='', max_length=300),
+        ),
+        migrations.AddField(
+            model_name='thread',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='thread',
+            name='first_image',
+            field=models.CharField(blank=True, default='', max_length=500),
+        ),
+        migrations.AddField(
+            model_name='dip',
+            name='excerpt',
+            field=models.CharField(blank=True, default='', max_length=300),
+        ),
+        migrations.AddField(
+            model_name='dip',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='dip',
+            name='first_image',
+            field=models.CharField(blank=True, default='', max_length=500),
+        ),
+        migrations.RunPython(backfill_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-19 06:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forum', '0010_content_summaries'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='dip',
+            name='status',
+            field=models.CharField(choices=[('draft', 'Draft'), ('active', 'Active'), ('passed', 'Passed'), ('executed', 'Executed'), ('failed', 'Failed')], default='draft', max_length=20),
+        ),
+    ]
@@ -28,6 +28,11 @@ class Dip(BaseForumModel):
         blank=True,
         help_text="store socials and whitepaper as a json object",
     )
+    # vote tallies maintained by forum.packages.services.counter_service
+    for_votes = models.DecimalField(max_digits=40, decimal_places=0, default=0)
+    against_votes = models.DecimalField(max_digits=40, decimal_places=0, default=0)
+    total_votes = models.DecimalField(max_digits=40, decimal_places=0, default=0)
+    voter_count = models.PositiveIntegerField(default=0)
 
     class Meta:
         unique_together = ["proposal_id", "dao"]
@@ -55,4 +60,9 @@ class Like(UserGenericContentModel): ...
 class Reply(GenericContentModel):
     content = models.JSONField(help_text="Stores Lexical editor JSON content structure")
     likes = GenericRelation("Like")
+    likes_count = models.PositiveIntegerField(default=0)
     author = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+
+    class Meta(GenericContentModel.Meta):
+        # replies of one thread/dip in page order
+        indexes = [models.Index(fields=["content_type", "object_id", "created_at"])]
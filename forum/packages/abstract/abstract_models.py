@@ -2,6 +2,7 @@ from django.db import models
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.contenttypes.fields import GenericRelation, GenericForeignKey
+from forum.packages.services.content_summary import ContentSummary
 
 
 # ABSTRACT MODELS WITH SHARED FIELDS ACROSS MULTIPLE MODELS
@@ -19,7 +20,13 @@ class BaseForumModel(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     views_count = models.PositiveIntegerField(default=0, db_index=True)
+    # maintained by forum.packages.services.counter_service
     replies_count = models.PositiveIntegerField(default=0)
+    likes_count = models.PositiveIntegerField(default=0)
+    # derived from content on save, lists show these instead of the lexical tree
+    excerpt = models.CharField(max_length=300, blank=True, default="")
+    word_count = models.PositiveIntegerField(default=0)
+    first_image = models.CharField(max_length=500, blank=True, default="")
 
     dao = models.ForeignKey("dao.Dao", on_delete=models.CASCADE)
     author = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
@@ -27,6 +34,19 @@ class BaseForumModel(models.Model):
     class Meta:
         abstract = True
 
+    SUMMARY_FIELDS = ("excerpt", "word_count", "first_image")
+
+    def save(self, *args, **kwargs):
+        """keeps the excerpt, word count and first image in step with content"""
+        update_fields = kwargs.get("update_fields")
+        if "content" not in self.get_deferred_fields() and (
+            update_fields is None or "content" in update_fields
+        ):
+            self.excerpt, self.word_count, self.first_image = ContentSummary.of(self.content)
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, *self.SUMMARY_FIELDS}
+        super().save(*args, **kwargs)
+
 
 class GenericContentModel(models.Model):
     content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
@@ -50,6 +70,8 @@ class UserGenericContentModel(GenericContentModel):
 class DipStatus(models.TextChoices):
     DRAFT = "draft"
     ACTIVE = "active"
+    # voting is over and the proposal passed, waiting for its on-chain execution
+    PASSED = "passed"
     EXECUTED = "executed"
     FAILED = "failed"
 
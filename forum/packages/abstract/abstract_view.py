@@ -4,6 +4,7 @@ from services.utils.custom_pagination import (
 from services.utils.permission_handler import CustomPermissionHandler
 from services.utils.exception_handler import ErrorHandlingMixin
 from rest_framework import viewsets, mixins
+from forum.packages.services.viewer_service import ViewerState
 
 
 class Helper(
@@ -14,8 +15,28 @@ class Helper(
     permission_classes = [CustomPermissionHandler]
 
 
+class ViewerStateMixin:
+    """
+    loads the requesting user's likes and votes for everything a response serializes
+    (the page of a list, the object and its replies on retrieve) in one query per relation
+    """
+
+    def get_serializer(self, *args, **kwargs):
+        if args and "data" not in kwargs:
+            objects = args[0] if kwargs.get("many") else [args[0]]
+            kwargs.setdefault("context", self.get_serializer_context())
+            kwargs["context"]["viewer"] = ViewerState(self.request.user).load(
+                self.get_viewer_objects(objects)
+            )
+        return super().get_serializer(*args, **kwargs)
+
+    def get_viewer_objects(self, objects):
+        return objects
+
+
 class BaseForumView(
     Helper,
+    ViewerStateMixin,
     CustomParserPaginationMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
@@ -29,6 +50,7 @@ class BaseForumView(
 
 class BaseReplyView(
     Helper,
+    ViewerStateMixin,
     CustomParserPaginationMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
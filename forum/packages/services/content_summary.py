@@ -0,0 +1,61 @@
+class ContentSummary:
+    """
+    plain text excerpt, word count and first image of a Lexical editor tree
+
+    computed when content is saved and stored next to it, so lists can show a preview
+    without loading and decoding the tree. text nodes carry the words, runs of one
+    paragraph are joined and blocks (paragraphs, headings, list items...) separated,
+    image nodes are found by their src.
+    """
+
+    EXCERPT_LENGTH = 280
+    FIRST_IMAGE_LENGTH = 500
+    # nodes inside a paragraph, their text continues the text before them
+    INLINE = {"text", "link", "autolink", "hashtag", "mention", "code-highlight"}
+
+    @classmethod
+    def of(cls, content) -> tuple[str, int, str]:
+        """
+        Returns:
+            tuple[str, int, str]: (excerpt, word count, first image src or "")
+        """
+        words, first_image = cls._walk(content)
+        return cls._excerpt(words), len(words), first_image
+
+    @classmethod
+    def _walk(cls, content) -> tuple[list, str]:
+        if isinstance(content, str):
+            return content.split(), ""
+        if not isinstance(content, dict):
+            return [], ""
+        pieces, first_image = [], ""
+        # depth first in document order, without recursion on deeply nested trees
+        stack = [content.get("root", content)]
+        while stack:
+            node = stack.pop()
+            if not isinstance(node, dict):
+                continue
+            if node.get("type") not in cls.INLINE:
+                # runs of one paragraph join, blocks and line breaks separate words
+                pieces.append(" ")
+            text = node.get("text")
+            if isinstance(text, str):
+                pieces.append(text)
+            src = node.get("src")
+            if not first_image and node.get("type") == "image" and isinstance(src, str):
+                # inline data urls are no reference, and too big for the column
+                if not src.startswith("data:") and len(src) <= cls.FIRST_IMAGE_LENGTH:
+                    first_image = src
+            children = node.get("children")
+            if isinstance(children, list):
+                stack.extend(reversed(children))
+        return "".join(pieces).split(), first_image
+
+    @classmethod
+    def _excerpt(cls, words) -> str:
+        excerpt = " ".join(words)
+        if len(excerpt) <= cls.EXCERPT_LENGTH:
+            return excerpt
+        # cut on a word boundary, leaving room for the ellipsis
+        cut = excerpt[: cls.EXCERPT_LENGTH].rsplit(" ", 1)[0]
+        return f"{cut}…"
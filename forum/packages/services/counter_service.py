@@ -0,0 +1,140 @@
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Count, DecimalField, F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from forum.models import Thread, Dip, Reply, Like, Vote
+from logging_config import logger
+
+
+class ContentCounters:
+    """
+    denormalized replies_count and likes_count of threads, dips and replies
+
+    the counters are bumped with F() updates inside the transaction that writes the reply
+    or like, so a rolled back write never leaves a counter behind and concurrent writers
+    never overwrite each other. recompute() rebuilds them from the rows in one update per
+    model, for repair after manual data changes.
+    """
+
+    # model -> counters it keeps, with the generic relation they count
+    COUNTERS = {
+        Thread: {"replies_count": Reply, "likes_count": Like},
+        Dip: {"replies_count": Reply, "likes_count": Like},
+        Reply: {"likes_count": Like},
+    }
+
+    @staticmethod
+    def _bump(model, object_id, field, delta):
+        queryset = model.objects.filter(id=object_id)
+        if delta < 0:
+            # never below zero, even if the counter drifted before a recompute
+            queryset = queryset.filter(**{f"{field}__gt": 0})
+        queryset.update(**{field: F(field) + delta})
+
+    @classmethod
+    def reply_added(cls, parent):
+        cls._bump(type(parent), parent.id, "replies_count", 1)
+
+    @classmethod
+    def like_added(cls, model, object_id):
+        cls._bump(model, object_id, "likes_count", 1)
+
+    @classmethod
+    def like_removed(cls, model, object_id):
+        cls._bump(model, object_id, "likes_count", -1)
+
+    @classmethod
+    def recompute(cls, models=None) -> dict:
+        """
+        recounts the counters of the given models (all by default) from their rows
+
+        Returns:
+            dict: model name -> number of rows updated
+        """
+        updated = {}
+        for model in models or cls.COUNTERS:
+            content_type = ContentType.objects.get_for_model(model)
+            counts = {
+                field: Coalesce(
+                    Subquery(
+                        related.objects.filter(
+                            content_type=content_type, object_id=OuterRef("pk")
+                        )
+                        .order_by()
+                        .values("object_id")
+                        .annotate(total=Count("id"))
+                        .values("total")
+                    ),
+                    Value(0),
+                )
+                for field, related in cls.COUNTERS[model].items()
+            }
+            updated[model.__name__] = rows = model.objects.update(**counts)
+            logger.info(f"recomputed {', '.join(counts)} of {rows} {model.__name__} rows")
+        return updated
+
+
+class VoteTally:
+    """
+    for_votes, against_votes, total_votes and voter_count of dips
+
+    votes are only ever added by the vote sync, so the tallies are bumped with one F()
+    update per saved batch, in the transaction storing the votes. votes overwritten when
+    raw logs are reprocessed can change sides, the dips they belong to are recomputed.
+    """
+
+    @staticmethod
+    def add(dip, votes):
+        """counts newly stored votes into the tallies of their dip"""
+        if not votes:
+            return
+        for_votes = sum(vote.voting_power for vote in votes if vote.support)
+        against_votes = sum(vote.voting_power for vote in votes if not vote.support)
+        Dip.objects.filter(id=dip.id).update(
+            for_votes=F("for_votes") + for_votes,
+            against_votes=F("against_votes") + against_votes,
+            total_votes=F("total_votes") + for_votes + against_votes,
+            voter_count=F("voter_count") + len(votes),
+        )
+
+    @staticmethod
+    def _sum(condition=None):
+        votes = Vote.objects.filter(dip=OuterRef("pk"))
+        if condition is not None:
+            votes = votes.filter(condition)
+        return Coalesce(
+            Subquery(
+                votes.order_by()
+                .values("dip")
+                .annotate(total=Sum("voting_power"))
+                .values("total")
+            ),
+            Value(0),
+            output_field=DecimalField(max_digits=40, decimal_places=0),
+        )
+
+    @classmethod
+    def recompute(cls, queryset=None) -> int:
+        """
+        rebuilds the tallies of the given dips (all by default) from their votes
+
+        Returns:
+            int: number of dips updated
+        """
+        queryset = Dip.objects.all() if queryset is None else queryset
+        rows = queryset.update(
+            for_votes=cls._sum(Q(support=True)),
+            against_votes=cls._sum(Q(support=False)),
+            total_votes=cls._sum(),
+            voter_count=Coalesce(
+                Subquery(
+                    Vote.objects.filter(dip=OuterRef("pk"))
+                    .order_by()
+                    .values("dip")
+                    .annotate(total=Count("id"))
+                    .values("total")
+                ),
+                Value(0),
+            ),
+        )
+        logger.info(f"recomputed vote tallies of {rows} dips")
+        return rows
@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from forum.models import Dip, DipStatus
+from logging_config import logger
+
+
+class DipFinalizationService:
+    """
+    schedules the status finalization of active dips at end_time + DIP_FINALIZE_MARGIN.
+
+    dips ending within DIP_FINALIZE_SCHEDULE_AHEAD get an eta task right away; the ones
+    further out are picked up by the periodic schedule_upcoming sweep once they get
+    close, so no eta message outlives the redis visibility timeout. a dip is scheduled
+    once per end_time: when the end time changes a new task is scheduled and the old one
+    skips itself because its expected end time no longer matches.
+    """
+
+    SCHEDULED_KEY = "dip:finalize:{}"
+
+    @staticmethod
+    def finalize_at(end_time: int) -> datetime:
+        return datetime.fromtimestamp(end_time, tz=dt_timezone.utc) + timedelta(
+            seconds=settings.DIP_FINALIZE_MARGIN
+        )
+
+    @staticmethod
+    def is_awaiting_finalization(dip) -> bool:
+        """voting is over but the final status has not been read from chain yet"""
+        return (
+            dip.status == DipStatus.ACTIVE
+            and dip.end_time is not None
+            and dip.end_time <= timezone.now().timestamp()
+        )
+
+    @classmethod
+    def schedule(cls, dip) -> bool:
+        """
+        schedules the finalization of an active dip if it ends soon enough
+
+        Returns:
+            bool: True if a task is published (after the current transaction commits)
+        """
+        if dip.status != DipStatus.ACTIVE or dip.end_time is None:
+            return False
+
+        eta = cls.finalize_at(dip.end_time)
+        horizon = timezone.now() + timedelta(seconds=settings.DIP_FINALIZE_SCHEDULE_AHEAD)
+        if eta > horizon:
+            return False
+
+        key = cls.SCHEDULED_KEY.format(dip.id)
+        if cache.get(key) == dip.end_time:
+            return False
+
+        dip_id, end_time = dip.id, dip.end_time
+        transaction.on_commit(lambda: cls._publish(dip_id, end_time, eta))
+        return True
+
+    @classmethod
+    def _publish(cls, dip_id, end_time, eta):
+        from forum.tasks import finalize_dip_status
+
+        eta = max(eta, timezone.now())
+        finalize_dip_status.apply_async(args=(dip_id, end_time), eta=eta)
+        # forget the schedule a day after the eta so a finalization that ran out of
+        # retries gets another chance from the sweep
+        timeout = int((eta - timezone.now()).total_seconds()) + 24 * 3600
+        cache.set(cls.SCHEDULED_KEY.format(dip_id), end_time, timeout=timeout)
+        logger.info(f"dip {dip_id}: status finalization scheduled at {eta}")
+
+    @classmethod
+    def schedule_upcoming(cls) -> int:
+        """schedules every active dip that ends (or ended) within the look-ahead window"""
+        horizon = (
+            timezone.now()
+            + timedelta(seconds=settings.DIP_FINALIZE_SCHEDULE_AHEAD - settings.DIP_FINALIZE_MARGIN)
+        ).timestamp()
+        dips = Dip.objects.filter(
+            status=DipStatus.ACTIVE, end_time__isnull=False, end_time__lte=horizon
+        ).only("id", "status", "end_time")
+        return sum(1 for dip in dips if cls.schedule(dip))
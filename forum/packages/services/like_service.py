@@ -0,0 +1,217 @@
+import redis
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection, transaction
+from dao.models import Dao
+from forum.models import Like
+from logging_config import logger
+from .counter_service import ContentCounters
+from .redis_store import redis_client
+
+
+# deletes the like if it exists, inserts it otherwise, and moves the counter of the liked
+# object by the same amount, all in one statement. a concurrent insert of the same like
+# hits ON CONFLICT instead of the unique constraint, a concurrent delete waits for the row
+TOGGLE_SQL = """
+WITH target AS ({target}),
+deleted AS (
+    DELETE FROM {like} AS l USING target
+    WHERE l.user_id = %(user_id)s
+      AND l.content_type_id = %(content_type_id)s
+      AND l.object_id = target.id
+    RETURNING l.id
+),
+inserted AS (
+    INSERT INTO {like} (user_id, content_type_id, object_id, created_at)
+    SELECT %(user_id)s, %(content_type_id)s, target.id, now() FROM target
+    WHERE NOT EXISTS (SELECT 1 FROM deleted)
+    ON CONFLICT (user_id, content_type_id, object_id) DO NOTHING
+    RETURNING id
+),
+counter AS (
+    UPDATE {table}
+    SET likes_count = GREATEST(
+        likes_count + (SELECT count(*) FROM inserted) - (SELECT count(*) FROM deleted), 0
+    )
+    WHERE id IN (SELECT id FROM target)
+    RETURNING likes_count
+)
+SELECT
+    EXISTS (SELECT 1 FROM target),
+    NOT EXISTS (SELECT 1 FROM deleted),
+    (SELECT likes_count FROM counter)
+"""
+
+TARGET_SQL = "SELECT id FROM {table} WHERE id = %(object_id)s"
+
+DAO_TARGET_SQL = """
+    SELECT t.id FROM {table} AS t JOIN {dao} AS d ON d.id = t.dao_id
+    WHERE t.id = %(object_id)s AND d.slug = %(slug)s
+"""
+
+
+class LikeService:
+    """like toggle of threads, dips and replies"""
+
+    @staticmethod
+    def toggle(model, object_id, user, slug=None) -> tuple[bool, bool]:
+        """
+        likes the object or removes the like, keeping likes_count in step
+
+        Args:
+            slug (str): dao the object must belong to, None for replies
+
+        Returns:
+            tuple[bool, bool]: (object found, liked after the toggle)
+        """
+        content_type = ContentType.objects.get_for_model(model)
+        if connection.vendor == "postgresql":
+            found, liked = LikeService._toggle_statement(
+                model, object_id, user, content_type, slug
+            )
+        else:
+            found, liked = LikeService._toggle_orm(model, object_id, user, content_type, slug)
+        if found:
+            transaction.on_commit(lambda: LikeCache.apply(model, object_id, user.id, liked))
+        return found, liked
+
+    @staticmethod
+    def _toggle_statement(model, object_id, user, content_type, slug):
+        quote = connection.ops.quote_name
+        table = quote(model._meta.db_table)
+        if slug is None:
+            target = TARGET_SQL.format(table=table)
+        else:
+            target = DAO_TARGET_SQL.format(table=table, dao=quote(Dao._meta.db_table))
+        sql = TOGGLE_SQL.format(
+            target=target, like=quote(Like._meta.db_table), table=table
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                sql,
+                {
+                    "object_id": int(object_id),
+                    "slug": slug,
+                    "user_id": user.id,
+                    "content_type_id": content_type.id,
+                },
+            )
+            found, liked, _ = cursor.fetchone()
+        return found, liked
+
+    @staticmethod
+    def _toggle_orm(model, object_id, user, content_type, slug):
+        """same toggle for databases without data modifying CTEs (the sqlite test runs)"""
+        target = model.objects.filter(id=object_id)
+        if slug is not None:
+            target = target.filter(dao__slug=slug)
+        with transaction.atomic():
+            if not target.exists():
+                return False, False
+            deleted, _ = Like.objects.filter(
+                user=user, content_type=content_type, object_id=object_id
+            ).delete()
+            if deleted:
+                ContentCounters.like_removed(model, object_id)
+                return True, False
+            Like.objects.create(user=user, content_type=content_type, object_id=object_id)
+            ContentCounters.like_added(model, object_id)
+            return True, True
+
+
+class LikeCache:
+    """
+    optional redis sets of the users liking hot threads, dips and replies
+
+    with LIKES_CACHE_ENABLED, an object with at least LIKES_CACHE_MIN_LIKES likes gets a
+    set of its likers the first time a page shows it, and later pages answer is_liked for
+    it from redis. the set holds a "-" member so an object nobody likes any more still
+    has a (complete) set. toggles update existing sets after their transaction commits,
+    sets expire after LIKES_CACHE_TIMEOUT and are rebuilt from postgres, which also bounds
+    how long a toggle racing the build of a set can be missed.
+    """
+
+    KEY = "likes:{}:{}"
+    COMPLETE = "-"
+
+    # updates the set only while it exists, a partial set would answer wrong
+    APPLY_SCRIPT = """
+    if redis.call('exists', KEYS[1]) == 1 then
+        return redis.call(ARGV[1], KEYS[1], ARGV[2])
+    end
+    return 0
+    """
+
+    @classmethod
+    def _key(cls, model, object_id) -> str:
+        return cls.KEY.format(model._meta.model_name, object_id)
+
+    @classmethod
+    def lookup(cls, model, ids, user_id) -> tuple[set, set]:
+        """
+        Returns:
+            tuple[set, set]: (ids liked by the user, ids answered from redis)
+        """
+        if not settings.LIKES_CACHE_ENABLED or not ids:
+            return set(), set()
+        ids = list(ids)
+        try:
+            pipeline = redis_client().pipeline(transaction=False)
+            for object_id in ids:
+                pipeline.smismember(cls._key(model, object_id), [cls.COMPLETE, user_id])
+            results = pipeline.execute()
+        except redis.RedisError as ex:
+            logger.error(f"like cache lookup failed: {str(ex)}")
+            return set(), set()
+        liked, resolved = set(), set()
+        for object_id, (complete, member) in zip(ids, results):
+            if complete:
+                resolved.add(object_id)
+                if member:
+                    liked.add(object_id)
+        return liked, resolved
+
+    @classmethod
+    def warm(cls, model, objects):
+        """builds the sets of the hot objects among the given ones, one query for all"""
+        if not settings.LIKES_CACHE_ENABLED:
+            return
+        hot = [obj.id for obj in objects if obj.likes_count >= settings.LIKES_CACHE_MIN_LIKES]
+        if not hot:
+            return
+        likers = {object_id: [cls.COMPLETE] for object_id in hot}
+        for object_id, user_id in Like.objects.filter(
+            content_type=ContentType.objects.get_for_model(model), object_id__in=hot
+        ).values_list("object_id", "user_id"):
+            likers[object_id].append(user_id)
+        try:
+            # swapped atomically, a lookup never sees a set being rebuilt
+            pipeline = redis_client().pipeline(transaction=True)
+            for object_id, members in likers.items():
+                key = cls._key(model, object_id)
+                pipeline.delete(key)
+                pipeline.sadd(key, *members)
+                pipeline.expire(key, settings.LIKES_CACHE_TIMEOUT)
+            pipeline.execute()
+        except redis.RedisError as ex:
+            logger.error(f"like cache warm up failed: {str(ex)}")
+
+    @classmethod
+    def apply(cls, model, object_id, user_id, liked):
+        if not settings.LIKES_CACHE_ENABLED:
+            return
+        try:
+            redis_client().eval(
+                cls.APPLY_SCRIPT,
+                1,
+                cls._key(model, object_id),
+                "sadd" if liked else "srem",
+                user_id,
+            )
+        except redis.RedisError as ex:
+            # the set may now be wrong, drop it
+            logger.error(f"like cache update failed: {str(ex)}")
+            try:
+                redis_client().delete(cls._key(model, object_id))
+            except redis.RedisError:
+                pass
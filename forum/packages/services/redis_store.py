@@ -0,0 +1,16 @@
+import redis
+from django.conf import settings
+
+
+_client = None
+
+
+def redis_client() -> redis.Redis:
+    """client of the redis holding the view and like counters, the cache redis by default"""
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(
+            settings.FORUM_REDIS_URL or settings.CACHES["default"]["LOCATION"],
+            socket_timeout=2,
+        )
+    return _client
@@ -7,9 +7,10 @@ from dao.packages.services.presale_service import PresaleService
 from datetime import datetime
 from django.shortcuts import get_object_or_404
 from forum.tasks import sync_votes_task
+from .finalization_service import DipFinalizationService
+from services.utils.task_checkpoint import TaskCheckpoint
 from logging_config import logger
 from web3 import Web3
-import time
 
 
 class UpdateStatus:
@@ -62,8 +63,9 @@ class UpdateStatus:
             dao_contract = web3.eth.contract(address=Web3.to_checksum_address(contract.dao_address), abi=dao_abi)
             
             # Wait 15 seconds before fetching blockchain data to allow transaction propagation
-            logger.info("Waiting 15 seconds before fetching presale contract from blockchain...")
-            time.sleep(15)
+            TaskCheckpoint.current().wait_once(
+                "presale", 15, "Waiting 15 seconds before fetching presale contract from blockchain..."
+            )
             # Call getPresaleContract function
             presale_contract = dao_contract.functions.getPresaleContract(proposal_id).call()
             
@@ -90,6 +92,8 @@ class UpdateStatus:
                 network=contract.network
             )
             presale_service.update_presale_state(presale)
+            # Cache the immutable tier schedule so quotes never need the chain
+            presale_service.get_tier_schedule(presale)
             
             logger.info(f"Created Presale instance for proposal {proposal_id}")
             return presale
@@ -99,12 +103,14 @@ class UpdateStatus:
             # Continue with status update even if presale creation fails
             return None
 
-    def update_dip_status(self, dip):
+    def update_dip_status(self, dip, wait=True):
         """
         Update the status of a DIP
         
         Args:
             dip: The DIP object to update
+            wait: sleep before the reads to let fresh transactions propagate; scheduled
+                finalizations run after end_time and skip it
             
         Returns:
             The updated DIP object
@@ -112,14 +118,28 @@ class UpdateStatus:
         contract = self.fetch_contract(dip)
         proposal_id = dip.proposal_id
 
-        dip_service = DipConfirmationService(dao_address=contract.dao_address, network=contract.network)
-        
-        # Wait 15 seconds before fetching blockchain data to allow transaction propagation
-        logger.info("Waiting 15 seconds before fetching proposal status from blockchain...")
-        time.sleep(15)
-        proposal = dip_service.get_proposals(proposal_id=proposal_id)
-        if not proposal:
-            raise ValueError("no proposal data found")
+        # a retry resumes with the proposal state a failed attempt already read
+        checkpoint = TaskCheckpoint.current()
+        proposal = checkpoint.get("proposal")
+        if proposal is None:
+            dip_service = DipConfirmationService(dao_address=contract.dao_address, network=contract.network)
+
+            if wait:
+                # Wait 15 seconds before fetching blockchain data to allow transaction propagation
+                checkpoint.wait_once(
+                    "status", 15, "Waiting 15 seconds before fetching proposal status from blockchain..."
+                )
+            proposal = dip_service.get_proposals(proposal_id=proposal_id)
+            if not proposal:
+                raise ValueError("no proposal data found")
+            checkpoint.save(proposal=proposal)
+
+        if dip.end_time != proposal["end_time"]:
+            # the end time moved on chain, follow it and move the scheduled finalization
+            logger.info(f"dip {dip.id}: end time changed from {dip.end_time} to {proposal['end_time']}")
+            dip.end_time = proposal["end_time"]
+            dip.save(update_fields=["end_time"])
+            DipFinalizationService.schedule(dip)
 
         proposal_end_time = datetime.fromtimestamp(proposal["end_time"])
         dip_end_time = datetime.fromtimestamp(dip.end_time)
@@ -133,7 +153,7 @@ class UpdateStatus:
         logger.info(f"proposal: {proposal}")
 
         if is_time_ended:
-            sync_votes_task(dip.id)
+            sync_votes_task(dip.id, wait=wait)
             status = self.convert_status(proposal["executed"])
             logger.info(f"status: {status}")
             logger.info(
@@ -159,9 +179,11 @@ class UpdateStatus:
                 )
                 
                 try:
-                    # Wait 15 seconds before fetching blockchain data to allow transaction propagation
-                    logger.info("Waiting 15 seconds before fetching staking data from blockchain...")
-                    time.sleep(15)
+                    if wait:
+                        # Wait 15 seconds before fetching blockchain data to allow transaction propagation
+                        checkpoint.wait_once(
+                            "staking", 15, "Waiting 15 seconds before fetching staking data from blockchain..."
+                        )
                     
                     # Get the total staked amount
                     total_staked = blockchain_service.get_total_staked(staking_address)
@@ -185,7 +207,16 @@ class UpdateStatus:
                     if not quorum_reached:
                         dip.status = DipStatus.FAILED
                         logger.info(f"Proposal {proposal_id} failed due to insufficient quorum")
-                    elif status is not None:
+                    elif status is None:
+                        # voting is over but nobody executed it (yet), that is final for
+                        # the vote: a majority waits for execution, anything else failed
+                        for_votes = int(proposal.get("for_votes", 0))
+                        against_votes = int(proposal.get("against_votes", 0))
+                        dip.status = (
+                            DipStatus.PASSED if for_votes > against_votes else DipStatus.FAILED
+                        )
+                        logger.info(f"Proposal {proposal_id} ended unexecuted: {dip.status}")
+                    else:
                         # If the proposal is executed, update the treasury balance
                         if status == DipStatus.EXECUTED:
                             # Update treasury balance for the DAO
@@ -246,8 +277,8 @@ class UpdateStatus:
         }
         return status_map.get(executed_state)
         
-    def update_treasury_balance(self, dao):
-        """Update the treasury balance for a DAO"""
+    def update_treasury_balance(self, dao, raise_errors=False):
+        """Update the treasury balance for a DAO, errors are only logged unless raise_errors"""
         try:
             contract = dao.contracts.first()
             if not contract:
@@ -279,3 +310,5 @@ class UpdateStatus:
             
         except Exception as ex:
             logger.error(f"Failed to update treasury balance: {str(ex)}")
+            if raise_errors:
+                raise
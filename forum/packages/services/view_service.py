@@ -0,0 +1,140 @@
+import random
+import redis
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.db.models.functions import Greatest
+from forum.models import Thread, Dip, View
+from logging_config import logger
+from .redis_store import redis_client
+
+
+class ViewCounter:
+    """
+    unique viewers of threads and dips, counted in redis instead of a View row per user
+
+    every authenticated detail GET adds the user to a hyperloglog of the object (~0.8%
+    error, at most 12KB per object) and marks the object dirty; the flush task copies
+    the counts of dirty objects into views_count with one UPDATE per model and batch.
+    anonymous views are not counted unless VIEWS_ANONYMOUS_SAMPLE_RATE is set: a sampled
+    anonymous view then adds 1 / rate to a plain counter, there is no identity to dedupe.
+    views_count never decreases, counts recorded in View rows before the switch are kept
+    and seed() loads their viewers into the hyperloglogs so they are not counted twice.
+    """
+
+    MODELS = {"thread": Thread, "dip": Dip}
+    KEY = "views:{}"
+    ANONYMOUS_KEY = "views:anonymous:{}"
+    DIRTY_KEY = "views:dirty"
+
+    @classmethod
+    def _name(cls, obj) -> str:
+        return f"{obj._meta.model_name}:{obj.id}"
+
+    @classmethod
+    def record(cls, obj, user) -> int | None:
+        """
+        counts a detail view of obj, GET stays read-only against postgres
+
+        Returns:
+            int | None: live number of views of obj, None when redis is unreachable
+        """
+        name = cls._name(obj)
+        rate = settings.VIEWS_ANONYMOUS_SAMPLE_RATE
+        try:
+            pipeline = redis_client().pipeline(transaction=False)
+            if user and user.is_authenticated:
+                pipeline.pfadd(cls.KEY.format(name), user.id)
+                pipeline.sadd(cls.DIRTY_KEY, name)
+            elif rate > 0 and random.random() < rate:
+                pipeline.incrby(cls.ANONYMOUS_KEY.format(name), round(1 / rate))
+                pipeline.sadd(cls.DIRTY_KEY, name)
+            pipeline.pfcount(cls.KEY.format(name))
+            pipeline.get(cls.ANONYMOUS_KEY.format(name))
+            *_, unique, anonymous = pipeline.execute()
+        except redis.RedisError as ex:
+            # a lost view is better than a failed page
+            logger.error(f"failed to record view of {name}: {str(ex)}")
+            return None
+        return unique + int(anonymous or 0)
+
+    @classmethod
+    def _counts(cls, client, names) -> dict:
+        pipeline = client.pipeline(transaction=False)
+        for name in names:
+            pipeline.pfcount(cls.KEY.format(name))
+            pipeline.get(cls.ANONYMOUS_KEY.format(name))
+        results = pipeline.execute()
+        return {
+            name: unique + int(anonymous or 0)
+            for name, unique, anonymous in zip(names, results[::2], results[1::2])
+        }
+
+    @classmethod
+    def flush(cls) -> int:
+        """
+        writes the counts of the objects viewed since the last flush into views_count
+
+        Returns:
+            int: number of rows updated
+        """
+        client = redis_client()
+        updated = 0
+        while True:
+            names = [
+                name.decode()
+                for name in client.spop(cls.DIRTY_KEY, settings.VIEWS_FLUSH_BATCH) or ()
+            ]
+            if not names:
+                return updated
+            try:
+                by_model = {}
+                for name, count in cls._counts(client, names).items():
+                    model_name, object_id = name.split(":")
+                    by_model.setdefault(cls.MODELS[model_name], {})[int(object_id)] = count
+                with transaction.atomic():
+                    for model, counts in by_model.items():
+                        updated += model.objects.filter(id__in=counts).update(
+                            views_count=Greatest(
+                                F("views_count"),
+                                Case(
+                                    *[When(id=pk, then=Value(c)) for pk, c in counts.items()],
+                                    default=F("views_count"),
+                                    output_field=IntegerField(),
+                                ),
+                            )
+                        )
+            except Exception:
+                # the next flush picks them up again
+                client.sadd(cls.DIRTY_KEY, *names)
+                raise
+
+    @classmethod
+    def seed(cls, chunk_size=5000) -> int:
+        """
+        loads the viewers of the legacy View rows into the hyperloglogs
+
+        Returns:
+            int: number of View rows read
+        """
+        client = redis_client()
+        rows = (
+            View.objects.filter(
+                content_type__app_label="forum", content_type__model__in=cls.MODELS
+            )
+            .values_list("content_type__model", "object_id", "user_id")
+            .order_by("content_type_id", "object_id")
+            .iterator(chunk_size=chunk_size)
+        )
+        read = 0
+        pipeline = client.pipeline(transaction=False)
+        for model_name, object_id, user_id in rows:
+            name = f"{model_name}:{object_id}"
+            pipeline.pfadd(cls.KEY.format(name), user_id)
+            pipeline.sadd(cls.DIRTY_KEY, name)
+            read += 1
+            if read % chunk_size == 0:
+                pipeline.execute()
+        pipeline.execute()
+        logger.info(f"seeded view counters from {read} view rows")
+        return read
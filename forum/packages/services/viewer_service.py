@@ -0,0 +1,77 @@
+from collections import defaultdict
+from django.contrib.contenttypes.models import ContentType
+from forum.models import Dip, Like, Vote
+from .like_service import LikeCache
+
+
+class ViewerState:
+    """
+    likes and votes of the requesting user on a page of threads, dips and replies
+
+    load() resolves them for every object of the page with one query per model and
+    relation, the serializers then answer is_liked and user_vote from memory instead of
+    querying per object. objects that were not loaded fall back to a query of their own.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self.loaded = defaultdict(set)
+        self.liked = defaultdict(set)
+        self.votes = {}
+
+    @classmethod
+    def from_context(cls, context) -> "ViewerState":
+        """state loaded by the view, or an empty one querying per object"""
+        viewer = context.get("viewer")
+        if viewer is None:
+            viewer = cls(getattr(context.get("request"), "user", None))
+        return viewer
+
+    @property
+    def authenticated(self) -> bool:
+        return bool(self.user and self.user.is_authenticated)
+
+    def load(self, objects) -> "ViewerState":
+        if not self.authenticated:
+            return self
+
+        ids_by_model = defaultdict(set)
+        objects_by_model = defaultdict(list)
+        for obj in objects:
+            ids_by_model[type(obj)].add(obj.id)
+            objects_by_model[type(obj)].append(obj)
+
+        for model, ids in ids_by_model.items():
+            liked, cached = LikeCache.lookup(model, ids, self.user.id)
+            self.liked[model] |= liked
+            if ids - cached:
+                self.liked[model].update(
+                    Like.objects.filter(
+                        user=self.user,
+                        content_type=ContentType.objects.get_for_model(model),
+                        object_id__in=ids - cached,
+                    ).values_list("object_id", flat=True)
+                )
+                LikeCache.warm(
+                    model, [obj for obj in objects_by_model[model] if obj.id not in cached]
+                )
+            self.loaded[model] |= ids
+
+        if ids_by_model.get(Dip):
+            for vote in Vote.objects.filter(user=self.user, dip_id__in=ids_by_model[Dip]):
+                self.votes[vote.dip_id] = vote
+        return self
+
+    def is_liked(self, obj) -> bool:
+        if not self.authenticated:
+            return False
+        if obj.id in self.loaded[type(obj)]:
+            return obj.id in self.liked[type(obj)]
+        return obj.likes.filter(user=self.user).exists()
+
+    def vote(self, dip) -> Vote | None:
+        if not self.authenticated:
+            return None
+        if dip.id in self.loaded[Dip]:
+            return self.votes.get(dip.id)
+        return dip.votes.filter(user=self.user).first()
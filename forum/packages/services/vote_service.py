@@ -1,10 +1,12 @@
-from forum.models import Vote
+from forum.models import Dip, Vote
+from forum.packages.services.counter_service import VoteTally
 from dao.models import Dao
 from services.blockchain.dao_service import DaoConfirmationService
 from django.shortcuts import get_object_or_404
 from django.contrib.auth import get_user_model
 from django.db import transaction
-import time
+from services.utils.task_progress import TaskProgress
+from services.utils.task_checkpoint import TaskCheckpoint
 
 # from django.conf import settings
 from logging_config import logger
@@ -26,35 +28,74 @@ class VoteService:
         return user
 
     @staticmethod
-    def create_vote_instance(dip):
+    def create_vote_instance(dip, wait=True):
         contracts = VoteService._fetch_contracts(dip)
         logger.info(f"contracts: {contracts}")
 
-        blockchain_service = DaoConfirmationService(dao_address=contracts.dao_address, network=contracts.network)
-
-        # Wait 15 seconds before fetching blockchain data to allow transaction propagation
-        logger.info("Waiting 15 seconds before fetching vote data from blockchain...")
-        time.sleep(15)
-        votes_from_chain = blockchain_service.start_vote_sync_process(dip.proposal_id)
+        # a retry reuses the votes a failed attempt already fetched, saving them is idempotent
+        checkpoint = TaskCheckpoint.current()
+        votes_from_chain = checkpoint.get("votes", False)
+        if votes_from_chain is False:
+            blockchain_service = DaoConfirmationService(
+                dao_address=contracts.dao_address, network=contracts.network
+            )
+            if wait:
+                # Wait 15 seconds before fetching blockchain data to allow transaction propagation
+                checkpoint.wait_once(
+                    "votes", 15, "Waiting 15 seconds before fetching vote data from blockchain..."
+                )
+            votes_from_chain = blockchain_service.start_vote_sync_process(dip.proposal_id)
+            checkpoint.save(votes=votes_from_chain)
 
         if votes_from_chain is None:
             logger.info(f"no votes found on chain for proposal: {dip.proposal_id}")
             return []
 
+        return VoteService.save_votes(dip, votes_from_chain)
+
+    @staticmethod
+    def save_votes(dip, votes, overwrite=False):
+        """
+        persists decoded Voted events for a dip
+
+        Args:
+            dip (Dip): the dip the votes belong to
+            votes (list): dicts with voter_address, support and voting_power
+            overwrite (bool): replace already stored votes (used when reprocessing raw logs)
+
+        Returns:
+            list: the stored Vote objects
+        """
         created_votes = []
+        new_votes = []
+        progress = TaskProgress.current()
+        progress.update(stage="saving votes", done=0, total=len(votes))
 
         with transaction.atomic():
-            for vote in votes_from_chain:
+            for vote in votes:
                 user = VoteService._create_user(vote["voter_address"])
+                defaults = {
+                    "support": vote["support"],
+                    "voting_power": vote["voting_power"],
+                }
 
-                vote, created = Vote.objects.get_or_create(
-                    dip=dip,
-                    user=user,
-                    defaults={
-                        "support": vote["support"],
-                        "voting_power": vote["voting_power"],
-                    },
-                )
+                if overwrite:
+                    vote, created = Vote.objects.update_or_create(
+                        dip=dip, user=user, defaults=defaults
+                    )
+                else:
+                    vote, created = Vote.objects.get_or_create(
+                        dip=dip, user=user, defaults=defaults
+                    )
                 created_votes.append(vote)
+                if created:
+                    new_votes.append(vote)
+                progress.update(done=len(created_votes))
+
+            if overwrite:
+                # an overwritten vote may have changed side or power
+                VoteTally.recompute(Dip.objects.filter(id=dip.id))
+            else:
+                VoteTally.add(dip, new_votes)
 
         return created_votes
@@ -12,6 +12,10 @@ from user.serializers import UserSerializer
 from django.shortcuts import get_object_or_404
 from logging_config import logger
 from .packages.abstract.abstract_models import ProposalType
+from .packages.services.finalization_service import DipFinalizationService
+from .packages.services.counter_service import ContentCounters
+from .packages.services.viewer_service import ViewerState
+from services.utils.backpressure import QueueOverloaded
 from django.contrib.auth import get_user_model
 
 
@@ -32,8 +36,6 @@ class BaseForumSerializer(serializers.ModelSerializer):
     """base serializer for thread dip fields"""
 
     author = UserSerializer(read_only=True)
-    replies_count = serializers.SerializerMethodField()
-    likes_count = serializers.SerializerMethodField()
     is_liked = serializers.SerializerMethodField()
     content = serializers.JSONField(validators=[LexicalContentValidator()])
 
@@ -49,6 +51,9 @@ class BaseForumSerializer(serializers.ModelSerializer):
             "replies_count",
             "likes_count",
             "is_liked",
+            "excerpt",
+            "word_count",
+            "first_image",
             "author",
             "dao",
         ]
@@ -60,19 +65,14 @@ class BaseForumSerializer(serializers.ModelSerializer):
             "author",
             "dao",
             "replies_count",
+            "likes_count",
+            "excerpt",
+            "word_count",
+            "first_image",
         ]
 
-    def get_replies_count(self, obj) -> int:
-        return obj.replies.count()
-
-    def get_likes_count(self, obj) -> int:
-        return obj.likes.count()
-
     def get_is_liked(self, obj) -> bool:
-        request = self.context.get("request")
-        if request and request.user.is_authenticated:
-            return obj.likes.filter(user=request.user).exists()
-        return False
+        return ViewerState.from_context(self.context).is_liked(obj)
 
     def validate(self, attrs):
         dao = Dao.objects.filter(slug=self.context.get("slug")).first()
@@ -91,33 +91,27 @@ class BaseForumSerializer(serializers.ModelSerializer):
             )
         return False
 
-    def to_representation(self, instance):
-        representation = super().to_representation(instance)
+    def get_fields(self):
+        fields = super().get_fields()
         view = self.context.get("view")
         if view and view.action == "list":
-            representation.pop("content")
-        return representation
+            # deferred by the list querysets, the excerpt previews it
+            fields.pop("content")
+        return fields
 
 
 class ReplySerializer(serializers.ModelSerializer):
     author = UserSerializer(read_only=True)
-    likes_count = serializers.SerializerMethodField()
     is_liked = serializers.SerializerMethodField()
     content = serializers.JSONField(validators=[LexicalContentValidator()])
 
     class Meta:
         model = Reply
         fields = ["id", "content", "author", "created_at", "likes_count", "is_liked"]
-        read_only_fields = ["id", "author", "created_at"]
-
-    def get_likes_count(self, obj):
-        return obj.likes.count()
+        read_only_fields = ["id", "author", "created_at", "likes_count"]
 
     def get_is_liked(self, obj):
-        request = self.context.get("request")
-        if request and request.user.is_authenticated:
-            return obj.likes.filter(user=request.user).exists()
-        return False
+        return ViewerState.from_context(self.context).is_liked(obj)
 
     def _get_parent_object(self):
         """helper method to get parent Thread or Dip object"""
@@ -141,6 +135,7 @@ class ReplySerializer(serializers.ModelSerializer):
                     author=self.context["request"].user,
                     **validated_data,
                 )
+                ContentCounters.reply_added(parent_obj)
                 return reply
         except Exception as ex:
             raise serializers.ValidationError(str(ex))
@@ -152,15 +147,18 @@ class ThreadSerializer(BaseForumSerializer):
 
 
 class ThreadDetailSerializer(ThreadSerializer):
-    replies = ReplySerializer(many=True, read_only=True)
+    # first page of replies attached by the view, replies_next links to the rest
+    replies = ReplySerializer(source="first_replies", many=True, read_only=True)
+    replies_next = serializers.CharField(read_only=True, allow_null=True)
 
     class Meta(ThreadSerializer.Meta):
-        fields = ThreadSerializer.Meta.fields + ["replies"]
+        fields = ThreadSerializer.Meta.fields + ["replies", "replies_next"]
 
 
 class DipSerializer(BaseForumSerializer):
     proposal_data = serializers.JSONField(required=True)
     proposal_type = serializers.CharField()
+    awaiting_finalization = serializers.SerializerMethodField()
 
     class Meta(BaseForumSerializer.Meta):
         model = Dip
@@ -180,6 +178,10 @@ class DipSerializer(BaseForumSerializer):
             "replies_count",
             "likes_count",
             "is_liked",
+            "awaiting_finalization",
+            "excerpt",
+            "word_count",
+            "first_image",
             "dao",
         ]
         read_only_fields = [
@@ -195,8 +197,14 @@ class DipSerializer(BaseForumSerializer):
             "replies_count",
             "likes_count",
             "is_liked",
+            "excerpt",
+            "word_count",
+            "first_image",
         ]
 
+    def get_awaiting_finalization(self, obj) -> bool:
+        return DipFinalizationService.is_awaiting_finalization(obj)
+
     def validate_proposal_type(self, value):
         type_map = {
             "Transfer": "0",
@@ -227,12 +235,12 @@ class DipSerializer(BaseForumSerializer):
             representation.pop("proposal_id", None)
         representation.pop("dao")
 
+        # stored tallies, whole numbers of wei that would lose precision as floats
         proposal_data = representation["proposal_data"]
-        proposal_data["for_votes"] = getattr(instance, "for_votes", 0)
-        proposal_data["against_votes"] = getattr(instance, "against_votes", 0)
-        proposal_data["total_votes"] = (
-            proposal_data["for_votes"] + proposal_data["against_votes"]
-        )
+        proposal_data["for_votes"] = int(instance.for_votes)
+        proposal_data["against_votes"] = int(instance.against_votes)
+        proposal_data["total_votes"] = int(instance.total_votes)
+        proposal_data["voter_count"] = instance.voter_count
 
         representation["proposal_data"] = proposal_data
         return representation
@@ -276,6 +284,8 @@ class DipRefreshSerializer(serializers.ModelSerializer):
             result = sync_service.start_blockchain_sync(validated_data["dao"])
             return result
 
+        except QueueOverloaded:
+            raise
         except Exception as ex:
             logger.info(f"error: {str(ex)}")
             raise serializers.ValidationError(
@@ -291,18 +301,21 @@ class DipSingleRefreshSerializer(serializers.ModelSerializer):
 
 
 class DipDetailSerializer(DipSerializer):
-    replies = ReplySerializer(many=True, read_only=True)
+    # first page of replies attached by the view, replies_next links to the rest
+    replies = ReplySerializer(source="first_replies", many=True, read_only=True)
+    replies_next = serializers.CharField(read_only=True, allow_null=True)
 
     class Meta(DipSerializer.Meta):
         fields = DipSerializer.Meta.fields + [
             "replies",
+            "replies_next",
         ]
 
     def to_representation(self, instance):
         representation = super().to_representation(instance)
         request = self.context.get("request")
         if request and request.user.is_authenticated:
-            user_vote = instance.votes.filter(user=request.user).first()
+            user_vote = ViewerState.from_context(self.context).vote(instance)
             if user_vote:
                 representation["user_vote"] = {
                     "has_voted": True,
@@ -1,42 +1,51 @@
 from celery import shared_task
+from django.conf import settings
 from django.utils import timezone
 from datetime import timedelta
 from logging_config import logger
-from dao.models import Presale, PresaleStatus
+from dao.models import Presale
 from dao.packages.services.presale_service import PresaleService
+from dao.packages.services.presale_sync_service import PresaleStateSyncService
+from services.utils.task_lock import TaskLease
+from services.utils.task_checkpoint import TaskCheckpoint
+from services.utils.task_result import TaskSummary
 
 
 @shared_task(bind=True)
 def dip_cleanup(self):
     from .models import Dip, DipStatus
+    from services.utils.purge import ChunkedPurge
 
     logger.info(f" task {self.request.id}: DIP cleanup started")
+    summary = TaskSummary()
     try:
         now = timezone.now()
 
         cutoff_time = now - timedelta(days=1)
         logger.info(f"searching for dips created before: {cutoff_time}")
 
-        dips_count = Dip.objects.filter(
-            status=DipStatus.DRAFT, created_at__lte=cutoff_time
-        ).count()
+        # batched deletes keep cascades (replies, likes, views, votes) in short transactions
+        purge = ChunkedPurge(
+            Dip.objects.filter(status=DipStatus.DRAFT, created_at__lte=cutoff_time),
+            name="dip_cleanup",
+        )
+        return summary.result(**purge.run())
 
-        logger.info(f"found {dips_count} dips to delete")
+    except Exception as ex:
+        logger.error(f"error in dip_cleanup task: {str(ex)}")
+        raise
 
-        if dips_count > 0:
-            deleted_count, details = Dip.objects.filter(
-                status=DipStatus.DRAFT, created_at__lte=cutoff_time
-            ).delete()
-            logger.info(f"dip cleanup completed, deleted: {deleted_count}")
-        else:
-            logger.info(f"no dips found to delete")
 
-        return (
-            f"processes {dips_count} dips deleted {dips_count if dips_count > 0 else 0}"
-        )
+@shared_task(bind=True)
+def flush_view_counts(self):
+    """copy the view counters of recently viewed threads and dips into views_count"""
+    from .packages.services.view_service import ViewCounter
 
+    summary = TaskSummary()
+    try:
+        return summary.result(updated=ViewCounter.flush())
     except Exception as ex:
-        logger.error(f"error in dip_cleanup task: {str(ex)}")
+        logger.error(f"error in flush_view_counts task: {str(ex)}")
         raise
 
 
@@ -47,11 +56,22 @@ def dip_cleanup(self):
     autoretry_for=(Exception,),
     name="blockchain.sync_proposals",
 )
-def sync_proposals_task(self, dao_id: int):
-    help = "handles the entire dip sync process"
+def sync_proposals_task(self, dao_id: int, wait=True):
+    """
+    handles the entire dip sync process
+
+    Args:
+        dao_id (int): dao to sync
+        wait (bool): sleep before reading the proposals to let fresh transactions propagate
+    """
 
     from services.blockchain.dip_sync_service import DipSyncronizationService
 
+    summary = TaskSummary()
+    lease = TaskLease(self, dao_id)
+    if not lease.acquire_or_retry():
+        return summary.result("skipped", dao_id=dao_id, message="dao sync already running")
+
     try:
 
         from dao.models import Dao, Contract
@@ -63,17 +83,25 @@ def sync_proposals_task(self, dao_id: int):
         logger.debug(f"contract is here: {contract}\n type: {(type(contract))}")
 
         sync_service = DipSyncronizationService(contract)
-        result = sync_service.process_blockchain_data(dao)
+        result = sync_service.process_blockchain_data(dao, wait=wait)
         logger.info(f"result: {result}")
-
-        return {
-            "status": "completed",
-            "message": f"syncronized {len(result)} proposals",
-            "data": [dip.id for dip in result],
-        }
+        TaskCheckpoint(self.request.id).clear()
+
+        # the synced dips are read from the database, the result only keeps the cursor
+        return summary.result(
+            dao_id=dao_id,
+            message=f"syncronized {len(result)} proposals",
+            count=len(result),
+            last_proposal_id=max(
+                (dip.proposal_id for dip in result if dip.proposal_id is not None),
+                default=None,
+            ),
+        )
     except Exception as ex:
         logger.error(f"async task failed: {str(ex)}")
         raise self.retry(exc=ex)
+    finally:
+        lease.release()
 
 
 @shared_task(
@@ -83,12 +111,13 @@ def sync_proposals_task(self, dao_id: int):
     autoretry_for=(Exception,),
     name="blockchain.sync_votes",
 )
-def sync_votes_task(self, dip_id):
+def sync_votes_task(self, dip_id, wait=True):
     """
     handles votes syncronization process
 
     Args:
         proposal_id (int): _description_
+        wait (bool): sleep before reading the votes to let fresh transactions propagate
 
     Raises:
         self.retry: _description_
@@ -99,22 +128,32 @@ def sync_votes_task(self, dip_id):
     from forum.models import Dip
     from .packages.services.vote_service import VoteService
 
+    summary = TaskSummary()
+    lease = TaskLease(self, dip_id)
+    if not lease.acquire_or_retry():
+        return summary.result("skipped", dip_id=dip_id, message="vote sync already running")
+
     try:
         dip = Dip.objects.get(id=dip_id)
 
         vote_service = VoteService()
-        result = vote_service.create_vote_instance(dip)
-
-        return {
-            "status": "completed",
-            "dip_id": dip_id,
-            "message": f"syncronized {len(result)} votes",
-            "data": [{"id": vote.id, "support": vote.support} for vote in result],
-        }
+        result = vote_service.create_vote_instance(dip, wait=wait)
+        TaskCheckpoint(self.request.id).clear()
+
+        for_count = sum(1 for vote in result if vote.support)
+        return summary.result(
+            dip_id=dip_id,
+            message=f"syncronized {len(result)} votes",
+            count=len(result),
+            for_count=for_count,
+            against_count=len(result) - for_count,
+        )
 
     except Exception as ex:
         logger.error(f"async task failed in votes_task: {str(ex)}")
         raise self.retry(exc=ex)
+    finally:
+        lease.release()
 
 
 @shared_task(
@@ -136,19 +175,192 @@ def sync_dip_status(self, dip_id):
     from .packages.services.status_service import UpdateStatus
     from .models import Dip
 
+    summary = TaskSummary()
+    lease = TaskLease(self, dip_id)
+    if not lease.acquire_or_retry():
+        return summary.result("skipped", dip_id=dip_id, success=False)
+
     try:
         dip = Dip.objects.get(id=dip_id)
         update_service = UpdateStatus()
         updated_dip = update_service.update_dip_status(dip)
-        return {
-            "dip_id": dip_id,
-            "proposal_id": dip.proposal_id,
-            "success": True,
-            "status": updated_dip.status,
-        }
+        TaskCheckpoint(self.request.id).clear()
+        return summary.result(
+            updated_dip.status,
+            dip_id=dip_id,
+            proposal_id=dip.proposal_id,
+            success=True,
+        )
     except Exception as ex:
         logger.error(f"async task failed in dip_status: {str(ex)}")
         self.retry(exc=ex)
+    finally:
+        lease.release()
+
+
+@shared_task(
+    bind=True,
+    max_retries=8,
+    autoretry_for=(Exception,),
+    retry_backoff=30,
+    retry_backoff_max=1800,
+    retry_jitter=True,
+    name="blockchain.finalize_dip_status",
+)
+def finalize_dip_status(self, dip_id, expected_end_time):
+    """
+    reads the final status of a dip once its voting period is over, scheduled with an
+    eta by DipFinalizationService. an ended proposal is executed, failed or passed and
+    waiting for execution, the task only retries (with backoff) when reading it failed
+
+    Args:
+        dip_id (int): The ID of the DIP to finalize
+        expected_end_time (int): end_time the task was scheduled for
+
+    Returns:
+        dict: finalization status
+    """
+    from .packages.services.status_service import UpdateStatus
+    from .models import Dip, DipStatus
+
+    summary = TaskSummary()
+    dip = Dip.objects.filter(id=dip_id).first()
+    if dip is None or dip.status != DipStatus.ACTIVE or dip.end_time != expected_end_time:
+        # already finalized, deleted, or rescheduled for a new end time
+        return summary.result("skipped", dip_id=dip_id)
+
+    remaining = dip.end_time - timezone.now().timestamp()
+    if remaining > 0:
+        # the eta fired early (clock drift), come back when voting is over
+        raise self.retry(countdown=remaining + settings.DIP_FINALIZE_MARGIN)
+
+    lease = TaskLease(self, dip_id)
+    if not lease.acquire_or_retry():
+        return summary.result("skipped", dip_id=dip_id)
+
+    try:
+        updated_dip = UpdateStatus().update_dip_status(dip, wait=False)
+    finally:
+        lease.release()
+    # the next attempt has to read the proposal state again
+    TaskCheckpoint(self.request.id).clear()
+
+    if updated_dip.end_time != expected_end_time:
+        # the end time moved on chain, update_dip_status scheduled the new one
+        return summary.result("rescheduled", dip_id=dip_id, end_time=updated_dip.end_time)
+    if updated_dip.status == DipStatus.ACTIVE:
+        # the chain end time has passed, only a failed read leaves the dip active
+        raise ValueError(f"dip {dip_id} ended but its outcome could not be read")
+    return summary.result(updated_dip.status, dip_id=dip_id, proposal_id=dip.proposal_id)
+
+
+@shared_task(bind=True, name="blockchain.schedule_dip_finalizations")
+def schedule_dip_finalizations(self):
+    """schedule the finalization of the dips ending within the look-ahead window"""
+    from .packages.services.finalization_service import DipFinalizationService
+
+    summary = TaskSummary()
+    try:
+        return summary.result(scheduled=DipFinalizationService.schedule_upcoming())
+    except Exception as ex:
+        logger.error(f"error in schedule_dip_finalizations task: {str(ex)}")
+        raise
+
+
+@shared_task(
+    bind=True,
+    max_retries=3,
+    default_retry_delay=5,
+    autoretry_for=(Exception,),
+    name="blockchain.sync_treasury",
+)
+def sync_treasury_task(self, dao_id):
+    """
+    refresh the treasury token and native balances of a dao
+
+    Args:
+        dao_id (int): The ID of the DAO
+
+    Returns:
+        dict: sync status
+    """
+    from dao.models import Dao
+    from .packages.services.status_service import UpdateStatus
+
+    summary = TaskSummary()
+    lease = TaskLease(self, dao_id)
+    if not lease.acquire_or_retry():
+        return summary.result("skipped", dao_id=dao_id)
+
+    try:
+        dao = Dao.objects.get(id=dao_id)
+        UpdateStatus().update_treasury_balance(dao)
+        return summary.result(dao_id=dao_id)
+    except Exception as ex:
+        logger.error(f"async task failed in treasury_task: {str(ex)}")
+        raise self.retry(exc=ex)
+    finally:
+        lease.release()
+
+
+@shared_task(bind=True, name="blockchain.schedule_fleet_sync")
+def schedule_fleet_sync(self):
+    """enqueue the incremental syncs that are due for every active dao"""
+    from dao.packages.services.fleet_sync_service import FleetSyncScheduler
+
+    summary = TaskSummary()
+    try:
+        return summary.result(**FleetSyncScheduler().run())
+    except Exception as ex:
+        logger.error(f"error in schedule_fleet_sync task: {str(ex)}")
+        raise
+
+
+@shared_task(bind=True, name="blockchain.fleet_sweep")
+def fleet_sweep(self, operation, concurrency=None):
+    """
+    fans a fleet wide operation ("treasury" or "presales") out into per-network batches
+
+    Returns:
+        dict: the id of the aggregation task to follow the sweep with
+    """
+    from dao.packages.services.fleet_fanout_service import FleetFanout
+
+    summary = TaskSummary()
+    result = FleetFanout(operation, concurrency=concurrency).start()
+    return summary.result(
+        "started" if result else "skipped",
+        operation=operation,
+        aggregate_task_id=result.id if result else None,
+    )
+
+
+@shared_task(bind=True, name="blockchain.fleet_sync_batch")
+def fleet_sync_batch(self, operation, network, keys):
+    """runs one batch of a fleet sweep, failures of single units are reported, not raised"""
+    from dao.packages.services.fleet_fanout_service import FleetFanout
+
+    return FleetFanout(operation).run_batch(network, keys)
+
+
+@shared_task(bind=True, name="blockchain.fleet_sync_finish")
+def fleet_sync_finish(self, outcomes, operation, started_at):
+    """chord callback aggregating the batches of a fleet sweep"""
+    from dao.packages.services.fleet_fanout_service import FleetFanout
+
+    summary = TaskSummary()
+    result = FleetFanout.aggregate(outcomes)
+    wall_time = round(timezone.now().timestamp() - started_at, 3)
+    logger.info(
+        f"fleet {operation} sweep: {result['succeeded']} succeeded, {result['failed']} failed "
+        f"in {result['batches']} batches, {wall_time}s"
+    )
+    return summary.result(
+        "completed" if not result["failed"] else "partial",
+        operation=operation,
+        wall_time=wall_time,
+        **result,
+    )
 
 
 @shared_task(
@@ -164,54 +376,49 @@ def update_presale_state(self, presale_id=None):
     
     Args:
         presale_id (int, optional): The ID of the specific presale to update.
-            If None, update all active presales.
+            If None, active presales are refreshed based on observed trade events.
     
     Returns:
         dict: Information about the updated presales
     """
+    summary = TaskSummary()
     try:
-        # Get presales to update
-        if presale_id:
-            presales = Presale.objects.filter(id=presale_id)
-        else:
-            # Only update active presales
-            presales = Presale.objects.filter(status=PresaleStatus.ACTIVE)
+        if not presale_id:
+            # Only presales with new TokensPurchased/TokensSold logs (or a stale
+            # heartbeat) are re-read, one log scan per network
+            sync = PresaleStateSyncService.sync_active()
+            return summary.result(
+                message=f"Updated {len(sync['refreshed'])} presales",
+                networks=sync["networks"],
+                scanned_count=sync["scanned"],
+                updated_count=len(sync["refreshed"]),
+                trades=sync["trades"],
+            )
+
+        presales = Presale.objects.filter(id=presale_id).select_related("dao")
         
         if not presales:
             logger.info(f"No presales to update")
-            return {
-                "status": "completed",
-                "message": "No presales to update",
-                "updated_count": 0,
-            }
+            return summary.result(message="No presales to update", updated_count=0)
         
         updated_presales = []
         
         # Update each presale
         for presale in presales:
-            # Get the contract for the presale's DAO
-            from dao.models import Contract
-            contract = Contract.objects.filter(dao_id=presale.dao_id).first()
-            
-            if not contract:
-                logger.error(f"No contract found for presale {presale.id}")
-                continue
-            
             # Update the presale state
             presale_service = PresaleService(
                 presale_contract=presale.presale_contract,
-                network=contract.network
+                network=presale.dao.network
             )
             updated_presale = presale_service.update_presale_state(presale)
             
             if updated_presale:
                 updated_presales.append(updated_presale.id)
         
-        return {
-            "status": "completed",
-            "message": f"Updated {len(updated_presales)} presales",
-            "updated_presales": updated_presales,
-        }
+        return summary.result(
+            message=f"Updated {len(updated_presales)} presales",
+            updated_count=len(updated_presales),
+        )
     
     except Exception as ex:
         logger.error(f"Error updating presale state: {str(ex)}")
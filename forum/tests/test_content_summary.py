@@ -0,0 +1,43 @@
+from django.test import SimpleTestCase
+
+from forum.packages.services.content_summary import ContentSummary
+
+
+def paragraph(*children, type="paragraph"):
+    return {"type": type, "children": list(children)}
+
+
+def text(value):
+    return {"type": "text", "text": value}
+
+
+class ContentSummaryTests(SimpleTestCase):
+    def test_text_of_the_tree_is_flattened_in_document_order(self):
+        content = {
+            "root": paragraph(
+                paragraph(text("Fund "), text("the gr"), text("ant"), type="heading"),
+                paragraph(text("see"), {"type": "linebreak"}, text("the docs")),
+                {"type": "image", "src": "data:image/png;base64,AAAA"},
+                {"type": "image", "src": "https://example.com/a.png"},
+                {"type": "image", "src": "https://example.com/b.png"},
+                type="root",
+            )
+        }
+
+        self.assertEqual(
+            ContentSummary.of(content),
+            ("Fund the grant see the docs", 6, "https://example.com/a.png"),
+        )
+
+    def test_long_text_is_cut_on_a_word_boundary(self):
+        content = {"root": paragraph(paragraph(text("lorem " * 100)), type="root")}
+
+        excerpt, words, _ = ContentSummary.of(content)
+
+        self.assertEqual(words, 100)
+        self.assertLessEqual(len(excerpt), ContentSummary.EXCERPT_LENGTH + 1)
+        self.assertTrue(excerpt.endswith("lorem…"))
+
+    def test_content_without_text_has_an_empty_summary(self):
+        self.assertEqual(ContentSummary.of({"root": {"children": []}}), ("", 0, ""))
+        self.assertEqual(ContentSummary.of(None), ("", 0, ""))
@@ -1,4 +1,5 @@
 import json, copy
+from io import StringIO
 from uuid import uuid4
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.test import APITestCase
@@ -7,7 +8,12 @@ from rest_framework import status
 from core.helpers.create_user import create_user
 from dao.tests.dao_utils import DaoFactoryMixin
 from unittest.mock import patch, MagicMock
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from forum.models import Dip, Vote
+from forum.packages.services.vote_service import VoteService
 from .forum_utils import DipBaseMixin
 
 from logging_config import logger
@@ -62,6 +68,10 @@ class DipAPITests(APITestCase):
             "title": "no title",
         }
 
+    def setUp(self):
+        # pending task markers and view counters live in redis and would leak between tests
+        cache.clear()
+
     def test_dip_retrieves_empty_list_successful(self):
         self.dao.delete()
 
@@ -262,6 +272,43 @@ class DipAPITests(APITestCase):
 
         mock_sync_votes_task.assert_called_once_with(str(self.dip.id))
 
+    @patch("forum.tasks.sync_votes_task.delay")
+    def test_dip_vote_refresh_is_coalesced(self, mock_sync_votes_task):
+        """Repeated refreshes of the same DIP join the task already queued"""
+        mock_task = MagicMock()
+        mock_task.id = "test-task-id-3"
+        mock_sync_votes_task.return_value = mock_task
+
+        responses = [
+            self.client.post(
+                f"/api/v1/refresh/dip/{self.dip.id}/vote/", **self.HTTP_AUTHORIZATION
+            )
+            for _ in range(3)
+        ]
+
+        for response in responses:
+            self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+            self.assertEqual(response.data["task_id"], "test-task-id-3")
+        mock_sync_votes_task.assert_called_once_with(str(self.dip.id))
+
+    @patch("forum.tasks.sync_votes_task.delay")
+    def test_queued_task_status_can_be_polled(self, mock_sync_votes_task):
+        mock_task = MagicMock()
+        mock_task.id = "test-task-id-4"
+        mock_sync_votes_task.return_value = mock_task
+
+        self.client.post(
+            f"/api/v1/refresh/dip/{self.dip.id}/vote/", **self.HTTP_AUTHORIZATION
+        )
+        response = self.client.get("/api/v1/refresh/tasks/test-task-id-4/")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["task"], "blockchain.sync_votes")
+        self.assertEqual(response.data["state"], "queued")
+
+        response = self.client.get("/api/v1/refresh/tasks/unknown-task-id/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
     def test_like_reply_on_dip_is_successful(self):
         response_reply = self.client.post(
             f"{self.url_prefix}{self.dip.id}/replies/",
@@ -284,3 +331,51 @@ class DipAPITests(APITestCase):
         )
         self.assertEqual(response_unlike.status_code, status.HTTP_200_OK)
         self.assertEqual(response_unlike.data["status"], "unliked")
+
+    def test_dips_are_walked_by_proposal_id_with_drafts_last(self):
+        dao = self.dao_factory.create_dao(slug="keyset")
+        dip_base = DipBaseMixin(dao=dao, author=self.user)
+        for proposal_id in [None, *range(2, 14), None, None]:
+            dip = dip_base.create_dip()
+            Dip.objects.filter(id=dip.id).update(proposal_id=proposal_id)
+        url = "/api/v1/dao/keyset/dips/"
+
+        first = self.client.get(url).data["data"]
+        self.assertEqual(
+            [dip["proposal_id"] for dip in first["results"]], list(range(13, 3, -1))
+        )
+        second = self.client.get(first["next"]).data["data"]
+        self.assertEqual([dip.get("proposal_id") for dip in second["results"]][:2], [3, 2])
+        self.assertEqual(len(second["results"]), 5)
+        self.assertIsNone(second["next"])
+
+        back = self.client.get(second["previous"]).data["data"]
+        self.assertEqual(back["results"], first["results"])
+
+    def test_vote_tallies_are_stored_on_the_dip(self):
+        dip = self.dip
+        votes = [
+            {
+                "voter_address": f"0x{uuid4().hex}{uuid4().hex[:8]}",
+                "support": support,
+                "voting_power": power,
+            }
+            for support, power in [(True, 3 * 10**18), (False, 10**18)]
+        ]
+        VoteService.save_votes(dip, votes)
+        # stored votes are not counted twice
+        VoteService.save_votes(dip, votes[:1])
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url_prefix)
+        self.assertFalse(any("forum_vote" in query["sql"] for query in queries))
+        data = next(d for d in response.data["data"]["results"] if d["id"] == dip.id)
+        self.assertEqual(data["proposal_data"]["for_votes"], 3 * 10**18)
+        self.assertEqual(data["proposal_data"]["against_votes"], 10**18)
+        self.assertEqual(data["proposal_data"]["total_votes"], 4 * 10**18)
+        self.assertEqual(data["proposal_data"]["voter_count"], 2)
+
+        Dip.objects.filter(id=dip.id).update(for_votes=0, voter_count=0)
+        call_command("recompute_vote_tallies", str(dip.id), stdout=StringIO())
+        dip.refresh_from_db()
+        self.assertEqual((dip.for_votes, dip.voter_count), (3 * 10**18, 2))
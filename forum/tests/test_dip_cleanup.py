@@ -0,0 +1,61 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from dao.tests.dao_utils import DaoFactoryMixin
+from forum.models import Dip, DipStatus, Reply
+from forum.tasks import dip_cleanup
+from services.utils.purge import ChunkedPurge
+
+
+class DipCleanupTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.dao = DaoFactoryMixin().create_dao()
+        self.old_drafts = [self._dip(DipStatus.DRAFT, days=2) for _ in range(5)]
+        self.new_draft = self._dip(DipStatus.DRAFT, days=0)
+        self.old_active = self._dip(DipStatus.ACTIVE, days=2)
+
+        Reply.objects.create(
+            content_object=self.old_drafts[0], author=self.dao.owner, content={}
+        )
+
+    def _dip(self, status, days):
+        dip = Dip.objects.create(dao=self.dao, author=self.dao.owner, status=status)
+        Dip.objects.filter(id=dip.id).update(
+            created_at=timezone.now() - timedelta(days=days)
+        )
+        return dip
+
+    def _old_drafts(self):
+        return Dip.objects.filter(
+            status=DipStatus.DRAFT, created_at__lte=timezone.now() - timedelta(days=1)
+        )
+
+    def test_dip_cleanup_deletes_only_old_drafts_with_cascades(self):
+        result = dip_cleanup.apply().get()
+
+        self.assertTrue(result["completed"])
+        self.assertEqual(result["deleted"], 5)
+        self.assertEqual(
+            set(Dip.objects.values_list("id", flat=True)),
+            {self.new_draft.id, self.old_active.id},
+        )
+        self.assertFalse(Reply.objects.exists())
+
+    def test_purge_runs_in_batches_and_resumes_from_cursor(self):
+        purge = ChunkedPurge(self._old_drafts(), name="test", batch_size=2, pause=0)
+
+        first = purge.run(max_batches=1)
+        self.assertEqual(first["deleted"], 2)
+        self.assertFalse(first["completed"])
+        self.assertEqual(cache.get(purge.cursor_key), self.old_drafts[1].id)
+
+        second = purge.run()
+        self.assertEqual(second["deleted"], 3)
+        self.assertEqual(second["batches"], 2)
+        self.assertTrue(second["completed"])
+        self.assertIsNone(cache.get(purge.cursor_key))
+        self.assertFalse(self._old_drafts().exists())
@@ -0,0 +1,94 @@
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from dao.tests.dao_utils import DaoFactoryMixin
+from forum.models import Dip, DipStatus
+from forum.packages.services.finalization_service import DipFinalizationService
+from forum.serializers import DipSerializer
+from forum.tasks import finalize_dip_status
+
+
+@patch("forum.tasks.finalize_dip_status.apply_async")
+class DipFinalizationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.dao = DaoFactoryMixin().create_dao()
+
+    def _dip(self, seconds, status=DipStatus.ACTIVE):
+        return Dip.objects.create(
+            dao=self.dao,
+            author=self.dao.owner,
+            status=status,
+            end_time=int((timezone.now() + timedelta(seconds=seconds)).timestamp()),
+            proposal_data={},
+        )
+
+    def _schedule(self, dip):
+        with self.captureOnCommitCallbacks(execute=True):
+            return DipFinalizationService.schedule(dip)
+
+    def test_dip_ending_soon_is_scheduled_once_per_end_time(self, apply_async):
+        dip = self._dip(600)
+
+        self.assertTrue(self._schedule(dip))
+        self.assertFalse(self._schedule(dip))
+
+        apply_async.assert_called_once()
+        kwargs = apply_async.call_args.kwargs
+        self.assertEqual(kwargs["args"], (dip.id, dip.end_time))
+        self.assertEqual(kwargs["eta"], DipFinalizationService.finalize_at(dip.end_time))
+
+        dip.end_time += 300
+        self.assertTrue(self._schedule(dip))
+        self.assertEqual(apply_async.call_count, 2)
+
+    def test_far_and_inactive_dips_are_left_to_the_sweep(self, apply_async):
+        far = self._dip(24 * 3600)
+        draft = self._dip(600, status=DipStatus.DRAFT)
+
+        self.assertFalse(self._schedule(far))
+        self.assertFalse(self._schedule(draft))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(DipFinalizationService.schedule_upcoming(), 0)
+
+        Dip.objects.filter(id=far.id).update(end_time=self._dip(60).end_time)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(DipFinalizationService.schedule_upcoming(), 2)
+        apply_async.assert_called()
+
+    def test_ended_active_dip_is_awaiting_finalization(self, apply_async):
+        ended = self._dip(-60)
+        running = self._dip(600)
+
+        self.assertTrue(DipSerializer(ended).data["awaiting_finalization"])
+        self.assertFalse(DipSerializer(running).data["awaiting_finalization"])
+
+    @patch("forum.packages.services.status_service.sync_votes_task")
+    @patch("forum.packages.services.status_service.DaoConfirmationService")
+    @patch("forum.packages.services.status_service.DipConfirmationService")
+    @patch("forum.packages.services.status_service.UpdateStatus.fetch_contract")
+    def test_passed_unexecuted_dip_is_final(self, fetch_contract, dip_service, dao_service, *_):
+        dip = self._dip(-60)
+        fetch_contract.return_value = MagicMock()
+        dip_service.return_value.get_proposals.return_value = {
+            "end_time": dip.end_time,
+            "executed": False,
+            "for_votes": 10,
+            "against_votes": 2,
+        }
+        dao_service.return_value.get_total_staked.return_value = 12
+        dao_service.return_value.get_quorum_threshold.return_value = 5000
+
+        result = finalize_dip_status.apply(args=(dip.id, dip.end_time)).get()
+
+        self.assertEqual(result["status"], DipStatus.PASSED)
+        dip.refresh_from_db()
+        self.assertEqual(dip.status, DipStatus.PASSED)
+        self.assertFalse(DipSerializer(dip).data["awaiting_finalization"])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(DipFinalizationService.schedule_upcoming(), 0)
@@ -0,0 +1,64 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from dao.tests.dao_utils import DaoFactoryMixin
+from forum.models import Like
+from .forum_utils import ThreadBaseMixin
+
+
+class LikeToggleTests(APITestCase):
+    def setUp(self):
+        # like sets live in the cache redis
+        cache.clear()
+        self.dao = DaoFactoryMixin().create_dao()
+        self.thread = ThreadBaseMixin(dao=self.dao, author=self.dao.owner).create_thread()
+        self.url_prefix = f"/api/v1/dao/{self.dao.slug}/threads/"
+        token = RefreshToken.for_user(self.dao.owner).access_token
+        self.HTTP_AUTHORIZATION = {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+
+    def _toggle(self, thread_id=None, prefix=None):
+        return self.client.post(
+            f"{prefix or self.url_prefix}{thread_id or self.thread.id}/like/",
+            **self.HTTP_AUTHORIZATION,
+        )
+
+    def test_toggle_keeps_one_like_and_the_counter_in_step(self):
+        for expected in ("liked", "unliked", "liked"):
+            self.assertEqual(self._toggle().data["status"], expected)
+
+        self.thread.refresh_from_db()
+        self.assertEqual(self.thread.likes_count, 1)
+        self.assertEqual(Like.objects.filter(object_id=self.thread.id).count(), 1)
+
+    def test_unknown_or_foreign_content_is_rejected(self):
+        other_dao = DaoFactoryMixin().create_dao(slug="other")
+
+        self.assertEqual(self._toggle(thread_id=10**6).status_code, status.HTTP_400_BAD_REQUEST)
+        response = self._toggle(prefix=f"/api/v1/dao/{other_dao.slug}/threads/")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Like.objects.exists())
+
+    @override_settings(LIKES_CACHE_ENABLED=True, LIKES_CACHE_MIN_LIKES=1)
+    def test_hot_content_is_liked_from_redis(self):
+        self._toggle()
+
+        def list_threads():
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(self.url_prefix, **self.HTTP_AUTHORIZATION)
+            return len(queries), response.data["data"]["results"][0]["is_liked"]
+
+        warm_up, liked = list_threads()
+        self.assertTrue(liked)
+        cached, liked = list_threads()
+        self.assertTrue(liked)
+        self.assertEqual(cached, warm_up - 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self._toggle()
+        _, liked = list_threads()
+        self.assertFalse(liked)
@@ -1,10 +1,17 @@
 import json, copy
+from base64 import urlsafe_b64encode
+from io import StringIO
 from uuid import uuid4
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.test import APITestCase
 from rest_framework import status
 
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils.dateparse import parse_datetime
+from forum.models import Thread
 from core.helpers.create_user import create_user
 from dao.tests.dao_utils import DaoFactoryMixin
 from unittest.mock import patch
@@ -45,6 +52,10 @@ class ThreadAPITests(APITestCase):
             "title": "no title",
         }
 
+    def setUp(self):
+        # view counters live in the cache redis and would leak between tests
+        cache.clear()
+
     def test_threads_retrieves_empty_list_successful(self):
         self.thread.delete()
         response = self.client.get(self.url_prefix)
@@ -195,3 +206,149 @@ class ThreadAPITests(APITestCase):
         )
         self.assertEqual(response_unlike.status_code, status.HTTP_200_OK)
         self.assertEqual(response_unlike.data["status"], "unliked")
+
+    # *NOTE: the tests below create their own thread, an earlier test deletes self.thread
+    # and leaves it without an id
+
+    def test_reply_and_like_counters_follow_writes(self):
+        thread = self.thread_base.create_thread()
+        for _ in range(2):
+            self.client.post(
+                f"{self.url_prefix}{thread.id}/replies/",
+                self.payload,
+                format="json",
+                **self.HTTP_AUTHORIZATION,
+            )
+        self.client.post(f"{self.url_prefix}{thread.id}/like/", **self.HTTP_AUTHORIZATION)
+
+        response = self.client.get(f"{self.url_prefix}{thread.id}/")
+        self.assertEqual(response.data["replies_count"], 2)
+        self.assertEqual(response.data["likes_count"], 1)
+
+        self.client.post(f"{self.url_prefix}{thread.id}/like/", **self.HTTP_AUTHORIZATION)
+        thread.refresh_from_db()
+        self.assertEqual(thread.likes_count, 0)
+
+    def test_recompute_counters_repairs_drift(self):
+        thread = self.thread_base.create_thread()
+        self.client.post(f"{self.url_prefix}{thread.id}/like/", **self.HTTP_AUTHORIZATION)
+        Thread.objects.filter(id=thread.id).update(likes_count=7, replies_count=3)
+
+        call_command("recompute_counters", "thread", stdout=StringIO())
+
+        thread.refresh_from_db()
+        self.assertEqual(thread.likes_count, 1)
+        self.assertEqual(thread.replies_count, 0)
+
+    def _count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, **self.HTTP_AUTHORIZATION)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(queries), response.data
+
+    def test_viewer_state_costs_constant_queries_per_page(self):
+        Thread.objects.all().delete()
+        liked = self.thread_base.create_thread()
+        self.client.post(f"{self.url_prefix}{liked.id}/like/", **self.HTTP_AUTHORIZATION)
+        small_page, data = self._count_queries(self.url_prefix)
+        self.assertTrue(data["data"]["results"][0]["is_liked"])
+
+        for _ in range(6):
+            self.thread_base.create_thread()
+        full_page, data = self._count_queries(self.url_prefix)
+
+        results = data["data"]["results"]
+        self.assertEqual(full_page, small_page)
+        self.assertEqual([r["is_liked"] for r in results], [False] * 6 + [True])
+
+    def test_thread_detail_resolves_reply_likes_in_one_query(self):
+        thread = self.thread_base.create_thread()
+        url = f"{self.url_prefix}{thread.id}/"
+        reply = self.client.post(
+            f"{url}replies/", self.payload, format="json", **self.HTTP_AUTHORIZATION
+        ).data
+        self.client.post(f"{url}replies/{reply['id']}/like/", **self.HTTP_AUTHORIZATION)
+        # the first visit records the view, later ones do not write
+        self._count_queries(url)
+        one_reply, data = self._count_queries(url)
+        self.assertTrue(data["replies"][0]["is_liked"])
+
+        for _ in range(4):
+            self.client.post(
+                f"{url}replies/", self.payload, format="json", **self.HTTP_AUTHORIZATION
+            )
+        five_replies, data = self._count_queries(url)
+
+        self.assertEqual(len(data["replies"]), 5)
+        self.assertEqual(five_replies, one_reply)
+
+    def test_replies_are_walked_page_by_page_with_cursors(self):
+        thread = self.thread_base.create_thread()
+        url = f"{self.url_prefix}{thread.id}/replies/"
+        for _ in range(12):
+            self.client.post(url, self.payload, format="json", **self.HTTP_AUTHORIZATION)
+
+        first = self.client.get(url).data["data"]
+        self.assertEqual(first["count"], 12)
+        self.assertEqual(len(first["results"]), 10)
+        self.assertIsNone(first["previous"])
+
+        second = self.client.get(first["next"]).data["data"]
+        self.assertEqual(len(second["results"]), 2)
+        self.assertIsNone(second["next"])
+        ids = [r["id"] for r in first["results"] + second["results"]]
+        self.assertEqual(ids, sorted(ids))
+
+        back = self.client.get(second["previous"]).data["data"]
+        self.assertEqual(back["results"], first["results"])
+
+        response = self.client.get(url, {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        # decodes fine but has the wrong shape
+        for cursor in (
+            [1, 2],
+            None,
+            {"position": 5, "reverse": False},
+            {"position": ["x", "y"], "reverse": False},
+            {"position": [{"at": 1}, [2]], "reverse": False},
+            {"position": [1, 2], "reverse": "yes"},
+            {"position": [1, 2, 3], "reverse": False},
+        ):
+            token = urlsafe_b64encode(json.dumps(cursor).encode()).decode()
+            response = self.client.get(url, {"cursor": token})
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND, cursor)
+
+    def test_thread_detail_embeds_the_first_page_of_replies(self):
+        thread = self.thread_base.create_thread()
+        url = f"{self.url_prefix}{thread.id}/"
+        for _ in range(11):
+            self.client.post(
+                f"{url}replies/", self.payload, format="json", **self.HTTP_AUTHORIZATION
+            )
+
+        data = self.client.get(url).data
+        self.assertEqual(len(data["replies"]), 10)
+        self.assertIn(f"{url}replies/?cursor=", data["replies_next"])
+
+        rest = self.client.get(data["replies_next"]).data["data"]
+        self.assertEqual(len(rest["results"]), 1)
+        self.assertGreater(rest["results"][0]["id"], data["replies"][-1]["id"])
+
+    def test_thread_list_shows_the_excerpt_instead_of_content(self):
+        payload = copy.deepcopy(self.payload)
+        payload["content"]["root"]["children"] = [
+            {"type": "paragraph", "children": [{"type": "text", "text": "hello forum"}]}
+        ]
+        thread = self.client.post(
+            self.url_prefix, payload, format="json", **self.HTTP_AUTHORIZATION
+        ).data
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url_prefix)
+        listed = next(t for t in response.data["data"]["results"] if t["id"] == thread["id"])
+        self.assertNotIn("content", listed)
+        self.assertEqual((listed["excerpt"], listed["word_count"]), ("hello forum", 2))
+        self.assertFalse(any('"forum_thread"."content"' in q["sql"] for q in queries))
+
+        detail = self.client.get(f"{self.url_prefix}{thread['id']}/").data
+        self.assertEqual(detail["content"], payload["content"])
@@ -0,0 +1,53 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from core.helpers.create_user import create_user
+from dao.tests.dao_utils import DaoFactoryMixin
+from forum.models import Thread
+from forum.packages.services.view_service import ViewCounter
+from .forum_utils import ThreadBaseMixin, DipBaseMixin
+
+
+class ViewCounterTests(TestCase):
+    def setUp(self):
+        self.dao = DaoFactoryMixin().create_dao()
+        self.thread = ThreadBaseMixin(dao=self.dao, author=self.dao.owner).create_thread()
+        self.dip = DipBaseMixin(dao=self.dao, author=self.dao.owner).create_dip()
+        # the counters live in the cache redis
+        cache.clear()
+
+    def test_unique_viewers_are_flushed_into_views_count(self):
+        other = create_user()
+        for user in (self.dao.owner, self.dao.owner, other):
+            live = ViewCounter.record(self.thread, user)
+        ViewCounter.record(self.dip, other)
+
+        self.assertEqual(live, 2)
+        self.thread.refresh_from_db()
+        self.assertEqual(self.thread.views_count, 0)
+
+        self.assertEqual(ViewCounter.flush(), 2)
+        self.thread.refresh_from_db()
+        self.dip.refresh_from_db()
+        self.assertEqual(self.thread.views_count, 2)
+        self.assertEqual(self.dip.views_count, 1)
+        self.assertEqual(ViewCounter.flush(), 0)
+
+    def test_flush_never_lowers_legacy_counts(self):
+        Thread.objects.filter(id=self.thread.id).update(views_count=40)
+        ViewCounter.record(self.thread, self.dao.owner)
+
+        ViewCounter.flush()
+
+        self.thread.refresh_from_db()
+        self.assertEqual(self.thread.views_count, 40)
+
+    @override_settings(VIEWS_ANONYMOUS_SAMPLE_RATE=1)
+    def test_sampled_anonymous_views_are_counted(self):
+        for _ in range(3):
+            ViewCounter.record(self.thread, None)
+
+        ViewCounter.flush()
+
+        self.thread.refresh_from_db()
+        self.assertEqual(self.thread.views_count, 3)
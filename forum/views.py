@@ -1,12 +1,16 @@
 from rest_framework.response import Response
 from rest_framework import status
 from django.contrib.contenttypes.models import ContentType
-from django.db.models import F
-from django.db import transaction
+from django.urls import reverse
 import logging
 from drf_spectacular.utils import extend_schema
-from django.db.models import When, Case, IntegerField, Sum
 from .tasks import sync_dip_status, sync_votes_task
+from services.utils.backpressure import QueueLoad, enqueue_or_shed
+from services.utils.custom_pagination import KeysetPagination
+from services.utils.task_progress import task_status
+from services.utils.task_metrics import TaskMetrics
+from services.utils.worker_memory import WorkerMemory
+from rest_framework import viewsets
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
@@ -20,6 +24,7 @@ from .packages.abstract.abstract_view import (
     BaseTransactionDip,
     BaseTransactionDip,
     BaseDipStatusUpdate,
+    Helper,
 )
 from services.utils.permission_handler import StakeRequiredPermissionHandler
 from .serializers import (
@@ -35,32 +40,60 @@ from .serializers import (
     DipSingleRefreshSerializer,
     serializers,
 )
-from .models import Thread, Dip, DipStatus, Reply, Like, View, Vote
+from .models import Thread, Dip, DipStatus, Reply, Vote
+from .packages.services.like_service import LikeService
+from .packages.services.view_service import ViewCounter
+
+
+def replies_of(model, object_id):
+    return Reply.objects.filter(
+        content_type=ContentType.objects.get_for_model(model),
+        object_id=object_id,
+    ).select_related("author")
+
+
+class ReplyPagination(KeysetPagination):
+    # oldest first, the order a discussion is read in
+    ordering = ("created_at", "id")
 
 
 class BaseContentView(BaseForumView):
+    pagination_class = KeysetPagination
+    # route of the reply view serving the replies after the first page
+    reply_route = None
+
+    def with_related(self, queryset):
+        """authors for every page, the lexical tree only for the detail"""
+        queryset = queryset.select_related("author")
+        if self.action == "list":
+            queryset = queryset.defer("content")
+        return queryset
+
+    def get_viewer_objects(self, objects):
+        replies = [reply for obj in objects for reply in getattr(obj, "first_replies", ())]
+        return [*objects, *replies]
+
+    def attach_first_replies(self, instance):
+        """the detail embeds the first page of replies and links to the next one"""
+        paginator = ReplyPagination()
+        instance.first_replies, next_cursor, _ = paginator.slice(
+            replies_of(type(instance), instance.id)
+        )
+        url = reverse(
+            f"forum:{self.reply_route}-list",
+            kwargs={"slug": self.kwargs.get("slug"), "id": instance.id},
+        )
+        instance.replies_next = paginator.cursor_link(
+            self.request.build_absolute_uri(url), next_cursor
+        )
 
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
-        print(f"instance: {instance}")
-        print(f"instance id: {instance.id}")
-        print(f"user: {request.user}")
-        content_type = ContentType.objects.get_for_model(instance)
-        with transaction.atomic():
-            # Only track views for authenticated users
-            if request.user.is_authenticated:
-                view, created = View.objects.update_or_create(
-                    content_type=content_type,
-                    object_id=instance.id,
-                    user=request.user,
-                )
-                if created:
-                    instance.views_count = F("views_count") + 1
-                    instance.save()
-                    instance.refresh_from_db()
-            else:
-                # For anonymous users, just increment the view count
-                print(f"view not counted for anonymous user")
+        # counted in redis, views_count catches up on the next flush
+        views = ViewCounter.record(instance, request.user)
+        if views is not None and views > instance.views_count:
+            instance.views_count = views
+        self.attach_first_replies(instance)
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
 
@@ -84,6 +117,7 @@ class BaseReplyContentView(BaseReplyView):
     """base view for replies to either Thread or Dip"""
 
     serializer_class = ReplySerializer
+    pagination_class = ReplyPagination
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
@@ -92,11 +126,14 @@ class BaseReplyContentView(BaseReplyView):
         return context
 
     def get_queryset(self):
-        object_id = self.kwargs.get("id")
-        return Reply.objects.filter(
-            content_type=ContentType.objects.get_for_model(self.model),
-            object_id=object_id,
+        return replies_of(self.model, self.kwargs.get("id"))
+
+    def get_pagination_count(self):
+        # maintained on the parent, no COUNT(*) over its replies
+        count = self.model.objects.filter(id=self.kwargs.get("id")).values_list(
+            "replies_count", flat=True
         )
+        return count.first() or 0
 
     def create(self, request, *args, **kwargs):
         object_id = self.kwargs.get("id")
@@ -118,27 +155,23 @@ class BaseLikeContentView(BaseLikeView):
     serializer_class = LikeSerializer
     model = None
 
-    def get_content_type(self):
-        return ContentType.objects.get_for_model(self.model)
-
     def get_object_id(self):
-        object_id = self.kwargs.get("id")
-        obj = self.model.objects.filter(id=object_id).first()
+        return self.kwargs.get("id")
 
-        if hasattr(obj, "dao") and obj.dao.slug != self.kwargs.get("slug"):
-            raise serializers.ValidationError("slugs do not match")
-        return object_id
+    def get_dao_slug(self):
+        """dao the liked object has to belong to"""
+        return self.kwargs.get("slug")
 
     def create(self, request, *args, **kwargs):
-        content_type = self.get_content_type()
         object_id = self.get_object_id()
-        like = Like.objects.filter(
-            user=request.user,
-            content_type=content_type,
-            object_id=object_id,
-        ).first()
-        if like:
-            like.delete()
+        found, liked = LikeService.toggle(
+            self.model, object_id, request.user, slug=self.get_dao_slug()
+        )
+        if not found:
+            raise serializers.ValidationError(
+                f"{self.model.__name__} with id {object_id} not found in this dao"
+            )
+        if not liked:
             return Response(
                 {
                     "status": "unliked",
@@ -146,17 +179,7 @@ class BaseLikeContentView(BaseLikeView):
                 },
                 status=status.HTTP_200_OK,
             )
-        else:
-            like = Like.objects.create(
-                user=request.user,
-                content_type=content_type,
-                object_id=object_id,
-            )
-            print(f"created new like {like}")
-            serializer = self.get_serializer(like)
-            # QUESTION
-            # serializer.is_valid(raise_exception=True)
-            return Response({"status": "liked"}, status=status.HTTP_201_CREATED)
+        return Response({"status": "liked"}, status=status.HTTP_201_CREATED)
 
 
 @extend_schema(tags=["thread"])
@@ -165,6 +188,9 @@ class ThreadView(BaseContentView):
     thread view includes operations: list, retrieve, create for dip model
     """
 
+    reply_route = "thread-reply"
+    pagination_ordering = ("-created_at", "id")
+
     def get_serializer_class(self):
         return ThreadDetailSerializer if self.action == "retrieve" else ThreadSerializer
 
@@ -172,18 +198,15 @@ class ThreadView(BaseContentView):
         dao_slug = self.kwargs.get("slug")
         print(f"dao slug: {dao_slug}")
 
-        thread = Thread.objects.filter(dao__slug=dao_slug).order_by('-created_at')
-        return thread
+        thread = Thread.objects.filter(dao__slug=dao_slug)
+        return self.with_related(thread)
 
 
 @extend_schema(tags=["thread"])
 class ThreadReplyView(BaseReplyContentView):
+    """replies oldest to newest, cursor paginated"""
+
     model = Thread
-    
-    def get_queryset(self):
-        """Override to order replies chronologically from oldest to newest"""
-        queryset = super().get_queryset()
-        return queryset.order_by('created_at')
 
 
 @extend_schema(tags=["thread"])
@@ -196,34 +219,23 @@ class ReplyLikeView(BaseLikeContentView):
     model = Reply
 
     def get_object_id(self):
-        reply_id = self.kwargs.get("reply_id")  # Get the reply_id from the URL
-        obj = self.model.objects.filter(id=reply_id).first()
-        if not obj:
-            raise serializers.ValidationError(f"Reply with id {reply_id} not found")
-        return reply_id
+        return self.kwargs.get("reply_id")  # Get the reply_id from the URL
+
+    def get_dao_slug(self):
+        return None
 
 
 @extend_schema(tags=["dip"])
 class DipReplyView(BaseReplyContentView):
+    """replies oldest to newest, cursor paginated"""
+
     model = Dip
-    
-    def get_queryset(self):
-        """Override to order replies chronologically from oldest to newest"""
-        queryset = super().get_queryset()
-        return queryset.order_by('created_at')
 
 
 @extend_schema(tags=["dip"])
 class DipLikeView(BaseLikeContentView):
     model = Dip
 
-    def get_object_id(self):
-        object_id = self.kwargs.get("id")
-        obj = self.model.objects.filter(id=object_id).first()
-        if hasattr(obj, "dao") and obj.dao.slug != self.kwargs.get("slug"):
-            raise serializers.ValidationError("slugs do not match")
-        return object_id
-
 
 @extend_schema(tags=["dip"])
 class DipView(BaseContentView):
@@ -233,6 +245,8 @@ class DipView(BaseContentView):
     """
 
     permission_classes = [StakeRequiredPermissionHandler]
+    reply_route = "dip-reply"
+    pagination_ordering = ("-proposal_id", "id")
 
     def create(self, request, *args, **kwargs):
         dao_slug = self.kwargs.get("slug")
@@ -284,22 +298,8 @@ class DipView(BaseContentView):
         if status:
             queryset = queryset.filter(status=status)
 
-        return queryset.annotate(
-            for_votes=Sum(
-                Case(
-                    When(votes__support=True, then=F("votes__voting_power")),
-                    default=0,
-                    output_field=IntegerField(),
-                ),
-            ),
-            against_votes=Sum(
-                Case(
-                    When(votes__support=False, then=F("votes__voting_power")),
-                    default=0,
-                    output_field=IntegerField(),
-                )
-            ),
-        ).order_by("-proposal_id")
+        # vote tallies are stored on the dip, listing never touches Vote
+        return self.with_related(queryset)
 
 
 @extend_schema(tags=["refresh"])
@@ -321,10 +321,10 @@ class DipSyncronizationView(BaseTransactionDip):
         )
         serializer.is_valid(raise_exception=True)
 
-        serializer.save()
+        sync = serializer.save()
 
         return Response(
-            {"message": "sync started"},
+            {"message": "sync started", "task_id": sync["task_id"]},
             status=status.HTTP_200_OK,
         )
 
@@ -357,7 +357,7 @@ class VoteSynchronizationView(BaseTransactionDip):
                 {"error": f"dip with id {dip_id} not found"},
                 status=status.HTTP_404_NOT_FOUND,
             )
-        task = sync_votes_task.delay(dip_id)
+        task, _ = enqueue_or_shed(sync_votes_task, dip_id, dip_id)
 
         return Response(
             {
@@ -372,6 +372,8 @@ class VoteSynchronizationView(BaseTransactionDip):
 @extend_schema(tags=["dip"])
 class VotingHistoryView(BaseVoters):
     serializer_class = VotingHistorySerializer
+    pagination_class = KeysetPagination
+    pagination_ordering = ("-voting_power", "id")
 
     def get_queryset(self):
         context = self.get_serializer_context()
@@ -389,14 +391,15 @@ class DipSingleSyncronizationView(BaseDipStatusUpdate):
     serializer_class = DipSingleRefreshSerializer
 
     def get_queryset(self):
-        return Dip.objects.filter(status=DipStatus.ACTIVE)
+        # a passed dip is refreshed to pick up its execution
+        return Dip.objects.filter(status__in=[DipStatus.ACTIVE, DipStatus.PASSED])
 
     def update(self, request, *args, **kwargs):
         instance = self.get_object()
         serializer = self.get_serializer(instance, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
 
-        task = sync_dip_status.delay(instance.id)
+        task, _ = enqueue_or_shed(sync_dip_status, instance.id, instance.id)
 
         return Response(
             {
@@ -406,3 +409,36 @@ class DipSingleSyncronizationView(BaseDipStatusUpdate):
             },
             status=status.HTTP_202_ACCEPTED,
         )
+
+
+@extend_schema(tags=["refresh"])
+class TaskStatusView(Helper, viewsets.ViewSet):
+    """state, progress, eta and compact result of a queued sync task, cheap to poll"""
+
+    def retrieve(self, request, pk=None):
+        task = task_status(pk)
+        if task is None:
+            return Response(
+                {"error": f"task with id {pk} not found"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        return Response(task, status=status.HTTP_200_OK)
+
+
+@extend_schema(tags=["refresh"])
+class QueueMetricsView(Helper, viewsets.ViewSet):
+    """
+    depth, recent wait and shed refreshes of the interactive queues with their thresholds,
+    and per task totals (runs, queue wait, runtime, db/rpc/sleep time) and last memory
+    report of the workers
+    """
+
+    def list(self, request):
+        return Response(
+            {
+                **QueueLoad.metrics(),
+                "tasks": TaskMetrics.export(),
+                "workers": WorkerMemory.export(),
+            },
+            status=status.HTTP_200_OK,
+        )
@@ -1,7 +1,53 @@
-import time, os, json
+import time, os, json, threading
+from functools import lru_cache
 from web3 import Web3
 from logging_config import logger
 from django.conf import settings
+from services.utils import task_metrics
+
+
+# web3 instances reused by every client created on the same thread, one per network.
+# HTTPProvider keeps a requests session that must not be shared between threads, so
+# each worker thread (threads pool) or process (solo/prefork) gets its own.
+_connections = threading.local()
+
+
+def rpc_call_count() -> int:
+    """number of rpc requests sent from the current thread so far"""
+    return task_metrics.counters()["rpc_calls"]
+
+
+class CountingHTTPProvider(Web3.HTTPProvider):
+    """HTTPProvider that counts and times requests per thread, a batch counts as one round trip"""
+
+    def make_request(self, method, params):
+        return self._timed(super().make_request, method, params)
+
+    def make_batch_request(self, batch_requests):
+        return self._timed(super().make_batch_request, batch_requests)
+
+    @staticmethod
+    def _timed(request, *args):
+        started = time.perf_counter()
+        try:
+            return request(*args)
+        finally:
+            task_metrics.add("rpc_calls")
+            task_metrics.add("rpc_time", time.perf_counter() - started)
+
+
+@lru_cache(maxsize=1)
+def _load_abis() -> dict:
+    file_path = os.path.join(os.path.abspath(os.path.dirname(__file__)), "ABIs.json")
+    try:
+        with open(file_path, "r") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        logger.error(f"abi file not found: {file_path}")
+        raise
+    except json.JSONDecodeError:
+        logger.error(f"failed to parse abi json file: {file_path}")
+        raise
 
 
 class BlockchainClient:
@@ -22,6 +68,15 @@ class BlockchainClient:
         self.from_block = max(0, self.current_block - self.block_range)
 
     def connect(self):
+        """returns this thread's web3 connection for the network, opening it on first use"""
+        clients = _connections.__dict__.setdefault("web3", {})
+        web3 = clients.get(self.network)
+        if web3 is None:
+            web3 = self._open_connection()
+            clients[self.network] = web3
+        return web3
+
+    def _open_connection(self):
         provider_url = self.get_provider(self.network)
         logged_url = provider_url
         
@@ -42,7 +97,7 @@ class BlockchainClient:
         for attempt in range(1, self.retries + 1):
             logger.info(f"Connection attempt {attempt}/{self.retries}")
             try:
-                provider = Web3.HTTPProvider(provider_url)
+                provider = CountingHTTPProvider(provider_url)
                 # Try to make an actual request to test the connection
                 try:
                     response = provider.make_request("eth_blockNumber", [])
@@ -64,7 +119,7 @@ class BlockchainClient:
             
             if attempt < self.retries:
                 logger.info(f"Waiting {self.delay} seconds before next attempt...")
-                time.sleep(self.delay)
+                task_metrics.timed_sleep(self.delay)
         
         logger.error(f"Failed to connect to network {self.network} after {self.retries} attempts")
         raise ConnectionError(f"Could not connect to network {self.network} after {self.retries} attempts")
@@ -93,16 +148,5 @@ class BlockchainClient:
 
     @staticmethod
     def get_abi(abi_name):
-        file_path = os.path.join(
-            os.path.abspath(os.path.dirname(__file__)), "ABIs.json"
-        )
-        try:
-            with open(file_path, "r") as file:
-                abi_data = json.load(file)
-                return abi_data.get(abi_name)
-        except FileNotFoundError:
-            logger.error(f"abi file not found: {file_path}")
-            raise
-        except json.JSONDecodeError:
-            logger.error(f"failed to parse abi json file: {file_path}")
-            raise
+        # parsed once per process, the abi dicts are only ever read
+        return _load_abis().get(abi_name)
@@ -1,6 +1,8 @@
 from web3 import Web3
 from logging_config import logger
 from .blockchain_client import BlockchainClient
+from .log_store import LogStore, LogDecoder, VOTED_TOPIC
+from services.utils.task_progress import TaskProgress
 from rest_framework import status
 
 
@@ -39,19 +41,14 @@ class DaoConfirmationService(BlockchainClient):
         max_iterations = 10  # Limit the number of iterations to prevent infinite loops
         iteration = 0
         
-        # Store the original current_block
-        original_current_block = self.current_block
+        # the search window is local so one client can be shared by concurrent tasks
         current_to_block = self.current_block
         current_from_block = max(0, current_to_block - self.block_range)
         
         while iteration < max_iterations:
-            # Set the search range for this iteration
-            self.from_block = current_from_block
-            self.current_block = current_to_block
-            
             # set block range
             print(f"DEBUG: Searching for DAO with address: {self.dao_address}")
-            print(f"DEBUG: Block range - from: {self.from_block}, to: {self.current_block}")
+            print(f"DEBUG: Block range - from: {current_from_block}, to: {current_to_block}")
             print(f"DEBUG: Network ID: {self.network}")
             
             factory_address = self.get_factory_address(self.network)
@@ -75,8 +72,8 @@ class DaoConfirmationService(BlockchainClient):
 
             # define filter parameters
             filter_params = {
-                "fromBlock": self.from_block,
-                "toBlock": self.current_block,
+                "fromBlock": current_from_block,
+                "toBlock": current_to_block,
                 "address": Web3.to_checksum_address(factory_address),
                 "topics": [
                     Web3.to_hex(hexstr=event_signature),
@@ -93,6 +90,7 @@ class DaoConfirmationService(BlockchainClient):
             if logs:
                 # Logs found, process them
                 logger.info(f"found {len(logs)} for params")
+                LogStore.store(self.network, logs)
 
                 log = logs[0]
                 non_indexed_types = ["address", "string", "string"]
@@ -126,9 +124,6 @@ class DaoConfirmationService(BlockchainClient):
                         f"\nsender: {sender}\ndao_address: {dao_address}\ntoken_address: {token_address}\ntreasury_address: {treasury_address}\nstaking_address: {staking_address}\ndao_name: {dao_name}\ntoken_name: {token_name}\nversion: {version}\nsymbol: {symbol}\ntotal_supply: {total_supply}"
                     )
                     
-                    # Reset current_block to its original value before returning
-                    self.current_block = original_current_block
-                    
                     return {
                         "sender": sender,
                         "dao_address": dao_address,
@@ -142,13 +137,11 @@ class DaoConfirmationService(BlockchainClient):
                         "total_supply": total_supply,
                     }
                 except Exception as ex:
-                    # Reset current_block to its original value before raising
-                    self.current_block = original_current_block
                     logger.error(f"failed decoding log: {str(ex)}")
                     raise
             else:
                 # No logs found, move the entire window deeper into history
-                logger.warning(f"No logs found in block range {self.from_block} to {self.current_block}. Looking deeper...")
+                logger.warning(f"No logs found in block range {current_from_block} to {current_to_block}. Looking deeper...")
                 
                 # Move the window deeper by block_range
                 current_to_block = current_from_block
@@ -161,9 +154,6 @@ class DaoConfirmationService(BlockchainClient):
                     
                 iteration += 1
         
-        # Reset current_block to its original value before raising exception
-        self.current_block = original_current_block
-        
         # If we've exhausted all iterations or reached block 0 without finding logs
         logger.error("No logs found after multiple attempts")
         raise Exception(
@@ -217,9 +207,7 @@ class DaoConfirmationService(BlockchainClient):
 
         dao_address = self.web3.to_checksum_address(self.dao_address)
 
-        event_signature = (
-            "0x" + self.web3.keccak(text="Voted(uint256,address,bool,uint256)").hex()
-        )
+        event_signature = VOTED_TOPIC
 
         proposal_id_topic = "0x" + hex(proposal_id)[2:].zfill(64)
         filter_params = {
@@ -232,28 +220,20 @@ class DaoConfirmationService(BlockchainClient):
             ],
         }
         try:
+            progress = TaskProgress.current()
+            progress.update(stage="scanning vote logs")
             logs = self.web3.eth.get_logs(filter_params)
+            progress.update(
+                blocks_scanned=self.current_block - self.from_block, logs_found=len(logs)
+            )
+            rows = LogStore.store(self.network, logs)
 
             votes = []
 
-            for log in logs:
-                voter_address = "0x" + log["topics"][2].hex()[-40:]
-
-                decoded_data = self.web3.codec.decode(
-                    ["bool", "uint256"],
-                    log["data"],
-                )
-
-                support = decoded_data[0]
-                voting_power = decoded_data[1]
-
-                votes.append(
-                    {
-                        "voter_address": voter_address,
-                        "support": support,
-                        "voting_power": voting_power,
-                    }
-                )
+            for row in rows:
+                vote = LogDecoder.decode_vote(row)
+                vote.pop("proposal_id")
+                votes.append(vote)
 
             return votes if votes else None
         except Exception as ex:
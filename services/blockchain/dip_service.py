@@ -1,6 +1,8 @@
 from .blockchain_client import BlockchainClient
+from .log_store import LogStore, PROPOSAL_CREATED_TOPIC
 from web3 import Web3
 from logging_config import logger
+from services.utils.task_progress import TaskProgress
 from typing import Union
 
 
@@ -30,43 +32,64 @@ class DipConfirmationService(BlockchainClient):
                         f"failed to get proposal count after {self.retries} attempts"
                     ) from ex
 
+    def store_proposal_logs(self) -> list:
+        """fetches ProposalCreated logs for the scanned block range into the raw log store"""
+        if not self.dao_address:
+            raise ValueError("no address was provided")
+        logs = self.web3.eth.get_logs(
+            {
+                "fromBlock": self.from_block,
+                "toBlock": self.current_block,
+                "address": Web3.to_checksum_address(self.dao_address),
+                "topics": [PROPOSAL_CREATED_TOPIC],
+            }
+        )
+        return LogStore.store(self.network, logs)
+
     def get_proposals(self, excluded_proposals=None, proposal_id=None) -> dict | list:
         excluded_proposals = excluded_proposals or set()
         count, contract = self.get_proposal_count()
         if proposal_id is not None:
-            proposal_data = contract.functions.getProposal(proposal_id).call()
-            return {
-                "proposal_id": proposal_id,
-                "proposal_type": proposal_data[0],
-                "for_votes": proposal_data[1],
-                "against_votes": proposal_data[2],
-                "end_time": proposal_data[3],
-                "executed": proposal_data[4],
-            }
+            return self._read_proposal(contract, proposal_id)
         proposals = []
         for proposal_id in range(count, -1, -1):
             if proposal_id in excluded_proposals:
                 continue
-            proposal_data = contract.functions.getProposal(proposal_id).call()
-
-            proposals.append(
-                {
-                    "proposal_id": proposal_id,
-                    "proposal_type": proposal_data[0],
-                    "for_votes": proposal_data[1],
-                    "against_votes": proposal_data[2],
-                    "end_time": proposal_data[3],
-                    "executed": proposal_data[4],
-                }
-            )
+            proposals.append(self._read_proposal(contract, proposal_id))
         return proposals, contract
 
+    def _read_proposal(self, contract, proposal_id) -> dict:
+        proposal_data = contract.functions.getProposal(proposal_id).call()
+        return {
+            "proposal_id": proposal_id,
+            "proposal_type": proposal_data[0],
+            "for_votes": proposal_data[1],
+            "against_votes": proposal_data[2],
+            "end_time": proposal_data[3],
+            "executed": proposal_data[4],
+        }
+
     def get_proposal_data(self, excluded_proposals=None) -> list:
-        proposals, contract = self.get_proposals(excluded_proposals)
-        complete_proposals = []
+        return list(self.iter_proposal_data(excluded_proposals))
+
+    def iter_proposal_data(self, excluded_proposals=None):
+        """
+        yields the complete data (base fields and type specific fields) of every proposal
+        not excluded, newest first, one proposal at a time so callers can checkpoint
+        between them. proposals whose type data cannot be read are skipped
+        """
+        excluded_proposals = excluded_proposals or set()
+        count, contract = self.get_proposal_count()
+        proposal_ids = [
+            proposal_id
+            for proposal_id in range(count, -1, -1)
+            if proposal_id not in excluded_proposals
+        ]
+        progress = TaskProgress.current()
+        progress.update(stage="reading proposals", done=0, total=len(proposal_ids))
 
-        for proposal in proposals:
-            proposal_id = proposal["proposal_id"]
+        for done, proposal_id in enumerate(proposal_ids, 1):
+            proposal = self._read_proposal(contract, proposal_id)
             proposal_type = proposal["proposal_type"]
 
             try:
@@ -117,13 +140,14 @@ class DipConfirmationService(BlockchainClient):
                     })
                 # Types 6 and 7 (Pause/Unpause) don't have additional data
 
-                complete_proposals.append(complete_proposal)
             except Exception as e:
                 logger.error(f"Error processing proposal {proposal_id}: {e}")
                 # Skip this proposal and continue with others
                 continue
+            finally:
+                progress.update(done=done)
 
-        return complete_proposals
+            yield complete_proposal
 
     def get_type(
         self, proposal_id: int, type_: int, contract
@@ -1,10 +1,14 @@
 from .dip_service import DipConfirmationService
 from forum.models import Dip, DipStatus, ProposalType
+from forum.packages.services.finalization_service import DipFinalizationService
 from django.db import transaction
 from django.db.models import F
 from logging_config import logger
+from services.utils.task_progress import TaskProgress
+from services.utils.task_checkpoint import TaskCheckpoint
+from services.utils.backpressure import QueueOverloaded
+from django.conf import settings
 from .default_proposal_content import DEFAULT_BLOCKCHAIN_PROPOSAL_CONTENT
-import time
 
 
 class DipSyncronizationService:
@@ -19,14 +23,19 @@ class DipSyncronizationService:
     def start_blockchain_sync(self, dao):
         try:
             from forum.tasks import sync_proposals_task
+            from services.utils.backpressure import enqueue_or_shed
 
-            task = sync_proposals_task.delay(dao_id=dao.id)
+            # repeated refreshes of the same dao join the sync that is already queued,
+            # new ones are refused while the queue is over capacity
+            task, created = enqueue_or_shed(sync_proposals_task, dao.id, dao_id=dao.id)
 
             return {
-                "task_id": task,
+                "task_id": task.id,
                 "status": "pending",
-                "message": "sync process started",
+                "message": "sync process started" if created else "sync already pending",
             }
+        except QueueOverloaded:
+            raise
         except Exception as ex:
             logger.debug(f"error starting sync with blockchain {str(ex)}")
             raise Exception("blockchain sync task")
@@ -95,7 +104,37 @@ class DipSyncronizationService:
             logger.debug(f"Error in compare_proposal_data: {str(ex)}")
             return False
 
-    def process_blockchain_data(self, dao):
+    def _read_new_proposals(self, existing_proposal_ids, checkpoint) -> list:
+        """
+        reads the proposals not in the database yet, continuing after the ones a failed
+        attempt already read. the proposals read so far are checkpointed every
+        SYNC_CHECKPOINT_EVERY proposals and when a read fails
+        """
+        # proposals a previous attempt read and managed to save are not reused
+        proposals = [
+            proposal
+            for proposal in checkpoint.get("proposals", [])
+            if proposal["proposal_id"] not in existing_proposal_ids
+        ]
+        if proposals:
+            logger.info(f"resuming proposal sync after {len(proposals)} checkpointed proposals")
+        already_read = {proposal["proposal_id"] for proposal in proposals}
+
+        try:
+            for proposal in self.dip_service.iter_proposal_data(
+                excluded_proposals=existing_proposal_ids | already_read
+            ):
+                proposals.append(proposal)
+                if len(proposals) % settings.SYNC_CHECKPOINT_EVERY == 0:
+                    checkpoint.save(proposals=proposals)
+        except Exception:
+            checkpoint.save(proposals=proposals)
+            raise
+
+        checkpoint.save(proposals=proposals)
+        return proposals
+
+    def process_blockchain_data(self, dao, wait=True):
         """method facilitating database entry update and creation"""
         try:
             existing_proposal_ids = set(
@@ -103,15 +142,27 @@ class DipSyncronizationService:
                     "proposal_id", flat=True
                 )
             )
-            # Wait 15 seconds before fetching blockchain data to allow transaction propagation
-            logger.info("Waiting 15 seconds before fetching blockchain data...")
-            time.sleep(15)
-            proposals = self.dip_service.get_proposal_data(
-                excluded_proposals=existing_proposal_ids
-            )
+            progress = TaskProgress.current()
+            # a retry resumes after the steps a previous attempt completed
+            checkpoint = TaskCheckpoint.current()
+            if wait:
+                progress.update(stage="waiting for propagation")
+                # Wait 15 seconds before fetching blockchain data to allow transaction propagation
+                checkpoint.wait_once(
+                    "proposals", 15, "Waiting 15 seconds before fetching blockchain data..."
+                )
+            if not checkpoint.get("logs_stored"):
+                try:
+                    self.dip_service.store_proposal_logs()
+                except Exception as ex:
+                    # raw logs only feed offline reprocessing, never block the sync
+                    logger.error(f"failed to store proposal logs: {str(ex)}")
+                checkpoint.save(logs_stored=True)
+            proposals = self._read_new_proposals(existing_proposal_ids, checkpoint)
             logger.debug(f"retrieved {len(proposals)} new proposals from blockchain")
 
             updated_dips = []
+            progress.update(stage="saving proposals", total=len(proposals))
 
             with transaction.atomic():
                 draft_dips = Dip.objects.select_for_update().filter(
@@ -180,6 +231,9 @@ class DipSyncronizationService:
                     dao.dip_count = F("dip_count") + len(updated_dips)
                     dao.save()
 
+                for dip in updated_dips:
+                    DipFinalizationService.schedule(dip)
+
             return (
                 Dip.objects.filter(status=DipStatus.ACTIVE).all()
                 if len(updated_dips) < 1
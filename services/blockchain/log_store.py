@@ -0,0 +1,152 @@
+from eth_abi import decode
+from web3 import Web3
+from logging_config import logger
+
+
+def event_topic(signature: str) -> str:
+    """returns the 0x prefixed topic0 for an event signature"""
+    return Web3.to_hex(Web3.keccak(text=signature))
+
+
+VOTED_TOPIC = event_topic("Voted(uint256,address,bool,uint256)")
+PROPOSAL_CREATED_TOPIC = event_topic(
+    "ProposalCreated(uint256,uint8,address,address,uint256,uint8,string)"
+)
+TOKENS_PURCHASED_TOPIC = event_topic("TokensPurchased(address,uint256,uint256)")
+TOKENS_SOLD_TOPIC = event_topic("TokensSold(address,uint256,uint256)")
+DAO_CREATED_TOPIC = event_topic(
+    "DAOCreated(address,address,address,address,string,string)"
+)
+
+
+class LogStore:
+    """writes raw eth_getLogs results to ChainLog and streams them back for offline reprocessing"""
+
+    @staticmethod
+    def _hex(value) -> str:
+        if isinstance(value, str):
+            return value.lower() if value.startswith("0x") else "0x" + value.lower()
+        return Web3.to_hex(value)
+
+    @staticmethod
+    def to_row(network: int, log):
+        """converts a web3 log into an unsaved ChainLog instance"""
+        from dao.models import ChainLog
+
+        return ChainLog(
+            network=network,
+            address=log["address"].lower(),
+            block_number=log["blockNumber"],
+            transaction_hash=LogStore._hex(log["transactionHash"]),
+            log_index=log["logIndex"],
+            topics=[LogStore._hex(topic) for topic in log["topics"]],
+            data=LogStore._hex(log["data"]),
+        )
+
+    @staticmethod
+    def store(network: int, logs) -> list:
+        """
+        persists logs for the given network, ignoring the ones already stored
+
+        Returns:
+            list: ChainLog instances (saved or not) in the order they were passed
+        """
+        rows = [LogStore.to_row(network, log) for log in logs]
+        if not rows:
+            return rows
+
+        from dao.models import ChainLog
+
+        try:
+            ChainLog.objects.bulk_create(rows, ignore_conflicts=True, batch_size=500)
+        except Exception as ex:
+            # the raw store must never break a live sync
+            logger.error(f"failed to store {len(rows)} raw logs: {str(ex)}")
+        return rows
+
+    @staticmethod
+    def stream(queryset, chunk_size: int = 1000):
+        """
+        yields chunks of ChainLog rows using keyset pagination on the primary key
+        so arbitrarily large log tables can be replayed with bounded memory
+        """
+        last_pk = 0
+        while True:
+            chunk = list(queryset.filter(pk__gt=last_pk).order_by("pk")[:chunk_size])
+            if not chunk:
+                return
+            yield chunk
+            last_pk = chunk[-1].pk
+
+
+class LogDecoder:
+    """pure decoding of stored logs into the dicts the services persist"""
+
+    @staticmethod
+    def _data(row) -> bytes:
+        return bytes.fromhex(row.data[2:] if row.data.startswith("0x") else row.data)
+
+    @staticmethod
+    def _topic_address(topic: str) -> str:
+        return "0x" + topic[-40:].lower()
+
+    @staticmethod
+    def decode_vote(row) -> dict:
+        support, voting_power = decode(["bool", "uint256"], LogDecoder._data(row))
+        return {
+            "proposal_id": int(row.topics[1], 16),
+            "voter_address": LogDecoder._topic_address(row.topics[2]),
+            "support": support,
+            "voting_power": voting_power,
+        }
+
+    @staticmethod
+    def decode_presale_trade(row) -> dict:
+        from dao.models import PresaleTransaction
+
+        topic = row.topics[0].lower()
+        if topic == TOKENS_PURCHASED_TOPIC:
+            eth_amount, token_amount = decode(
+                ["uint256", "uint256"], LogDecoder._data(row)
+            )
+            action = PresaleTransaction.ActionChoices.BUY
+        elif topic == TOKENS_SOLD_TOPIC:
+            token_amount, eth_amount = decode(
+                ["uint256", "uint256"], LogDecoder._data(row)
+            )
+            action = PresaleTransaction.ActionChoices.SELL
+        else:
+            raise ValueError(f"not a presale trade log: {topic}")
+
+        return {
+            "action": action,
+            "account": LogDecoder._topic_address(row.topics[1]),
+            "token_amount": token_amount,
+            "eth_amount": eth_amount,
+            "block_number": row.block_number,
+            # PresaleTransaction has always stored HexBytes.hex() output, which has no 0x prefix
+            "transaction_hash": row.transaction_hash[2:],
+        }
+
+    @staticmethod
+    def decode_proposal_created(row) -> dict:
+        (
+            proposal_type,
+            token,
+            recipient,
+            amount,
+            contract_to_upgrade,
+            new_version,
+        ) = decode(
+            ["uint8", "address", "address", "uint256", "uint8", "string"],
+            LogDecoder._data(row),
+        )
+        return {
+            "proposal_id": int(row.topics[1], 16),
+            "proposal_type": proposal_type,
+            "token": Web3.to_checksum_address(token),
+            "recipient": Web3.to_checksum_address(recipient),
+            "amount": amount,
+            "contract_to_upgrade": contract_to_upgrade,
+            "version": new_version,
+        }
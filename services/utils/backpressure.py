@@ -0,0 +1,144 @@
+import time
+import redis
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from app.celery_routing import INTERACTIVE, queue_for, worker_queues
+from .task_lock import enqueue_once, pending_task
+from logging_config import logger
+
+
+class QueueOverloaded(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "sync queue is overloaded"
+
+    def __init__(self, queue, wait, reason):
+        super().__init__(f"{reason}, try again in {wait} seconds")
+        self.queue = queue
+        self.wait = wait
+
+
+class QueueLoad:
+    """
+    depth and recent wait of the interactive queues, used to shed refresh requests
+
+    depths are read from the redis broker with one pipelined LLEN per refresh and the
+    queue wait is an exponential moving average fed by the workers (time from enqueue to
+    task start). the snapshot is cached for BACKPRESSURE_REFRESH seconds, so the check
+    costs one cache read per request whatever the traffic.
+    """
+
+    SNAPSHOT_KEY = "queue:load"
+    WAIT_KEY = "queue:wait:{}"
+    SHED_KEY = "queue:shed:{}"
+
+    @classmethod
+    def record_wait(cls, queue, seconds):
+        """called by the workers when a task starts, `seconds` after it was enqueued"""
+        if not queue or seconds is None or seconds < 0:
+            return
+        key = cls.WAIT_KEY.format(queue)
+        previous = cache.get(key)
+        alpha = settings.BACKPRESSURE_WAIT_SMOOTHING
+        average = seconds if previous is None else alpha * seconds + (1 - alpha) * previous[0]
+        cache.set(key, (average, time.time()), timeout=settings.BACKPRESSURE_WAIT_WINDOW)
+
+    @classmethod
+    def _depths(cls, queues) -> dict:
+        try:
+            client = redis.Redis.from_url(
+                settings.CELERY_BROKER_URL, socket_timeout=1, socket_connect_timeout=1
+            )
+            pipeline = client.pipeline(transaction=False)
+            for queue in queues:
+                pipeline.llen(queue)
+            return dict(zip(queues, pipeline.execute()))
+        except Exception as ex:
+            # an unreadable broker must not take the api down, only the depth check
+            logger.error(f"failed to read queue depths: {str(ex)}")
+            return {}
+
+    @classmethod
+    def snapshot(cls) -> dict:
+        """queue -> {"depth", "wait"}, refreshed at most every BACKPRESSURE_REFRESH seconds"""
+        snapshot = cache.get(cls.SNAPSHOT_KEY)
+        if snapshot is not None:
+            return snapshot
+
+        queues = worker_queues([INTERACTIVE])
+        depths = cls._depths(queues)
+        waits = cache.get_many([cls.WAIT_KEY.format(queue) for queue in queues])
+        snapshot = {
+            queue: {
+                "depth": depths.get(queue),
+                "wait": round(waits[cls.WAIT_KEY.format(queue)][0], 1)
+                if cls.WAIT_KEY.format(queue) in waits
+                else None,
+            }
+            for queue in queues
+        }
+        cache.set(cls.SNAPSHOT_KEY, snapshot, timeout=settings.BACKPRESSURE_REFRESH)
+        return snapshot
+
+    @classmethod
+    def guard(cls, queue):
+        """
+        Raises:
+            QueueOverloaded: when the queue is deeper or slower than the thresholds
+        """
+        load = cls.snapshot().get(queue) or {}
+        depth, wait = load.get("depth"), load.get("wait")
+
+        reason = None
+        if depth is not None and depth >= settings.BACKPRESSURE_MAX_DEPTH:
+            reason = f"{depth} sync jobs are waiting"
+        elif wait is not None and wait >= settings.BACKPRESSURE_MAX_WAIT:
+            reason = f"sync jobs wait {int(wait)}s before they start"
+        if reason is None:
+            return
+
+        retry_after = int(
+            min(
+                max(wait or settings.BACKPRESSURE_RETRY_AFTER, settings.BACKPRESSURE_RETRY_AFTER),
+                settings.BACKPRESSURE_MAX_RETRY_AFTER,
+            )
+        )
+        shed_key = cls.SHED_KEY.format(queue)
+        cache.add(shed_key, 0, timeout=None)
+        cache.incr(shed_key)
+        logger.warning(f"shedding refresh for {queue}: {reason}")
+        raise QueueOverloaded(queue, retry_after, reason)
+
+    @classmethod
+    def metrics(cls) -> dict:
+        snapshot = cls.snapshot()
+        shed = cache.get_many([cls.SHED_KEY.format(queue) for queue in snapshot])
+        return {
+            "thresholds": {
+                "max_depth": settings.BACKPRESSURE_MAX_DEPTH,
+                "max_wait": settings.BACKPRESSURE_MAX_WAIT,
+                "retry_after": settings.BACKPRESSURE_RETRY_AFTER,
+            },
+            "queues": {
+                queue: {**load, "shed": shed.get(cls.SHED_KEY.format(queue), 0)}
+                for queue, load in snapshot.items()
+            },
+        }
+
+
+def enqueue_or_shed(task, key, *args, **kwargs):
+    """
+    enqueue_once for api refreshes: a task already pending for the key on the same lane
+    is always handed back, new work is only accepted while the target queue is within
+    its thresholds. a run parked on the background lane does not count as queued.
+
+    Raises:
+        QueueOverloaded: the queue is over capacity and nothing is pending for the key
+    """
+    lane = kwargs.pop("lane", None)
+    pending = pending_task(task, key, lane)
+    if pending is not None:
+        return pending, False
+    QueueLoad.guard(queue_for(task.name, args, kwargs, lane=lane))
+    return enqueue_once(task, key, *args, lane=lane, **kwargs)
@@ -1,6 +1,14 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from django.core.exceptions import ValidationError
+from django.conf import settings
+from django.db import connections
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import BasePagination, PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 ################### CUSTOM PAGINATION ###################
 
@@ -21,6 +29,202 @@ class CustomPagination(PageNumberPagination):
         )
 
 
+class KeysetPagination(BasePagination):
+    """
+    cursor pagination that seeks to the page with a WHERE on the ordering columns
+
+    unlike OFFSET, a page deep in a long list costs the same as the first one and rows
+    added meanwhile never shift a page. the ordering must end in a unique column (id) so
+    every row has a distinct position, nullable columns sort their NULLs last. the cursor
+    is the ordering values of the row the page starts after (next) or before (previous),
+    base64 encoded. views set their ordering with `pagination_ordering`.
+
+    the envelope matches CustomPagination but no COUNT(*) is run: count is exact when the
+    whole list fits on the first page, comes from the view's get_pagination_count() when
+    it keeps one, and is otherwise the planner's row estimate (PAGINATION_ESTIMATED_COUNT,
+    postgres only) or None.
+    """
+
+    page_size = 10
+    ordering = ("-created_at", "id")
+    cursor_query_param = "cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        ordering = getattr(view, "pagination_ordering", self.ordering)
+        cursor = self.decode_cursor(request.query_params.get(self.cursor_query_param))
+        page, self.next_cursor, self.previous_cursor = self.slice(
+            queryset, cursor, ordering
+        )
+        first_only = not cursor and self.next_cursor is None
+        self.count = self.get_count(queryset, view, page, first_only)
+        return page
+
+    def get_count(self, queryset, view, page, first_only):
+        if hasattr(view, "get_pagination_count"):
+            return view.get_pagination_count()
+        if first_only:
+            return len(page)
+        if settings.PAGINATION_ESTIMATED_COUNT:
+            return self.estimate_count(queryset)
+        return None
+
+    @staticmethod
+    def estimate_count(queryset):
+        """rows the planner expects the queryset to return, from table statistics"""
+        connection = connections[queryset.db]
+        if connection.vendor != "postgresql":
+            return None
+        sql, params = queryset.order_by().query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    def slice(self, queryset, cursor=None, ordering=None):
+        """
+        Args:
+            cursor (dict): decoded cursor, None for the first page
+
+        Returns:
+            tuple: (rows of the page, next cursor, previous cursor)
+        """
+        ordering = ordering or self.ordering
+        backwards = bool(cursor and cursor["reverse"])
+        # walking back the ordering is flipped, NULLs included
+        scan = [self._flip(field) for field in ordering] if backwards else list(ordering)
+        model = queryset.model
+        queryset = queryset.order_by(
+            *[self._order_expression(model, field, nulls_last=not backwards) for field in scan]
+        )
+        if cursor:
+            if len(cursor["position"]) != len(ordering):
+                raise NotFound("invalid cursor")
+            queryset = queryset.filter(
+                self._after(model, scan, cursor["position"], nulls_last=not backwards)
+            )
+
+        rows = list(queryset[: self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if backwards:
+            rows.reverse()
+
+        next_cursor = previous_cursor = None
+        if rows and (has_more or backwards):
+            next_cursor = self._cursor(rows[-1], ordering, reverse=False)
+        if rows and cursor and (has_more or not backwards):
+            previous_cursor = self._cursor(rows[0], ordering, reverse=True)
+        return rows, next_cursor, previous_cursor
+
+    @staticmethod
+    def _flip(field):
+        return field[1:] if field.startswith("-") else f"-{field}"
+
+    @staticmethod
+    def _order_expression(model, field, nulls_last):
+        name = field.lstrip("-")
+        if not model._meta.get_field(name).null:
+            return field
+        column = F(name)
+        nulls = {"nulls_last": True} if nulls_last else {"nulls_first": True}
+        return column.desc(**nulls) if field.startswith("-") else column.asc(**nulls)
+
+    @staticmethod
+    def _after(model, ordering, position, nulls_last) -> Q:
+        """rows past `position` in the given ordering: (a, b) > (x, y) spelled out"""
+        condition = Q()
+        equal = Q()
+        bound = Q()
+        for index, (field, value) in enumerate(zip(ordering, position)):
+            name = field.lstrip("-")
+            model_field = model._meta.get_field(name)
+            lookup = "lt" if field.startswith("-") else "gt"
+            if value is None:
+                # NULLs are the last (or when walking back the first) values of the column
+                past = Q(pk__in=[]) if nulls_last else Q(**{f"{name}__isnull": False})
+                condition |= equal & past
+                equal &= Q(**{f"{name}__isnull": True})
+                continue
+            try:
+                value = model_field.to_python(value)
+            except (ValidationError, TypeError, ValueError):
+                raise NotFound("invalid cursor")
+            past = Q(**{f"{name}__{lookup}": value})
+            if model_field.null and nulls_last:
+                past |= Q(**{f"{name}__isnull": True})
+            condition |= equal & past
+            equal &= Q(**{name: value})
+            if index == 0 and not model_field.null:
+                # a plain range on the leading column lets the index seek to the page
+                bound = Q(**{f"{name}__{lookup}e": value})
+        return bound & condition
+
+    @staticmethod
+    def _cursor(row, ordering, reverse) -> dict:
+        position = []
+        for field in ordering:
+            value = getattr(row, field.lstrip("-"))
+            position.append(value.isoformat() if hasattr(value, "isoformat") else value)
+        return {"position": position, "reverse": reverse}
+
+    @staticmethod
+    def encode_cursor(cursor) -> str:
+        return urlsafe_b64encode(json.dumps(cursor, default=str).encode()).decode()
+
+    @staticmethod
+    def decode_cursor(token):
+        if not token:
+            return None
+        try:
+            cursor = json.loads(urlsafe_b64decode(token.encode()))
+            position, reverse = cursor["position"], cursor["reverse"]
+            # a position holds one plain value per ordering column
+            if not isinstance(position, list) or not isinstance(reverse, bool):
+                raise TypeError("malformed cursor")
+            if any(isinstance(value, (list, dict)) for value in position):
+                raise TypeError("malformed cursor position")
+            return {"position": position, "reverse": reverse}
+        except (TypeError, ValueError, KeyError):
+            raise NotFound("invalid cursor")
+
+    def cursor_link(self, url, cursor):
+        if cursor is None:
+            return None
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(cursor))
+
+    def get_next_link(self):
+        return self.cursor_link(self.request.build_absolute_uri(), self.next_cursor)
+
+    def get_previous_link(self):
+        return self.cursor_link(self.request.build_absolute_uri(), self.previous_cursor)
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "cursor of the page, taken from the next or previous link",
+                "schema": {"type": "string"},
+            }
+        ]
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "data": {
+                    "count": self.count,
+                    "next": self.get_next_link(),
+                    "previous": self.get_previous_link(),
+                    "results": data,
+                }
+            }
+        )
+
+
 class CustomParserPaginationMixin:
     """
     mixin for handling multiple parser types
@@ -17,6 +17,7 @@ from logging_config import logger
 from rest_framework.response import Response
 from rest_framework import status, serializers
 import redis
+from .backpressure import QueueOverloaded
 
 
 class ErrorHandlingMixin:
@@ -81,6 +82,13 @@ class ErrorHandlingMixin:
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+        if isinstance(ex, QueueOverloaded):
+            return Response(
+                {"error": str(ex.detail), "retry_after": ex.wait},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": str(ex.wait)},
+            )
+
         if isinstance(ex, Throttled):
             return Response(
                 {"error": f"request throttled. try again in {ex.wait} seconds."},
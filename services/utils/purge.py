@@ -0,0 +1,85 @@
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from logging_config import logger
+from .task_metrics import timed_sleep
+
+
+class ChunkedPurge:
+    """
+    deletes the rows of a queryset in primary key ordered batches
+
+    every batch is its own short transaction (cascades included), followed by a pause so
+    locks and memory stay bounded however many rows piled up. the last deleted primary key
+    is kept in the cache: an interrupted run resumes after it, a finished run clears it.
+
+    Args:
+        queryset: rows to delete, re-applied to every batch so rows that stopped matching
+            in the meantime are kept
+        name: identifies the job for the resumable cursor, e.g. "dip_cleanup"
+        batch_size: rows per batch, defaults to PURGE_BATCH_SIZE
+        pause: seconds to sleep between batches, defaults to PURGE_PAUSE
+    """
+
+    CURSOR_KEY = "purge:cursor:{}"
+
+    def __init__(self, queryset, name, batch_size=None, pause=None):
+        self.queryset = queryset
+        self.name = name
+        self.batch_size = batch_size or settings.PURGE_BATCH_SIZE
+        self.pause = settings.PURGE_PAUSE if pause is None else pause
+        self.cursor_key = self.CURSOR_KEY.format(name)
+
+    def run(self, max_batches=None) -> dict:
+        """
+        Args:
+            max_batches (int, optional): stop after this many batches, the cursor is kept
+                so the next run continues where this one stopped
+
+        Returns:
+            dict: matched rows deleted, rows deleted including cascades, batches,
+                rows per second and whether the purge completed
+        """
+        cursor = cache.get(self.cursor_key)
+        if cursor is not None:
+            logger.info(f"purge {self.name}: resuming after pk {cursor}")
+
+        started = time.monotonic()
+        summary = {"deleted": 0, "deleted_total": 0, "batches": 0, "completed": False}
+
+        while max_batches is None or summary["batches"] < max_batches:
+            batch = self.queryset.order_by("pk")
+            if cursor is not None:
+                batch = batch.filter(pk__gt=cursor)
+            pks = list(batch.values_list("pk", flat=True)[: self.batch_size])
+
+            if not pks:
+                summary["completed"] = True
+                cache.delete(self.cursor_key)
+                break
+
+            with transaction.atomic():
+                deleted_total, details = self.queryset.filter(pk__in=pks).delete()
+
+            cursor = pks[-1]
+            cache.set(self.cursor_key, cursor, timeout=None)
+            summary["batches"] += 1
+            summary["deleted"] += details.get(self.queryset.model._meta.label, 0)
+            summary["deleted_total"] += deleted_total
+
+            if len(pks) < self.batch_size:
+                summary["completed"] = True
+                cache.delete(self.cursor_key)
+                break
+            if self.pause:
+                timed_sleep(self.pause)
+
+        elapsed = time.monotonic() - started
+        summary["rows_per_second"] = round(summary["deleted_total"] / elapsed, 1) if elapsed else 0
+        logger.info(
+            f"purge {self.name}: deleted {summary['deleted']} rows "
+            f"({summary['deleted_total']} with cascades) in {summary['batches']} batches, "
+            f"{summary['rows_per_second']} rows/s, completed: {summary['completed']}"
+        )
+        return summary
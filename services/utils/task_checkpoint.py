@@ -0,0 +1,63 @@
+from celery import current_task
+from django.conf import settings
+from django.core.cache import cache
+from logging_config import logger
+from .task_metrics import timed_sleep
+from .task_lock import TaskLease
+
+
+class TaskCheckpoint:
+    """
+    progress a task persists between its steps so a retry resumes instead of starting over
+
+    a checkpoint belongs to one task run: retries keep the celery task id and find it,
+    a fresh run starts from scratch. the sync services store what they already did
+    (propagation waits, proposals read, votes fetched) and skip it when resumed; the
+    task clears the checkpoint once it succeeds, otherwise it expires after
+    TASK_CHECKPOINT_TIMEOUT. outside a worker (no task id) nothing is stored.
+
+    Args:
+        task_id (str): celery task id
+    """
+
+    KEY = "task:checkpoint:{}"
+
+    def __init__(self, task_id):
+        self.task_id = task_id
+        self.key = self.KEY.format(task_id)
+        self.data = (cache.get(self.key) or {}) if task_id else {}
+
+    @classmethod
+    def current(cls) -> "TaskCheckpoint":
+        """checkpoint of the task running on this thread, if any"""
+        request = getattr(current_task, "request", None)
+        return cls(getattr(request, "id", None))
+
+    @property
+    def resumed(self) -> bool:
+        return bool(self.data)
+
+    def get(self, name, default=None):
+        return self.data.get(name, default)
+
+    def save(self, **fields):
+        self.data.update(fields)
+        if self.task_id:
+            cache.set(self.key, self.data, timeout=settings.TASK_CHECKPOINT_TIMEOUT)
+            # progress was made, keep the key leased while the task is still working
+            TaskLease.renew_current()
+
+    def clear(self):
+        self.data = {}
+        if self.task_id:
+            cache.delete(self.key)
+
+    def wait_once(self, step, seconds, message):
+        """sleeps for transaction propagation unless a previous attempt already did"""
+        name = f"waited:{step}"
+        if self.get(name):
+            logger.info(f"{step}: propagation wait already done by a previous attempt")
+            return
+        logger.info(message)
+        timed_sleep(seconds)
+        self.save(**{name: True})
@@ -0,0 +1,208 @@
+import threading
+import time
+from celery.exceptions import Retry
+from celery.result import AsyncResult
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.redis import RedisCache
+from app.celery_routing import LANES, lane_for, queue_for
+from .task_progress import TaskProgress
+from logging_config import logger
+
+
+# value stored while the winning caller is still publishing the task
+RESERVED = "reserved"
+
+# lease held by the task running on this thread, renewed by its checkpoint writes
+_local = threading.local()
+
+# compare-and-delete / compare-and-expire: a lease is only touched by the worker holding it
+_RELEASE_SCRIPT = (
+    "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end "
+    "return 0"
+)
+_RENEW_SCRIPT = (
+    "if redis.call('get', KEYS[1]) == ARGV[1] then "
+    "return redis.call('expire', KEYS[1], ARGV[2]) end return 0"
+)
+
+
+def _pending_key(task, key, lane=None) -> str:
+    # per lane, a user refresh never collapses into a run parked behind a fleet sweep
+    return f"task:pending:{task.name}:{lane_for(task.name, lane)}:{key}"
+
+
+def _lease_key(task, key) -> str:
+    return f"task:lease:{task.name}:{key}"
+
+
+def _lease_waits_key(task, task_id) -> str:
+    return f"task:lease_waits:{task.name}:{task_id}"
+
+
+def enqueue_once(task, key, *args, countdown=None, lane=None, **kwargs):
+    """
+    enqueues `task` unless one with the same key is already waiting in the queue
+
+    duplicate calls for the same (task, key, lane) collapse into the pending task and get
+    its id back, so repeated refresh clicks cost one worker run instead of one per click.
+    the pending marker is cleared by the task once it holds its lease (see TaskLease).
+
+    Args:
+        task: celery task to enqueue
+        key: identifier of the unit of work, e.g. the dao or dip id
+        *args, **kwargs: forwarded to task.delay
+        countdown: optional delay in seconds before the task may run
+        lane: routing lane ("interactive"/"background") overriding the task default
+
+    Returns:
+        tuple: (AsyncResult of the pending or new task, created flag)
+    """
+    pending_key = _pending_key(task, key, lane)
+    timeout = settings.TASK_PENDING_TIMEOUT + int(countdown or 0)
+
+    if cache.add(pending_key, RESERVED, timeout):
+        try:
+            result = _publish(task, args, kwargs, countdown, lane)
+        except Exception:
+            cache.delete(pending_key)
+            raise
+        cache.set(pending_key, result.id, timeout)
+        TaskProgress(result.id).queued(task.name, key=str(key))
+        return result, True
+
+    # another request won the race, wait briefly until it published its task id
+    for _ in range(20):
+        task_id = cache.get(pending_key)
+        if task_id is None:
+            # the pending task started (or expired) in the meantime, enqueue a fresh one
+            return enqueue_once(task, key, *args, countdown=countdown, lane=lane, **kwargs)
+        if task_id != RESERVED:
+            logger.info(f"{task.name}[{key}] already pending as {task_id}, not enqueued")
+            return AsyncResult(task_id), False
+        time.sleep(0.05)
+
+    logger.warning(f"{task.name}[{key}] pending marker never got a task id, enqueueing anyway")
+    return _publish(task, args, kwargs, countdown, lane), True
+
+
+def pending_task(task, key, lane=None):
+    """AsyncResult of the task queued for (task, key) on the lane and not started yet"""
+    task_id = cache.get(_pending_key(task, key, lane))
+    if task_id is None or task_id == RESERVED:
+        return None
+    return AsyncResult(task_id)
+
+
+def _publish(task, args, kwargs, countdown, lane):
+    if countdown or lane:
+        options = {"countdown": countdown} if countdown else {}
+        if lane:
+            options["queue"] = queue_for(task.name, args, kwargs, lane=lane)
+        return task.apply_async(args=args, kwargs=kwargs, **options)
+    return task.delay(*args, **kwargs)
+
+
+def _if_owner(lease_key, owner, script, *args) -> bool:
+    """runs `script` on the lease if `owner` still holds it, atomically on redis"""
+    backend = caches["default"]
+    if isinstance(backend, RedisCache):
+        key = backend.make_and_validate_key(lease_key)
+        client = backend._cache.get_client(key, write=True)
+        return bool(client.eval(script, 1, key, backend._cache._serializer.dumps(owner), *args))
+    # other backends (locmem in tests) have no scripts, same check without the atomicity
+    if cache.get(lease_key) != owner:
+        return False
+    if script is _RELEASE_SCRIPT:
+        return cache.delete(lease_key)
+    return cache.touch(lease_key, *args)
+
+
+class TaskLease:
+    """
+    redis lease held by a task while it works on a key
+
+    only one worker at a time syncs the same dao/dip; the lease expires on its own after
+    TASK_LEASE_TIMEOUT so a killed worker cannot block the key forever. a running task
+    renews it on every checkpoint write (TaskCheckpoint.save), so a long sync keeps it
+    as long as it makes progress. renewal and release only act while the lease still
+    holds this task's id.
+    """
+
+    def __init__(self, task, key, timeout=None):
+        self.task = task
+        self.key = key
+        self.lease_key = _lease_key(task, key)
+        self.timeout = timeout or settings.TASK_LEASE_TIMEOUT
+        self.owner = task.request.id or f"direct-{time.monotonic_ns()}"
+        self.acquired = False
+
+    def acquire(self) -> bool:
+        self.acquired = cache.add(self.lease_key, self.owner, self.timeout)
+        if self.acquired:
+            _local.lease = self
+            # the task is running now, new requests should queue a follow-up run
+            pending_keys = [_pending_key(self.task, self.key, lane) for lane in LANES]
+            for pending_key, task_id in cache.get_many(pending_keys).items():
+                if task_id == self.task.request.id:
+                    cache.delete(pending_key)
+        return self.acquired
+
+    def release(self):
+        if self.acquired:
+            _if_owner(self.lease_key, self.owner, _RELEASE_SCRIPT)
+        if getattr(_local, "lease", None) is self:
+            _local.lease = None
+        self.acquired = False
+
+    def renew(self) -> bool:
+        """extends the lease by its timeout, False once another worker took it over"""
+        if not self.acquired:
+            return False
+        renewed = _if_owner(self.lease_key, self.owner, _RENEW_SCRIPT, self.timeout)
+        if not renewed:
+            logger.warning(f"{self.task.name}[{self.key}] lost its lease")
+        return renewed
+
+    @staticmethod
+    def renew_current():
+        """renews the lease of the task running on this thread, if it holds one"""
+        lease = getattr(_local, "lease", None)
+        if lease is not None:
+            lease.renew()
+
+    def acquire_or_retry(self):
+        """
+        acquires the lease or reschedules the task until the current holder is done
+
+        the rescheduled run keeps its task id and request.retries, waiting for a lease
+        is no error and must not use up max_retries. waits are counted per task id and
+        bounded by the lease timeout instead. when called directly (not from a worker)
+        there is nothing to reschedule, so False is returned and the caller skips the
+        work another worker is doing.
+        """
+        request = self.task.request
+        waits_key = _lease_waits_key(self.task, request.id)
+        if self.acquire():
+            cache.delete(waits_key)
+            return True
+        if request.called_directly:
+            logger.info(f"{self.task.name}[{self.key}] is running elsewhere, skipped")
+            return False
+        delay = settings.TASK_LEASE_RETRY_DELAY
+        cache.add(waits_key, 0, self.timeout * 2)
+        waits = cache.incr(waits_key)
+        if waits > self.timeout // delay + 1:
+            cache.delete(waits_key)
+            raise self.task.MaxRetriesExceededError(
+                f"{self.task.name}[{self.key}] gave up waiting for the lease"
+            )
+        logger.info(f"{self.task.name}[{self.key}] is locked, waiting ({waits})")
+        if request.is_eager:
+            raise Retry(when=delay)
+        # what task.retry() does, without counting the run as a retry
+        signature = self.task.signature_from_request(
+            request, countdown=delay, retries=request.retries
+        )
+        signature.apply_async()
+        raise Retry(when=delay, sig=signature)
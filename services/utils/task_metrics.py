@@ -0,0 +1,148 @@
+import threading
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from logging_config import logger
+
+
+# per thread totals since the thread started; a task reports the difference between its
+# start and end so concurrent tasks on other pool threads never mix into its numbers
+_counters = threading.local()
+
+COUNTERS = ("rpc_calls", "rpc_time", "db_queries", "db_time", "sleep_time")
+
+
+def add(name, value=1):
+    setattr(_counters, name, getattr(_counters, name, 0) + value)
+
+
+def counters() -> dict:
+    return {name: getattr(_counters, name, 0) for name in COUNTERS}
+
+
+def timed_sleep(seconds):
+    """time.sleep that is reported as sleep_time of the running task"""
+    started = time.perf_counter()
+    try:
+        time.sleep(seconds)
+    finally:
+        add("sleep_time", time.perf_counter() - started)
+
+
+def _count_queries(execute, sql, params, many, context):
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        add("db_queries")
+        add("db_time", time.perf_counter() - started)
+
+
+class TaskMetrics:
+    """
+    per run measurements of celery tasks, collected by the signals in app/celery_config.py
+
+    every run records its queue wait, run time, retries, database queries and time, rpc
+    calls and time and time spent sleeping. the numbers are attached to the task's result
+    summary (TaskSummary) and added to per task totals in the cache, exported by the
+    metrics endpoint. retries are totalled per task, not per run: only the last run of a
+    task (any state but RETRY) adds them, and their average is over those tasks. the
+    totals are read-modify-write and may drop a run when two workers finish the same
+    task at the same moment, good enough for capacity planning.
+    """
+
+    TOTALS_KEY = "task:metrics:{}"
+    NAMES_KEY = "task:metrics:names"
+
+    @classmethod
+    def start(cls, task, queue_wait=None):
+        # the wrapper stays on the thread's connection, it only bumps the counters
+        if _count_queries not in connection.execute_wrappers:
+            connection.execute_wrappers.append(_count_queries)
+        _counters.run = {
+            "task": task.name,
+            "started": time.perf_counter(),
+            "counters": counters(),
+            "queue_wait": queue_wait,
+            "retries": task.request.retries or 0,
+        }
+
+    @classmethod
+    def current(cls) -> dict:
+        """measurements of the task running on this thread so far, empty outside a task"""
+        run = getattr(_counters, "run", None)
+        if run is None:
+            return {}
+        now = counters()
+        measured = {
+            name: round(now[name] - run["counters"][name], 3) for name in COUNTERS
+        }
+        return {
+            "queue_wait": round(run["queue_wait"], 3) if run["queue_wait"] is not None else None,
+            "runtime": round(time.perf_counter() - run["started"], 3),
+            "retries": run["retries"],
+            **measured,
+        }
+
+    @classmethod
+    def stop(cls, state) -> dict:
+        measured = cls.current()
+        run = getattr(_counters, "run", None)
+        _counters.run = None
+        if run is None:
+            return measured
+
+        logger.info(
+            f"task {run['task']} {state}: "
+            + ", ".join(f"{name}={value}" for name, value in measured.items())
+        )
+        cls._add_to_totals(run["task"], state, measured)
+        return measured
+
+    @classmethod
+    def _add_to_totals(cls, name, state, measured):
+        key = cls.TOTALS_KEY.format(name)
+        totals = cache.get(key) or {"runs": 0, "failures": 0, "runtime_max": 0}
+        totals["runs"] += 1
+        totals["failures"] += state == "FAILURE"
+        totals["runtime_max"] = max(totals["runtime_max"], measured["runtime"])
+        if measured["queue_wait"] is not None:
+            totals["queued_runs"] = totals.get("queued_runs", 0) + 1
+        if state != "RETRY":
+            # every run carries the retries before it, count them once on the last run
+            totals["tasks"] = totals.get("tasks", 0) + 1
+            totals["retries"] = totals.get("retries", 0) + measured["retries"]
+        for field, value in measured.items():
+            if field != "retries" and value is not None:
+                totals[field] = round(totals.get(field, 0) + value, 3)
+        cache.set(key, totals, timeout=settings.TASK_METRICS_TIMEOUT)
+
+        names = cache.get(cls.NAMES_KEY) or set()
+        if name not in names:
+            cache.set(cls.NAMES_KEY, names | {name}, timeout=None)
+
+    @classmethod
+    def export(cls) -> dict:
+        """task name -> totals and per run averages"""
+        names = sorted(cache.get(cls.NAMES_KEY) or ())
+        totals = cache.get_many([cls.TOTALS_KEY.format(name) for name in names])
+        export = {}
+        for name in names:
+            task_totals = totals.get(cls.TOTALS_KEY.format(name))
+            if not task_totals:
+                continue
+            runs = task_totals["runs"]
+            averages = {
+                field: round(task_totals[field] / runs, 3)
+                for field in ("runtime", *COUNTERS)
+                if field in task_totals
+            }
+            if task_totals.get("tasks"):
+                averages["retries"] = round(task_totals["retries"] / task_totals["tasks"], 3)
+            if task_totals.get("queued_runs"):
+                averages["queue_wait"] = round(
+                    task_totals["queue_wait"] / task_totals["queued_runs"], 3
+                )
+            export[name] = {**task_totals, "averages": averages}
+        return export
@@ -0,0 +1,164 @@
+import time
+from celery import current_task
+from celery.result import AsyncResult
+from django.conf import settings
+from django.core.cache import cache
+
+
+QUEUED = "queued"
+RUNNING = "running"
+RETRYING = "retrying"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+FINISHED_STATES = {SUCCEEDED, FAILED}
+
+# celery states reported by task_postrun / the result backend
+CELERY_STATES = {
+    "PENDING": QUEUED,
+    "RECEIVED": QUEUED,
+    "STARTED": RUNNING,
+    "RETRY": RETRYING,
+    "SUCCESS": SUCCEEDED,
+    "FAILURE": FAILED,
+    "REVOKED": FAILED,
+}
+
+
+class TaskProgress:
+    """
+    lightweight progress record of a queued task, kept in the cache next to its result
+
+    the record is created when the task is enqueued, moved through running/retrying/
+    finished by the celery signals in app/celery_config.py and updated by the sync code
+    with the current stage and counters (blocks scanned, proposals read, votes saved).
+    counter updates are written at most every TASK_PROGRESS_INTERVAL seconds so a loop
+    over thousands of items costs a handful of cache writes.
+
+    Args:
+        task_id (str): celery task id, updates are no-ops without one (task called directly)
+    """
+
+    KEY = "task:progress:{}"
+
+    def __init__(self, task_id):
+        self.task_id = task_id
+        self.key = self.KEY.format(task_id)
+        self._record = None
+        self._written = 0.0
+
+    @classmethod
+    def current(cls) -> "TaskProgress":
+        """progress of the task running on this thread, if any"""
+        request = getattr(current_task, "request", None)
+        return cls(getattr(request, "id", None))
+
+    @classmethod
+    def read(cls, task_id) -> dict | None:
+        record = cache.get(cls.KEY.format(task_id))
+        if record is None:
+            return None
+        return {**record, "eta_seconds": cls._eta(record)}
+
+    def queued(self, name, **fields):
+        self._write(
+            {"task": name, "state": QUEUED, "queued_at": time.time(), **fields}, force=True
+        )
+
+    def start(self, name):
+        self._load()
+        self._record.setdefault("task", name)
+        self._record.setdefault("queued_at", None)
+        self._record.update(
+            state=RUNNING,
+            started_at=time.time(),
+            attempts=self._record.get("attempts", 0) + 1,
+        )
+        self._write(self._record, force=True)
+        return self._record
+
+    def update(self, stage=None, done=None, total=None, **counters):
+        """
+        records the current stage and counters of the running task
+
+        Args:
+            stage (str, optional): what the task is doing, e.g. "reading proposals";
+                a new stage is always written
+            done (int, optional): items of the stage processed so far
+            total (int, optional): items of the stage in total, enables the eta
+            **counters: other counters to report, e.g. blocks_scanned
+        """
+        if not self.task_id:
+            return
+        self._load()
+        force = stage is not None and stage != self._record.get("stage")
+        if force:
+            self._record.update(stage=stage, stage_started_at=time.time(), done=None, total=None)
+        if done is not None:
+            self._record["done"] = done
+        if total is not None:
+            self._record["total"] = total
+        self._record.update(counters)
+        self._write(self._record, force=force)
+
+    def finish(self, state, result=None):
+        self._load()
+        self._record.update(state=state, finished_at=time.time())
+        if isinstance(result, dict):
+            self._record["result"] = result
+        elif result is not None:
+            self._record["error"] = str(result)[:200]
+        self._write(self._record, force=True)
+
+    def _load(self):
+        if self._record is None:
+            self._record = cache.get(self.key) or {}
+
+    def _write(self, record, force=False):
+        if not self.task_id:
+            return
+        now = time.time()
+        if not force and now - self._written < settings.TASK_PROGRESS_INTERVAL:
+            return
+        record["updated_at"] = now
+        self._record = record
+        self._written = now
+        cache.set(self.key, record, timeout=int(settings.CELERY_RESULT_EXPIRES.total_seconds()))
+
+    @staticmethod
+    def _eta(record) -> float | None:
+        done, total = record.get("done"), record.get("total")
+        if record.get("state") != RUNNING or not done or not total or done >= total:
+            return None
+        elapsed = (record.get("updated_at") or 0) - (record.get("stage_started_at") or 0)
+        if elapsed <= 0:
+            return None
+        return round(elapsed / done * (total - done), 1)
+
+
+def task_status(task_id) -> dict | None:
+    """
+    status of a queued task for clients to poll: the progress record, completed from the
+    result backend when the record is missing or lags behind the finished task
+
+    Returns:
+        dict | None: None for unknown (or expired) task ids
+    """
+    record = TaskProgress.read(task_id) or {}
+    if record.get("state") not in FINISHED_STATES:
+        result = AsyncResult(task_id)
+        state = CELERY_STATES.get(result.state)
+        if state in FINISHED_STATES:
+            record["state"] = state
+            if isinstance(result.result, dict):
+                record["result"] = result.result
+        elif not record:
+            # the result backend reports PENDING for any id it does not know
+            return None
+
+    done, total = record.get("done"), record.get("total")
+    return {
+        "task_id": task_id,
+        **record,
+        "percent": round(100 * done / total, 1) if done is not None and total else None,
+    }
@@ -0,0 +1,61 @@
+import json
+import time
+from django.conf import settings
+from .task_metrics import COUNTERS, TaskMetrics, counters
+from logging_config import logger
+
+
+class TaskSummary:
+    """
+    builds the compact result a task stores in the result backend
+
+    results only carry counts, cursors, the run duration and the task's measurements
+    (rpc calls and time, database queries and time, sleep time, queue wait and retries,
+    see TaskMetrics); the synced rows themselves are read from the database on demand.
+    """
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.counters = counters()
+
+    def result(self, status="completed", **fields) -> dict:
+        now = counters()
+        run = TaskMetrics.current()
+        return cap_result(
+            {
+                "status": status,
+                **fields,
+                "duration": round(time.monotonic() - self.started, 3),
+                **{name: round(now[name] - self.counters[name], 3) for name in COUNTERS},
+                "queue_wait": run.get("queue_wait"),
+                "retries": run.get("retries", 0),
+            }
+        )
+
+
+def cap_result(payload: dict) -> dict:
+    """
+    keeps a result under TASK_RESULT_MAX_BYTES of json by dropping its largest
+    list/dict fields first; scalars (counts, cursors, status) are always kept
+    """
+    max_bytes = settings.TASK_RESULT_MAX_BYTES
+    size = len(json.dumps(payload, default=str))
+    if size <= max_bytes:
+        return payload
+
+    payload = dict(payload)
+    containers = sorted(
+        (key for key, value in payload.items() if isinstance(value, (list, dict))),
+        key=lambda key: len(json.dumps(payload[key], default=str)),
+        reverse=True,
+    )
+    dropped = []
+    for key in containers:
+        del payload[key]
+        dropped.append(key)
+        if len(json.dumps(payload, default=str)) <= max_bytes:
+            break
+
+    logger.warning(f"task result of {size} bytes over the cap, dropped: {', '.join(dropped)}")
+    payload["truncated"] = dropped
+    return payload
@@ -0,0 +1,170 @@
+import os
+import resource
+import signal
+import threading
+import tracemalloc
+from django.conf import settings
+from django.core.cache import cache
+from logging_config import logger
+
+
+_lock = threading.Lock()
+_local = threading.local()
+
+# allocations of the profiler itself and of the import machinery are noise
+_IGNORED = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def rss_bytes() -> int:
+    """current resident set size of this process"""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * resource.getpagesize()
+    except (OSError, IndexError, ValueError):
+        # peak instead of current outside linux, still bounded by the same limit
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class WorkerMemory:
+    """
+    memory watch of a worker process, driven by the signals in app/celery_config.py
+
+    recycling: after WORKER_MAX_TASKS tasks or once the rss passes WORKER_MAX_RSS_MB the
+    process asks itself for a warm shutdown (SIGTERM): running tasks finish, nothing new
+    is consumed, and the container restart policy brings a fresh worker up. prefork
+    children are recycled by celery itself through worker_max_tasks_per_child and
+    worker_max_memory_per_child, set from the same limits, so they are left alone here.
+    they are told apart by worker_process_init, which celery only sends in pool children
+    (billiard processes, so multiprocessing.parent_process() can't see them).
+
+    profiling (WORKER_MEMORY_PROFILING): tracemalloc records every allocation, each run
+    adds the traced memory it left behind to its task type, and every
+    WORKER_MEMORY_PROFILE_EVERY runs of a type a snapshot is compared with the previous
+    one of that type. the top growing allocation sites are logged and kept in the cache
+    per worker for the metrics endpoint. with the threads pool concurrent tasks share the
+    process, so retained memory and sites of one type include whatever ran beside it;
+    a regression still shows up as one type growing run after run.
+    """
+
+    KEY = "worker:memory:{}"
+    NAMES_KEY = "worker:memory:names"
+
+    tasks = 0
+    recycling = False
+    pool_child = False
+    profiles = {}
+
+    @classmethod
+    def pool_child_started(cls):
+        cls.pool_child = True
+
+    @classmethod
+    def task_started(cls):
+        if not settings.WORKER_MEMORY_PROFILING:
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(settings.WORKER_MEMORY_PROFILE_FRAMES)
+        _local.traced = tracemalloc.get_traced_memory()[0]
+
+    @classmethod
+    def task_finished(cls, task_name, hostname=None):
+        with _lock:
+            cls.tasks += 1
+            tasks = cls.tasks
+        rss = rss_bytes()
+        if settings.WORKER_MEMORY_PROFILING and tracemalloc.is_tracing():
+            cls._profile(task_name, hostname or f"pid-{os.getpid()}", rss)
+        cls._recycle_if_needed(tasks, rss)
+
+    @classmethod
+    def _profile(cls, task_name, hostname, rss):
+        started = getattr(_local, "traced", None)
+        _local.traced = None
+        retained = tracemalloc.get_traced_memory()[0] - started if started is not None else 0
+
+        with _lock:
+            profile = cls.profiles.setdefault(
+                task_name, {"runs": 0, "retained": 0, "snapshot": None, "top": []}
+            )
+            profile["runs"] += 1
+            profile["retained"] += retained
+            if profile["runs"] % settings.WORKER_MEMORY_PROFILE_EVERY:
+                return
+            previous = profile["snapshot"]
+            profile["snapshot"] = tracemalloc.take_snapshot().filter_traces(_IGNORED)
+            if previous is None:
+                return
+            profile["top"] = cls._top_sites(profile["snapshot"], previous)
+            report = cls._report(rss)
+
+        sites = "; ".join(
+            f"{site['site']} {site['size_diff'] // 1024:+}KB" for site in profile["top"]
+        )
+        logger.info(
+            f"memory {task_name}: rss={rss // 2**20}MB, runs={profile['runs']}, "
+            f"retained={profile['retained'] // 1024}KB, top sites: {sites}"
+        )
+        cls._store(hostname, report)
+
+    @staticmethod
+    def _top_sites(snapshot, previous) -> list:
+        stats = [stat for stat in snapshot.compare_to(previous, "lineno") if stat.size_diff > 0]
+        return [
+            {
+                "site": str(stat.traceback[0]),
+                "size": stat.size,
+                "size_diff": stat.size_diff,
+                "count_diff": stat.count_diff,
+            }
+            for stat in stats[: settings.WORKER_MEMORY_PROFILE_TOP]
+        ]
+
+    @classmethod
+    def _report(cls, rss) -> dict:
+        return {
+            "rss": rss,
+            "tasks": cls.tasks,
+            "profiles": {
+                name: {key: profile[key] for key in ("runs", "retained", "top")}
+                for name, profile in cls.profiles.items()
+            },
+        }
+
+    @classmethod
+    def _store(cls, hostname, report):
+        cache.set(cls.KEY.format(hostname), report, timeout=settings.TASK_METRICS_TIMEOUT)
+        names = cache.get(cls.NAMES_KEY) or set()
+        if hostname not in names:
+            cache.set(cls.NAMES_KEY, names | {hostname}, timeout=None)
+
+    @classmethod
+    def _recycle_if_needed(cls, tasks, rss):
+        if cls.recycling or cls.pool_child:
+            return
+        max_tasks = settings.WORKER_MAX_TASKS
+        max_rss = settings.WORKER_MAX_RSS_MB * 2**20
+        if max_tasks and tasks >= max_tasks:
+            reason = f"{tasks} tasks processed"
+        elif max_rss and rss >= max_rss:
+            reason = f"rss {rss // 2**20}MB over {settings.WORKER_MAX_RSS_MB}MB"
+        else:
+            return
+        cls.recycling = True
+        logger.warning(f"recycling worker {os.getpid()}: {reason}, warm shutdown")
+        os.kill(os.getpid(), signal.SIGTERM)
+
+    @classmethod
+    def export(cls) -> dict:
+        """worker -> last memory report"""
+        names = sorted(cache.get(cls.NAMES_KEY) or ())
+        reports = cache.get_many([cls.KEY.format(name) for name in names])
+        return {
+            name: reports[cls.KEY.format(name)]
+            for name in names
+            if cls.KEY.format(name) in reports
+        }